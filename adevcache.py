@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+content-addressed storage of ADev results
+Created on 2026/10/19
+@author: agent
+"""
+
+# Results are stored under a hash of everything that determines them: the
+# input series, the reference value, the time step, the tau list and (in
+# gap-aware mode) the grid index. Unchanged series therefore hit the cache
+# after re-masking other data or reloading a file, without any bookkeeping
+# of what changed. The optional disk store keeps one numpy .npz file per
+# result: the arrays of the (nested) result dictionary are stored under their
+# path of keys, e.g. 'stats/mdev/devs', and all scalars go into one JSON
+# string. Nothing is unpickled when reading, so files in a shared cache
+# directory cannot execute code.
+
+import os
+import json
+import hashlib
+import tempfile
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+
+class ADevCache(object):
+    """ in-memory LRU cache of ADev result dictionaries with optional disk store """
+
+    CACHE_VERSION = 2 # increase when the content of ADev result dictionaries changes
+    FILE_EXTENSION = '.npz'
+    SCALARS = '__scalars__' # entry holding the JSON encoded scalars
+
+    def __init__(self, max_entries=256, directory=None):
+        self.max_entries = max_entries
+        self.directory = None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.set_directory(directory)
+
+    ###############################################################################################
+    def set_directory(self, directory):
+        """ enable disk store in given directory, None or empty string disables it """
+        if not directory:
+            self.directory = None
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.directory = directory
+        except OSError as error:
+            print('ADev cache: cannot use directory ', directory, ': ', error)
+            self.directory = None
+
+    ###############################################################################################
+    def make_key(self, values, reference, time_step, taus, grid=None, extra=None):
+        """ hash of all inputs that determine an ADev result """
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(repr((self.CACHE_VERSION, float(reference), float(time_step))).encode())
+        hasher.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        hasher.update(b'taus')
+        hasher.update(np.ascontiguousarray(taus, dtype=np.float64).tobytes())
+        if grid is not None and len(grid) > 0:
+            # only relative grid positions matter
+            grid = np.asarray(grid, dtype=np.int64)
+            hasher.update(b'grid')
+            hasher.update(np.ascontiguousarray(grid - grid.min()).tobytes())
+        if extra is not None:
+            hasher.update(repr(extra).encode())
+        return hasher.hexdigest()
+
+    ###############################################################################################
+    def _filename(self, key):
+        """ file for disk store of a result """
+        return os.path.join(self.directory, key + self.FILE_EXTENSION)
+
+    ###############################################################################################
+    def get(self, key):
+        """ look up result, returns None if not available """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        if self.directory:
+            try:
+                with np.load(self._filename(key), allow_pickle=False) as store:
+                    scalars = json.loads(str(store[self.SCALARS]))
+                    arrays = {name: store[name] for name in store.files if name != self.SCALARS}
+                adev = self._unflatten(arrays, scalars)
+                self._store_memory(key, adev)
+                self.hits += 1
+                return adev
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+                print('ADev cache: failed to read entry ', key, ': ', error)
+        self.misses += 1
+        return None
+
+    ###############################################################################################
+    def put(self, key, adev):
+        """ store result in memory and, if enabled, on disk """
+        self._store_memory(key, adev)
+        if not self.directory:
+            return
+        temp_filename = None
+        try:
+            (arrays, scalars) = self._flatten(adev)
+            arrays[self.SCALARS] = np.array(json.dumps(scalars))
+            # unique temporary file, concurrent writers of the same key do not collide
+            (handle, temp_filename) = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(handle, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temp_filename, self._filename(key)) # readers never see partial files
+        except (OSError, TypeError) as error:
+            print('ADev cache: failed to write entry ', key, ': ', error)
+            if temp_filename is not None and os.path.exists(temp_filename):
+                os.remove(temp_filename)
+
+    ###############################################################################################
+    @classmethod
+    def _flatten(cls, adev, prefix=''):
+        """ split nested result dictionary into arrays and scalars, keyed by their path """
+        arrays = {}
+        scalars = {}
+        for (name, value) in adev.items():
+            path = prefix + name
+            if isinstance(value, dict):
+                (sub_arrays, sub_scalars) = cls._flatten(value, path + '/')
+                arrays.update(sub_arrays)
+                scalars.update(sub_scalars)
+            elif isinstance(value, np.ndarray):
+                arrays[path] = value
+            elif isinstance(value, np.generic):
+                scalars[path] = value.item() # numpy scalar to plain number for JSON
+            else:
+                scalars[path] = value
+        return arrays, scalars
+
+    ###############################################################################################
+    @staticmethod
+    def _unflatten(arrays, scalars):
+        """ rebuild nested result dictionary from _flatten output """
+        adev = {}
+        for items in (arrays, scalars):
+            for (path, value) in items.items():
+                names = path.split('/')
+                level = adev
+                for name in names[:-1]:
+                    level = level.setdefault(name, {})
+                level[names[-1]] = value
+        return adev
+
+    ###############################################################################################
+    def _store_memory(self, key, adev):
+        """ add to in-memory store, dropping least recently used entries """
+        self._entries[key] = adev
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    ###############################################################################################
+    def clear(self):
+        """ clear in-memory store (disk store is kept) """
+        self._entries.clear()
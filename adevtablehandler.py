@@ -14,8 +14,17 @@ from PyQt5 import ( # pylint: disable=locally-disabled, no-name-in-module
 
 from PyQt5.QtCore import Qt as QtC # pylint: disable=locally-disabled, no-name-in-module
 
+import math
+import collections
 import numpy as np
 
+from adevcache import ADevCache
+
+# settings used by ADev calculations, copied for worker threads (see ADevTableModel.settings)
+ADevSettings = collections.namedtuple(
+    'ADevSettings', ('time_step', 'tau_values', 'key_tau_index', 'gap_aware', 'statistic')
+    )
+
 class ADevTableModel(QtCore.QAbstractTableModel):
     """ adjust handling of data in config table """
 
@@ -24,6 +33,15 @@ class ADevTableModel(QtCore.QAbstractTableModel):
     ROW_NUMBER = 9
     #ROW_HEADER = ("1", "2", "3", "4")
 
+    TAU_MODES = ('decade', 'octave', 'decade10', 'all')
+    STATISTIC_NAMES = {
+        'oadev': 'overlapping Allan deviation',
+        'mdev': 'modified Allan deviation',
+        'hdev': 'overlapping Hadamard deviation',
+        'totdev': 'total deviation'
+        }
+    MAX_ALL_TAUS = 100000 # limit for 'all' mode, beyond this oadev cost explodes
+
     def __init__(self, parent, logic):
         super().__init__(parent)
         self._logic = logic
@@ -33,66 +51,162 @@ class ADevTableModel(QtCore.QAbstractTableModel):
         self.evaluation_adev = {}
         self.evaluation_ref = {}
         self.time_step = 1.234 # time step = sampling rate
+        self.max_tau = None # longest tau supported by the data, set on load
         self.tau_targets = [1E0, 1E1, 1E2, 1E3, 1E4, 1E5, 1E6, 1E7, 1E8, 1E9]
         self.tau_values = self.tau_targets
         self.tau_index_dict = {}
         self.key_tau_index = 0
+        self.tau_mode = 'decade10' # spacing of tau values, see TAU_MODES
+        self.time_budget = 0 # seconds allowed for full ADev calculation, 0: no limit
+        self.gap_aware = False # place data on regular time grid and skip gaps
+        self.statistic = 'oadev' # statistic shown in table and plots, see STATISTIC_NAMES
+        self.cache = ADevCache() # memoized results, shared by all loaded data files
+        self._display = [] # per column: formatted strings by row
+        self._row_headers = []
+        self._key_row = None # row showing the key tau value
+        self._dirty_columns = set() # columns with new results
+        self._layout_changed = True # tau values or statistic changed, format everything
+
+    #######################################################################
+    def set_from_config(self, config):
+        """ read tau strategy, time budget, gap handling and cache location from config file """
+        tau_mode = config['CONFIG'].get('tau_mode', 'decade10').lower()
+        if tau_mode in self.TAU_MODES:
+            self.tau_mode = tau_mode
+        else:
+            print("AT.set_from_config: Unknown tau mode: ", tau_mode)
+        self.time_budget = config['CONFIG'].getfloat('adev_time_budget', 0)
+        self.gap_aware = config['CONFIG'].getboolean('adev_gaps', False)
+        self.set_statistic(config['CONFIG'].get('adev_statistic', 'oadev').lower())
+        self.cache.set_directory(config['CONFIG'].get('adev_cache_dir', ''))
+
+    #######################################################################
+    def set_statistic(self, statistic):
+        """ select displayed statistic, all statistics are calculated together """
+        if statistic not in self.STATISTIC_NAMES:
+            print("AT.set_statistic: Unknown statistic: ", statistic)
+            return False
+        self.statistic = statistic
+        self._layout_changed = True
+        return True
+
+    #######################################################################
+    def select(self, adev):
+        """ get results for displayed statistic from ADev dictionary """
+        try:
+            return adev['stats'][self.statistic]
+        except KeyError:
+            return adev
+    #######################################################################
+    def set_tau_mode(self, tau_mode):
+        """ select tau spacing and regenerate tau list for current time step """
+        if tau_mode not in self.TAU_MODES:
+            print("AT.set_tau_mode: Unknown tau mode: ", tau_mode)
+            return False
+        self.tau_mode = tau_mode
+        self.generate_taus(self.time_step, self.max_tau)
+        return True
+
+    #######################################################################
+    def _tau_candidates(self):
+        """ unrounded tau values for the selected tau mode """
+        first_tau = self.time_step
+        last_tau = self.tau_targets[-1]
+        if self.max_tau is not None:
+            last_tau = max(min(last_tau, self.max_tau), first_tau)
+        if self.tau_mode == 'decade':
+            exponents = np.arange(
+                math.floor(math.log10(first_tau)), math.ceil(math.log10(last_tau))+1
+                )
+            candidates = 10.0**exponents
+        elif self.tau_mode == 'octave':
+            octaves = math.ceil(math.log2(last_tau/first_tau))
+            candidates = first_tau * 2.0**np.arange(0, octaves+1)
+        elif self.tau_mode == 'all':
+            count = min(math.ceil(last_tau/first_tau), self.MAX_ALL_TAUS)
+            candidates = first_tau * np.arange(1, count+1)
+        else: # 'decade10': ten values per decade
+            TAUS_PER_DECADE = 10
+            exponents = np.arange(
+                math.floor(TAUS_PER_DECADE * math.log10(first_tau)),
+                math.ceil(TAUS_PER_DECADE * math.log10(last_tau))+1
+                )
+            candidates = 10.0**(exponents / TAUS_PER_DECADE)
+        return candidates[candidates <= last_tau * (1 + 1E-9)]
 
-    def generate_taus(self, time_step):
+    #######################################################################
+    def generate_taus(self, time_step, max_tau=None):
         """ generate list of tau values for given time step """
-        # this aims to create ten values per decade for plotting
+        # tau values are rounded to multiples of the time step and made unique.
+        # The table shows the values closest to the decade targets.
         self.time_step = time_step
-        del time_step
-        TAUS_PER_DECADE = 10
+        self.max_tau = max_tau
+        del time_step, max_tau
         KEY_TAU_SELECTION = 2 # use third entry in tau targets as key value for extrapolation
-        scale = 10**(1/TAUS_PER_DECADE)
-        # these will be reverse indexed and also set the range:
+        print('timestep = ', self.time_step, ' tau mode = ', self.tau_mode)
 
-        self.tau_index_dict = {}
-        self.tau_values = [0] # will be removed later
+        candidates = self._tau_candidates()
+        rounded = self.time_step * np.round(candidates/self.time_step)
+        rounded = rounded[rounded > 0]
         # at low averaging time the list is pruned to avoid duplicates
-        real_tau = 0.001
-        print('timestep = ', self.time_step)
-        rounded_tau = self.time_step * round(real_tau/self.time_step)
-        # print('real tau = ', real_tau, ' --> ', rounded_tau)
+        multiples = np.unique(np.round(rounded/self.time_step).astype(np.int64))
+        if len(multiples) < 1:
+            multiples = np.array([1], dtype=np.int64)
+        self.tau_values = [float(tau) for tau in self.time_step * multiples]
+
+        self.tau_index_dict = {}
+        tau_array = np.array(self.tau_values)
         for target in self.tau_targets:
-            while real_tau < target:
-                last_tau = rounded_tau
-                real_tau *= scale
-                rounded_tau = self.time_step * round(real_tau/self.time_step)
-                # print('real tau = ', real_tau, ' --> ', rounded_tau)
-                if rounded_tau > self.tau_values[-1]:
-                    # do not add redunant values to the tau list
-                    self.tau_values.append(rounded_tau)
-            # now we jumped over a target value:
             key = int(target) # put integer numbers into keys
-            if len(self.tau_values) < 2:
-                self.tau_index_dict[key] = 0
-            elif abs(self.tau_values[-1] - target) < abs(self.tau_values[-2] - target):
-                self.tau_index_dict[key] = len(self.tau_values) - 1 - 1 # last element
+            if target > 2 * tau_array[-1]:
+                # out of range: index past the end shows as missing in the table
+                self.tau_index_dict[key] = len(self.tau_values)
             else:
-                self.tau_index_dict[key] = len(self.tau_values) - 2 - 1 # 2nd-to-last element
-        self.tau_values = self.tau_values[1:-1] # drop first dummy element
+                self.tau_index_dict[key] = int(np.argmin(np.abs(tau_array - target)))
         #print('list of taus: ', self.tau_values)
         #print('dictionary of indices of major tau values: ', self.tau_index_dict)
-        if KEY_TAU_SELECTION < len(self.tau_index_dict):
-            self.key_tau_index = self.tau_index_dict[self.tau_targets[KEY_TAU_SELECTION]]
-        else:
-            self.key_tau_index = self.tau_values[-1] # use last possible
+        self.key_tau_index = self.tau_index_dict[int(self.tau_targets[KEY_TAU_SELECTION])]
+        if self.key_tau_index >= len(self.tau_values):
+            self.key_tau_index = len(self.tau_values) - 1 # use last possible
         print(
             'index to key tau value: ', self.key_tau_index,
             ': tau = ',self.tau_values[self.key_tau_index], ' s'
             )
+        self._layout_changed = True
+
+    #######################################################################
+    def settings(self):
+        """ snapshot of the calculation settings, unaffected by later changes in the GUI """
+        return ADevSettings(
+            self.time_step, tuple(self.tau_values), self.key_tau_index, self.gap_aware,
+            self.statistic
+            )
+
+    #######################################################################
+    def estimate_cost(self, length):
+        """ rough run time estimate (s) for overlapping ADev of a series of given length """
+        OPS_PER_SECOND = 2E8 # numpy element operations, conservative
+        OPS_PER_POINT = 20 # allantools oadev: cumulative sum, differences, squares
+        return length * len(self.tau_values) * OPS_PER_POINT / OPS_PER_SECOND
+
+    #######################################################################
+    def use_coarse(self, length, series_count):
+        """ check if a full calculation would exceed the time budget """
+        if self.time_budget <= 0:
+            return False
+        return self.estimate_cost(length) * series_count > self.time_budget
 
     #######################################################################
     def add_channel_adev(self, index, adev):
         """ channel: store dataset object generated by Allantools """
         self.channel_adev[index] = adev
-        
+        self._dirty_columns.add(index)
+
     #######################################################################
     def add_evaluation_adev(self, index, adev):
         """ evaluation: store dataset object generated by Allantools """
         self.evaluation_adev[index] = adev
+        self._dirty_columns.add(self._logic.channel_table.count + index)
 
     #######################################################################
     # table data interface used by QTableView
@@ -110,133 +224,142 @@ class ADevTableModel(QtCore.QAbstractTableModel):
         if orientation != QtC.Vertical:
             return None
         if role == QtC.DisplayRole:
-            if row == 0:
-                return 'τ (s)'
-            if row < self.ROW_NUMBER-2:
-                target_index = row - 1
-                try:
-                    target_key = int(self.tau_targets[target_index])
-                    index = self.tau_index_dict[target_key]
-                    return '{:0,.1f}'.format(self.tau_values[index])
-                except (IndexError, KeyError) as exception:
-                    return 'undefined'
-            if row == self.ROW_NUMBER-2:
-                return 'time span'
-            if row == self.ROW_NUMBER-1:
-                return 'extrapol.'
+            if row < len(self._row_headers):
+                return self._row_headers[row]
         elif role == QtC.TextAlignmentRole:
             return QtC.AlignRight | QtC.AlignVCenter
         return None
-#
-#            (taus_used, adev, adeverror, adev_n) = allantools.oadev(
-#                values, data_type='freq', rate=self.time_step, taus='decade'
-#                )
-#            # scale to fractional values according to table settings
-#            adev /= reference_values[ch_index]
-#            adeverror /= reference_values[ch_index]
-            #print('channel index: ', index)
-            #print('taus: ',taus_used)
-            #print('adev: ',adev)
-            #print("adeverror: ",adeverror)
-#            del adev_n
-#            new_adev_obj.add_data(ch_index, taus_used, adev, adeverror)
-#        #update overall adev object
 
+    #######################################################################
     def data(self, index, role):
+        """ TableView: return formatted data """
         if not index.isValid():
             return None
         row = index.row()
         col = index.column()
-        ch_col = col
-        eval_col = col - self._logic.channel_table.count
-        if (ch_col < 0) or (ch_col >= self._logic.channel_table.count):
-            ch_col = None
-        if (eval_col < 0) or (eval_col >= self._logic.evaluation_table.count):
-            eval_col = None
-        #print('col: ',col,' --> ',ch_col,'  /  ',eval_col)
-
-        ##### channel / evaluation headings #####
-        # included as regular cell because headers cannot be colored
-        if row == 0:
-            if role == QtC.DisplayRole:
-                if ch_col is not None:
-                    # channel table uses a numpy array for storage
-                    name = (
-                        'C' + str(ch_col+1) + ': '
-                        + self._logic.channel_table.parameters[ch_col]['name'].decode('UTF-8')+''
-                    )
-                elif eval_col is not None:
-                    # evaluation table uses a dictionary
-                    name = (
-                        'E' + str(eval_col+1) + ': '
-                        + self._logic.evaluation_table.parameters[eval_col]['name'][0:6]+''
-                        )
-                else:
-                    name = 'Eval. {:2f}'.format(col+1)
-                return name
-            elif role == QtC.BackgroundColorRole:
-                if ch_col is not None:
-                    return self._logic.channel_table.parameters[ch_col]['color']
-                elif eval_col is not None:
-                    return self._logic.evaluation_table.parameters[eval_col]['color']
-                else:
-                    return QtGui.QColor(214, 73, 183)
-            elif role == QtC.ForegroundRole:
-                return self._logic.BLACK
-            elif role == QtC.TextAlignmentRole:
-                return QtC.AlignCenter
-            return None
-
-        ##### main data display #####
+        if col >= len(self._display):
+            return None # not formatted yet
         if role == QtC.DisplayRole:
-            ##### integrate error indication for missing data #####
-            try:
-                ##### ADev for channels #####
-                if ch_col is not None:
-                    adev = self.channel_adev[ch_col]
-                ##### ADev for evaluations #####
-                elif eval_col is not None:
-                    adev = self.evaluation_adev[eval_col]
-                else:
-                    return '...'
-                ##### Display: Allan deviation data #####
-                if row < self.ROW_NUMBER-2:
-                    ##### pick tau, fail gracefully if not available #####
-                    target_index = row - 1
-                    try:
-                        target_key = int(self.tau_targets[target_index])
-                        index = self.tau_index_dict[target_key]
-                        return '{:8.2E}'.format(
-                            adev['frac_devs'][index]
-                            )
-                    except IndexError as exception:
-                        return '---'
-                ##### Display: time span #####
-                elif row == self.ROW_NUMBER-2:
-                    return '{:8,.0f}'.format(adev['time_span'])
-                ##### Display: predicted uncertainty #####
-                elif row == self.ROW_NUMBER-1:
-                    return '{:5.2E}'.format(adev['dev_ext']/adev['ref'])                
-                ##### Display: we have no idea what to put on this row #####
-                else:
-                    return 'row error'
-            ##### asked for something that does not exist #####
-            except KeyError as exception:
-                return 'X'
-
-            #string = "{0:{1}>5,.1f}".format(self.data[row]['band']," ")
-            # pad with digit-sized space
+            return self._display[col][row]
         elif role == QtC.TextAlignmentRole:
             return QtC.AlignCenter
-
+        elif row == 0:
+            ##### channel / evaluation headings #####
+            # included as regular cell because headers cannot be colored
+            if role == QtC.BackgroundColorRole:
+                return self._column_color(col)
+            elif role == QtC.ForegroundRole:
+                return self._logic.BLACK
         elif role == QtC.BackgroundColorRole:
-            try:
-                key = int(self.tau_targets[row-1])
-                tau_index = self.tau_index_dict[key]
-                # print('checking: ', tau_index, ' // ', self.key_tau_index)
-                if tau_index == self.key_tau_index:                    
-                    return self._logic.BLACK
-            except (KeyError, IndexError) as error:
-                pass
-            return None
+            if row == self._key_row:
+                return self._logic.BLACK
         return None
+
+    #######################################################################
+    def _tau_rows(self):
+        """ tau index shown in each ADev row, None where the tau target is undefined """
+        indices = []
+        for target_index in range(self.ROW_NUMBER-3):
+            try:
+                indices.append(self.tau_index_dict[int(self.tau_targets[target_index])])
+            except (IndexError, KeyError):
+                indices.append(None)
+        return indices
+
+    #######################################################################
+    def _column_color(self, col):
+        """ background color of the heading cell """
+        ch_count = self._logic.channel_table.count
+        if col < ch_count:
+            return self._logic.channel_table.parameters[col]['color']
+        elif col - ch_count < self._logic.evaluation_table.count:
+            return self._logic.evaluation_table.parameters[col - ch_count]['color']
+        return QtGui.QColor(214, 73, 183)
+
+    #######################################################################
+    def _format_column(self, col, tau_rows):
+        """ formatted strings for all rows of one column """
+        ch_count = self._logic.channel_table.count
+        strings = ['X'] * self.ROW_NUMBER
+        if col < ch_count:
+            # channel table uses a numpy array for storage
+            strings[0] = (
+                'C' + str(col+1) + ': '
+                + self._logic.channel_table.parameters[col]['name'].decode('UTF-8')
+                )
+            adev = self.channel_adev.get(col)
+        elif col - ch_count < self._logic.evaluation_table.count:
+            # evaluation table uses a dictionary
+            strings[0] = (
+                'E' + str(col-ch_count+1) + ': '
+                + self._logic.evaluation_table.parameters[col-ch_count]['name'][0:6]
+                )
+            adev = self.evaluation_adev.get(col-ch_count)
+        else:
+            strings[0] = 'Eval. {:2f}'.format(col+1)
+            return strings[:1] + ['...'] * (self.ROW_NUMBER-1)
+        if adev is None: # no results yet
+            return strings
+        ##### Display: Allan deviation data #####
+        selected = self.select(adev)
+        for (row, tau_index) in enumerate(tau_rows, start=1):
+            # coarse (non-overlapping) estimates are marked until refined
+            if tau_index is None or tau_index >= len(selected['frac_devs']):
+                strings[row] = '---'
+            elif not np.isfinite(selected['frac_devs'][tau_index]):
+                strings[row] = '---'
+            else:
+                prefix = '~' if selected['pending'][tau_index] else ''
+                strings[row] = prefix + '{:8.2E}'.format(selected['frac_devs'][tau_index])
+        ##### Display: time span #####
+        strings[self.ROW_NUMBER-2] = '{:8,.0f}'.format(adev['time_span'])
+        ##### Display: predicted uncertainty #####
+        strings[self.ROW_NUMBER-1] = '{:5.2E}'.format(adev['dev_ext']/adev['ref'])
+        return strings
+
+    #######################################################################
+    def _format_headers(self, tau_rows):
+        """ row headers: tau values, time span and extrapolation """
+        headers = ['τ (s)']
+        for tau_index in tau_rows:
+            if tau_index is None or tau_index >= len(self.tau_values):
+                headers.append('undefined')
+            else:
+                headers.append('{:0,.1f}'.format(self.tau_values[tau_index]))
+        return headers + ['time span', 'extrapol.']
+
+    #######################################################################
+    def update_view(self):
+        """
+        format columns with new results and notify view of changed cells,
+        format and redraw everything after changes to tau values or statistic
+        """
+        tau_rows = self._tau_rows()
+        count = self.columnCount(None)
+        if self._layout_changed or len(self._display) != count:
+            self._display = [self._format_column(col, tau_rows) for col in range(count)]
+            self._row_headers = self._format_headers(tau_rows)
+            self._key_row = None
+            for (row, tau_index) in enumerate(tau_rows, start=1):
+                if tau_index == self.key_tau_index:
+                    self._key_row = row
+            self._layout_changed = False
+            self._dirty_columns = set()
+            index_tl = self.createIndex(0, 0)
+            index_br = self.createIndex(
+                self.rowCount(None),
+                self.columnCount(None)
+                )
+            self.dataChanged.emit(index_tl, index_br, [QtC.DisplayRole])
+            self.headerDataChanged.emit(QtC.Vertical, 0, self.ROW_NUMBER-1)
+            return
+        for col in sorted(self._dirty_columns):
+            if col >= count:
+                continue
+            strings = self._format_column(col, tau_rows)
+            for row in range(self.ROW_NUMBER):
+                if strings[row] != self._display[col][row]:
+                    cell = self.createIndex(row, col)
+                    self.dataChanged.emit(cell, cell, [QtC.DisplayRole])
+            self._display[col] = strings
+        self._dirty_columns = set()
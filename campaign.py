@@ -0,0 +1,191 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+aggregation of per-file evaluation results over a measurement campaign
+Created on 2026/10/19
+@author: agent
+"""
+
+# Daily results are read from the results database (see resultstore.py),
+# raw data are never reloaded. The campaign value is the weighted mean of
+# the daily results, calculated in Decimal arithmetic to keep the 1E-19
+# resolution of frequency ratios.
+#
+# Weighting:
+#   stat   1/stat_unc**2, stat_unc being each day's extrapolated ADev (dev_ext)
+#   time   proportional to the time span of good data
+#   equal  all days with the same weight
+# The statistical uncertainty of the weighted mean is propagated from the
+# daily uncertainties. With scale_chi2, it is inflated by the Birge ratio
+# sqrt(chi2_red) when the scatter of daily values exceeds their uncertainty.
+# Systematic corrections and uncertainties are treated as fully correlated
+# between days: both are weighted means and do not average down.
+#
+# usage: python campaign.py DATABASE "EVALUATION NAME" [--days 90]
+
+import sys
+import time
+import argparse
+import decimal as dec
+
+from resultstore import ResultStore
+from timeconvert import MJD_UNIX_EPOCH
+
+WEIGHTINGS = ('stat', 'time', 'equal')
+
+###################################################################################################
+def select_latest(rows):
+    """ keep only the most recently stored result for each data file """
+    latest = {}
+    for row in rows:
+        previous = latest.get(row['data_file'])
+        if previous is None or row['stored'] > previous['stored']:
+            latest[row['data_file']] = row
+    return sorted(latest.values(), key=lambda row: row['mean_mjd'])
+
+###################################################################################################
+def aggregate(rows, weighting='stat', scale_chi2=False):
+    """
+    combine daily evaluation results (as returned by ResultStore.evaluations)
+    returns dictionary of campaign results, None if no usable results
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError('unknown weighting: ' + str(weighting))
+    with dec.localcontext() as context:
+        context.prec = 40
+        days = [
+            row for row in rows
+            if row['result'].is_finite() and row['stat_unc'].is_finite() and row['stat_unc'] > 0
+            ]
+        if not days:
+            return None
+        if weighting == 'stat':
+            weights = [1 / row['stat_unc']**2 for row in days]
+        elif weighting == 'time':
+            weights = [dec.Decimal(row['time_span'] or 0) for row in days]
+        else:
+            weights = [dec.Decimal(1)] * len(days)
+        weight_sum = sum(weights)
+        if weight_sum <= 0:
+            return None
+        norm = [weight / weight_sum for weight in weights]
+
+        result = sum(n * row['result'] for (n, row) in zip(norm, days))
+        # uncertainty propagation for the weighted mean, general weights
+        stat_var = sum(n**2 * row['stat_unc']**2 for (n, row) in zip(norm, days))
+        chi2 = sum(
+            (row['result'] - result)**2 / row['stat_unc']**2 for row in days
+            )
+        chi2_red = chi2 / (len(days) - 1) if len(days) > 1 else dec.Decimal('NaN')
+        birge = chi2_red.sqrt() if chi2_red.is_finite() else dec.Decimal(1)
+        if scale_chi2 and birge > 1:
+            stat_var *= birge**2
+        stat_unc = stat_var.sqrt()
+
+        sys_cor = _weighted(norm, days, 'sys_cor')
+        sys_unc = _weighted(norm, days, 'sys_unc')
+        target = days[0]['target']
+        uncert = (stat_unc**2 + sys_unc**2).sqrt()
+        deviation = result - target
+        mean_mjd = sum(n * dec.Decimal(row['mean_mjd']) for (n, row) in zip(norm, days))
+        return {
+            'name': days[0]['name'],
+            'type': days[0]['type'],
+            'weighting': weighting,
+            'days': len(days),
+            'skipped': len(rows) - len(days),
+            'mjd_first': min(row['mean_mjd'] for row in days),
+            'mjd_last': max(row['mean_mjd'] for row in days),
+            'mean_mjd': mean_mjd,
+            'time_span': sum(row['time_span'] or 0 for row in days),
+            'points': sum(row['points'] or 0 for row in days),
+            'result': result,
+            'stat_unc': stat_unc,
+            'sys_cor': sys_cor,
+            'sys_unc': sys_unc,
+            'uncert': uncert,
+            'target': target,
+            'deviation': deviation,
+            'frac_dev': deviation / result,
+            'frac_unc': uncert / result,
+            'chi2_red': chi2_red,
+            'birge_ratio': birge,
+            'files': [row['data_file'] for row in days]
+            }
+
+###################################################################################################
+def _weighted(norm, days, key):
+    """ weighted mean of a Decimal column, missing values count as zero """
+    return sum(
+        n * (row[key] if row[key].is_finite() else 0) for (n, row) in zip(norm, days)
+        )
+
+###################################################################################################
+def campaign( # pylint: disable=locally-disabled, too-many-arguments
+        store, name, mjd_min=None, mjd_max=None, config=None, weighting='stat', scale_chi2=False
+    ):
+    """ aggregate stored results of evaluation 'name' in MJD range """
+    rows = store.evaluations(name=name, mjd_min=mjd_min, mjd_max=mjd_max, config=config)
+    configs = set(row['config_hash'] for row in rows)
+    if len(configs) > 1:
+        print(
+            'campaign: results from ', len(configs), ' configurations, '
+            'using the most recent result for each data file'
+            )
+    return aggregate(select_latest(rows), weighting, scale_chi2)
+
+###################################################################################################
+def format_campaign(result):
+    """ text summary of campaign result """
+    lines = ['campaign: ' + result['name'] + ' (' + result['type'] + ')']
+    lines.append('  {:<14s}: {:d} ({:d} skipped)'.format('days', result['days'], result['skipped']))
+    lines.append('  {:<14s}: {:.3f} ... {:.3f}'.format(
+        'MJD', result['mjd_first'], result['mjd_last']
+        ))
+    lines.append('  {:<14s}: {:,.0f}'.format('time span (s)', result['time_span']))
+    lines.append('  {:<14s}: {:s}'.format('weighting', result['weighting']))
+    for (key, label, fmt) in (
+            ('result', 'result', 'f'),
+            ('stat_unc', 'stat. unc.', '.3E'),
+            ('sys_cor', 'syst. cor.', '.3E'),
+            ('sys_unc', 'syst. unc.', '.3E'),
+            ('uncert', 'total unc.', '.3E'),
+            ('deviation', 'deviation', '.3E'),
+            ('frac_dev', 'fract. dev.', '.3E'),
+            ('frac_unc', 'fract. unc.', '.3E'),
+            ('chi2_red', 'chi2 (red.)', '.2f')
+        ):
+        lines.append('  {:<14s}: '.format(label) + format(result[key], fmt))
+    return '\n'.join(lines)
+
+###################################################################################################
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(description='Aggregate stored results over a campaign.')
+    parser.add_argument('database', help='results database (result_db in config)')
+    parser.add_argument('name', help='evaluation name')
+    parser.add_argument('--days', type=float, default=None, help='use only the last DAYS days')
+    parser.add_argument('--mjd-min', type=float, default=None, help='first MJD')
+    parser.add_argument('--mjd-max', type=float, default=None, help='last MJD')
+    parser.add_argument('--config', default=None, help='configuration hash')
+    parser.add_argument('--weighting', choices=WEIGHTINGS, default='stat')
+    parser.add_argument(
+        '--scale-chi2', action='store_true', help='inflate statistical uncertainty by Birge ratio'
+        )
+    args = parser.parse_args(argv)
+    mjd_min = args.mjd_min
+    if args.days is not None:
+        mjd_min = time.time() / 86400 + MJD_UNIX_EPOCH - args.days
+    with ResultStore(args.database) as store:
+        result = campaign(
+            store, args.name, mjd_min, args.mjd_max, args.config, args.weighting, args.scale_chi2
+            )
+    if result is None:
+        print('campaign: no usable results found')
+        return 1
+    print(format_campaign(result))
+    return 0
+
+###################################################################################################
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,25 +20,28 @@ import numpy as np
 class ChannelTableModel(QtCore.QAbstractTableModel):
     """ adjust handling of data in config table """
 
-    COLUMN_NUMBER = 6
+    COLUMN_NUMBER = 7
     HEADER = (
-        "name", "baseline (Hz)", "limit", "corr. (MHz)",
+        "name", "baseline (Hz)", "limit", "outliers", "corr. (MHz)",
         "ADev ref. (MHz)", "mean value")
+    OUTLIER_METHODS = ('block', 'median') # block variance / rolling median and MAD
 
     def __init__(self, parent, logic, *args):
         super().__init__(parent, *args)
         self._logic = logic
         self.parameters = np.array(
-            [('f_CEO',   None, 12000000,   1, True,   100000000, 429e12, np.nan),               # pylint: disable=locally-disabled, bad-whitespace
-             ('f_rep',   None,   433500, 300, True,  1000000000,    1e9, 1000000000.123456789), # pylint: disable=locally-disabled, bad-whitespace
-             ('Sr beat', None, 58000000, 300, True,    80500000, 429e12, np.nan),                # pylint: disable=locally-disabled, bad-whitespace
-             ('In beat', None,  1500000,   0, False,  130000000, 317e12, np.nan)                 # pylint: disable=locally-disabled, bad-whitespace
+            [('f_CEO',   None, 12000000,   1, True,  b'block', 31,  100000000, 429e12, np.nan),               # pylint: disable=locally-disabled, bad-whitespace
+             ('f_rep',   None,   433500, 300, True,  b'block', 31, 1000000000,    1e9, 1000000000.123456789), # pylint: disable=locally-disabled, bad-whitespace
+             ('Sr beat', None, 58000000, 300, True,  b'block', 31,   80500000, 429e12, np.nan),                # pylint: disable=locally-disabled, bad-whitespace
+             ('In beat', None,  1500000,   0, False, b'block', 31,  130000000, 317e12, np.nan)                 # pylint: disable=locally-disabled, bad-whitespace
             ], dtype=[
                 ('name', 'S10'),
                 ('color', 'object'),
                 ('base', 'f8'),
                 ('tole', 'f8'),
                 ('filt', 'bool'),
+                ('ofil', 'S6'), # outlier detection method, see OUTLIER_METHODS
+                ('owin', 'i8'), # window length for rolling median outlier detection
                 ('corr', 'f8'),
                 ('aref', 'f8'),
                 ('mean', 'f8')
@@ -67,6 +70,12 @@ class ChannelTableModel(QtCore.QAbstractTableModel):
             self.parameters[index]['base'] = config[section].getint('baseline', 0)
             self.parameters[index]['tole'] = config[section].getfloat('tolerance', 0)
             self.parameters[index]['filt'] = config[section].getboolean('filter', False)
+            method = config[section].get('outlier_filter', 'block').lower()
+            if method not in self.OUTLIER_METHODS:
+                print("CT.set_from_config: Unknown outlier filter: ", method)
+                method = 'block'
+            self.parameters[index]['ofil'] = method
+            self.parameters[index]['owin'] = max(3, config[section].getint('outlier_window', 31))
             self.parameters[index]['corr'] = config[section].getfloat('correction', 0)
             self.parameters[index]['aref'] = config[section].getfloat('adev_reference', 1)
             self.parameters[index]['mean'] = np.nan
@@ -109,11 +118,13 @@ class ChannelTableModel(QtCore.QAbstractTableModel):
                 QtC.ItemIsEnabled | QtC.ItemIsSelectable
                 | QtC.ItemIsUserCheckable | QtC.ItemIsEditable
                 )
-        elif  col == 3:
-            return QtC.ItemIsEnabled | QtC.ItemIsSelectable | QtC.ItemIsEditable
-        elif col == 4:
+        elif col == 3:
+            return QtC.ItemIsEnabled | QtC.ItemIsSelectable | QtC.ItemIsUserCheckable
+        elif  col == 4:
             return QtC.ItemIsEnabled | QtC.ItemIsSelectable | QtC.ItemIsEditable
         elif col == 5:
+            return QtC.ItemIsEnabled | QtC.ItemIsSelectable | QtC.ItemIsEditable
+        elif col == 6:
             return QtC.ItemIsEnabled | QtC.ItemIsSelectable
         return QtC.ItemIsEnabled
 
@@ -142,11 +153,16 @@ class ChannelTableModel(QtCore.QAbstractTableModel):
             elif col == 2: # filter / tolerance
                 string = "{0:{1}>5,.1f}".format(self.parameters[row]['tole']," ")
                 # pad with digit-sized space
-            elif col == 3: # offset
+            elif col == 3: # outlier detection method
+                if self.parameters[row]['ofil'] == b'median':
+                    string = 'median {:d}'.format(self.parameters[row]['owin'])
+                else:
+                    string = 'block'
+            elif col == 4: # offset
                 string = '{:+,.3f}'.format(self.parameters[row]['corr']/1000000)
-            elif col == 4: # ADev refernce
+            elif col == 5: # ADev refernce
                 string = '{:,.0f}'.format(self.parameters[row]['aref']/1000000)
-            elif col == 5:
+            elif col == 6:
                 string = "{0:{1}>18,.6f}".format(self.parameters[row]['mean']," ") 
                 # pad with digit-sized space
             return string
@@ -157,20 +173,43 @@ class ChannelTableModel(QtCore.QAbstractTableModel):
                     return(QtC.Checked)
                 else: 
                     return(QtC.Unchecked)
+            if col == 3: # checked: rolling median filter
+                if self.parameters[row]['ofil'] == b'median':
+                    return QtC.Checked
+                return QtC.Unchecked
         if role == QtC.TextAlignmentRole:
             if( col == 1): # baseline value
                 return QtC.AlignRight | QtC.AlignVCenter
             elif( col == 2): # filter / tolerance
                 return QtC.AlignLeft | QtC.AlignVCenter
-            elif( col == 3): # offset
+            elif( col == 3): # outlier method
+                return QtC.AlignLeft | QtC.AlignVCenter
+            elif( col == 4): # offset
                 return QtC.AlignRight | QtC.AlignVCenter
-            elif( col == 4): # ADev reference
+            elif( col == 5): # ADev reference
                 return QtC.AlignRight | QtC.AlignVCenter
-            elif( col == 5): # mean
+            elif( col == 6): # mean
                 return QtC.AlignRight | QtC.AlignVCenter
 
         return None
 
+    #######################################################################
+    def setData(self, index, value, role):
+        """ QTableView interface: toggle outlier detection method """
+        if not index.isValid() or role != QtC.CheckStateRole or index.column() != 3:
+            return False
+        method = 'median' if value == QtC.Checked else 'block'
+        self._logic.set_outlier_method_passthru(index.row(), method)
+        return True
+
+    #######################################################################
+    def set_outlier_method(self, num_index, method):
+        """ select outlier detection method for a channel """
+        if num_index < 0 or num_index >= self.count or method not in self.OUTLIER_METHODS:
+            return False
+        self.parameters[num_index]['ofil'] = method
+        return True
+
     #######################################################################
     def set_mean(self, num_index, value):
         """ setter function for mean value """
@@ -9,10 +9,23 @@ Created on Fri Jun  16
 # pylint: disable=locally-disabled, bare-except, too-few-public-methods
 # pylint: disable=locally-disabled, too-many-locals
 import math
-from datetime import datetime, timezone
+import os
+import sqlite3
+import collections
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import decimal as dec
 import pandas
 import numpy as np
-import allantools
+
+import doubledouble as dd
+import deviations
+import filters
+import reportwriter
+import exporter
+import resultstore
+import timeconvert
+import timescan
 
 #from freqevalinternal import ADevData
 
@@ -45,9 +58,25 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
         self.filename = None
         self.ranges = [] # holds full data range for each channel later
         self._eval_data = [[]] # list of one empty list, will hold evaluation data later
+        self._eval_grids = [] # grid positions of evaluation data
+        self._adev_refine_queue = [] # series with coarse ADev results awaiting refinement
+        self._grid_index = None # position of each sample on regular time grid
+        self._time_index = None # gaps, duplicates and resyncs in time stamps, see timescan.py
+        self._range_sums = {'channels': [], 'evaluations': []} # prefix sums for range statistics
+        self._filter_key = None # settings used in last filter_data call
+        self.adev_statistics = None # limit ADev calculation to these statistics, None for all
+        self.bootstrap = {} # (kind, index): bootstrap confidence intervals, see bootstrap_adev
+        # intermediate filter results for incremental re-filtering after mask changes
+        self._filter_stage = None
+        self._mask_changed = None # (start, end, channel bits) since last filter run
+        history = logic.config['CONFIG'].getint('mask_history', 200)
+        self._mask_undo = collections.deque(maxlen=max(1, history))
+        self._mask_redo = collections.deque(maxlen=max(1, history))
 
-    def load_file(self, filename):
+    def load_file(self, filename, activate=True):
         """load data from a frequency csv file"""
+        # activate=False leaves the shared table models untouched, so that files
+        # can be loaded in a background thread (see prefetcher.py)
         col_names = ['tstr', 'stat', 'time', 'frq1', 'frq2', 'frq3', 'frq4']        
         data_frame = pandas.read_csv(
             filename,
@@ -89,15 +118,17 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
                 row[COL.FLAG] |= flag << 16 # all channel reject for flagged bad data
                 row[COL.FLAG] |= flag << 0 # all channel reject for flagged bad data
 
-        self._tday = math.floor(min(self._data[:, COL.TIME])/86400)
-        self._tmin = self._tday * 86400
-        min(self._data[:, COL.TIME])
+        self._tmin = float(timeconvert.midnight(min(self._data[:, COL.TIME])))
+        self._tday = int(self._tmin // timeconvert.SECONDS_PER_DAY)
         print("minimum time: ", self._tmin, " ( = ", self._tday, " days since epoch )")
 
         self._data[:, COL.TIME] -= self._tmin
 
-        all_time_steps = self._data[1:-1, COL.TIME] - self._data[0:-2, COL.TIME]
-        self._logic.adev_table.generate_taus(np.median(all_time_steps))
+        # single pass over time stamps, also determines the median time step
+        self._time_index = timescan.scan_timestamps(self._data[:, COL.TIME])
+        print("time stamps: ", timescan.summary(self._time_index))
+        if activate:
+            self.activate()
 
         baselines = self._logic.channel_table.parameters['base']
         print("baselines: ", baselines)
@@ -120,28 +151,289 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
 
         return len(self._data)
 
+    ########################################################################################
+    def typed_columns(self):
+        """ time, channel values (baseline subtracted) and flags as float64 array """
+        columns = np.empty((len(self._data), COL.CHANNELS + 2), dtype=np.float64)
+        columns[:, 0] = self._data[:, COL.TIME]
+        columns[:, 1:COL.CHANNELS+1] = self._data[:, COL.CH1:COL.CH1+COL.CHANNELS]
+        columns[:, -1] = self._flag_array()
+        return columns
+
+    ########################################################################################
+    def load_columns(self, columns, tmin, filename=None, activate=True):
+        """ set up data from typed_columns() of a loaded file, with the same baselines """
+        self._data = np.empty((len(columns), COL.FLAG+1), dtype=object)
+        self._data[:, 0] = ''
+        self._data[:, COL.STAT] = 'GOOD' # bad status is kept in the flags
+        self._data[:, COL.TIME] = columns[:, 0]
+        self._data[:, COL.CH1:COL.CH1+COL.CHANNELS] = columns[:, 1:COL.CHANNELS+1]
+        self._data[:, COL.FLAG] = columns[:, -1].astype(np.uint32)
+        self._cache = {} # clear cache
+        self.filename = filename
+        self._tmin = tmin
+        self._tday = int(tmin // timeconvert.SECONDS_PER_DAY)
+        self._time_index = timescan.scan_timestamps(columns[:, 0])
+        if activate:
+            self.activate()
+        return len(self._data)
+
+    ########################################################################################
+    def activate(self):
+        """ set up shared table models for this data set """
+        # overlapping ADev needs at least two averaging intervals
+        max_tau = (self._data[-1, COL.TIME] - self._data[0, COL.TIME]) / 2
+        self._logic.adev_table.generate_taus(self._time_index['time_step'], max_tau)
+
+    ########################################################################################
+    def point_count(self):
+        """ number of loaded points """
+        return 0 if self._data is None else len(self._data)
+
+    ########################################################################################
+    def memory_estimate(self):
+        """ approximate memory use in bytes, including cached selections """
+        if self._data is None:
+            return 0
+        # object array: one pointer plus one boxed value per element
+        size = self._data.nbytes + self._data.size * 32
+        for value in self._cache.values():
+            size += getattr(value, 'nbytes', 0)
+        if self._filter_stage is not None:
+            stage = self._filter_stage
+            size += stage['base_flags'].nbytes + stage['channel_data'].nbytes
+            size += sum(array.nbytes for array in stage['good'] + stage['rejected'])
+        return size
+
+    ########################################################################################
+    def filter_key(self, overhangs, threshold):
+        """ snapshot of all settings that affect filter results """
+        # baselines are included, they are subtracted when loading
+        config = self._logic.config['CONFIG']
+        parameters = self._logic.channel_table.parameters
+        return (
+            tuple(overhangs), threshold,
+            tuple(parameters[key].tobytes() for key in ('base', 'tole', 'filt', 'ofil', 'owin')),
+            config.get('resync_reject_before', ''), config.get('resync_reject_after', '')
+            )
+
+    ########################################################################################
+    def is_filtered(self, overhangs, threshold):
+        """ check if filters were applied with the current settings """
+        return self._filter_key == self.filter_key(overhangs, threshold)
+
     ########################################################################################
     def filter_data(self, overhangs, threshold):
         """ reset data filters (except mask) and re-apply """
-        bitmask = 0xFF000000
+        # Detection works on typed copies of the data, one worker thread per
+        # channel. The numpy and pandas kernels release the GIL, so channels are
+        # processed in parallel. Rejections are merged into the flags (including
+        # transfers from critical channels) after each of the two filter stages.
+        # settings are taken at the start, later changes make the result outdated
+        self._filter_key = self.filter_key(overhangs, threshold)
+        parameters = self._logic.channel_table.parameters
+        tolerances = parameters['tole']
+        is_critical = parameters['filt']
+        if len(is_critical) != COL.CHANNELS or len(tolerances) != COL.CHANNELS:
+            print("Need band and critical channel specification for ", COL.CHANNELS, " channels.")
+            return
+        flags = self._flag_array()
+        flags &= 0xFF000000 # clear everything except manual mask bits
+        flags |= flags >> 24 # update overall flags
+        # counter resync at UTC 0:00 leaves bad data marked GOOD, reject for all channels
+        resynced = timescan.resync_rejections(
+            self._data[:, COL.TIME], self.get_time_index(),
+            self._logic.config['CONFIG'].getfloat('resync_reject_before', 0),
+            self._logic.config['CONFIG'].getfloat('resync_reject_after', 0)
+            )
+        flags[resynced] |= 0b11111111 << 16 # bad-by-transfer
+        channel_data = np.array(
+            self._data[:, COL.CH1:COL.CH1+COL.CHANNELS], dtype=np.float64
+            )
+        workers = min(COL.CHANNELS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            rejected = self.filter_unlocked(executor, channel_data, tolerances, overhangs)
+            self._merge_rejections(flags, rejected, is_critical)
+            # band and transfer rejections do not depend on the mask, keep them
+            base_flags = flags & 0x00FFFF00
+            good = self._outlier_candidates(flags)
+            rejected = self.filter_outliers(
+                executor, channel_data, flags, threshold,
+                parameters['ofil'], parameters['owin']
+                )
+            self._merge_rejections(flags, rejected, is_critical)
+        self._filter_stage = {
+            'base_flags': base_flags,
+            'channel_data': channel_data,
+            'good': good,
+            'rejected': rejected
+            }
+        self._mask_changed = None
+        self._finish_filter(flags)
 
-        for row in self._data:
-            # clear everything except manual mask bits, update overall flags
-            row[COL.FLAG] &= bitmask
-            row[COL.FLAG] |= row[COL.FLAG] >> 24
-        
-        tolerances = self._logic.channel_table.parameters['tole']
-        # print("tolerances: ", tolerances)
-        is_critical = self._logic.channel_table.parameters['filt']
-        # print("apply filters: ", filters)
-        self.filter_unlocked(tolerances, is_critical, overhangs)
-        self.filter_outliers(threshold, is_critical, overhangs)
-        self.filter_gather_results()
+    ########################################################################################
+    def _finish_filter(self, flags):
+        """ store merged flags and rebuild everything derived from them """
+        self.filter_gather_results(flags)
+        self._data[:, COL.FLAG] = flags
         self._cache = {} # clear cache
+        self._build_grid_index()
+        self._build_channel_range_sums(flags, self._filter_stage['channel_data'])
+
+    ########################################################################################
+    def refilter_mask(self, overhangs, threshold):
+        """
+        re-apply filters after mask changes, recalculating only the affected range
+        returns False if a full filter_data run is needed instead
+        """
+        stage = self._filter_stage
+        if stage is None or not self.is_filtered(overhangs, threshold):
+            return False
+        if self._mask_changed is None:
+            return True
+        (start, end, channel_bits) = self._mask_changed
+        parameters = self._logic.channel_table.parameters
+        mask = (self._flag_array() >> 24) & 0xFF
+        flags = stage['base_flags'] | (mask << 24) | mask
+        good = self._outlier_candidates(flags)
+        rejected = []
+        for ch_index in range(COL.CHANNELS):
+            if not channel_bits & (1 << ch_index):
+                rejected.append(stage['rejected'][ch_index]) # same good points as before
+                continue
+            rejected.append(filters.update_channel_outliers(
+                stage['channel_data'][:, ch_index], good[ch_index],
+                (stage['good'][ch_index], stage['rejected'][ch_index]),
+                parameters['ofil'][ch_index].decode('UTF-8'), int(parameters['owin'][ch_index]),
+                threshold, start, end
+                ))
+        self._merge_rejections(flags, rejected, parameters['filt'])
+        stage['good'] = good
+        stage['rejected'] = rejected
+        self._mask_changed = None
+        self._finish_filter(flags)
+        return True
+
+    ########################################################################################
+    def _flag_array(self):
+        """ typed copy of flag column """
+        # wrap at 32 bits like the uint32 column the flags were created from
+        return np.array(self._data[:, COL.FLAG], dtype=np.uint64).astype(np.uint32)
+
+    ########################################################################################
+    def get_time_index(self):
+        """ gap, duplicate and resync index of the time stamps, see timescan.py """
+        if self._time_index is None:
+            self._time_index = timescan.scan_timestamps(
+                self._data[:, COL.TIME], self._logic.adev_table.time_step
+                )
+        return self._time_index
+
+    ########################################################################################
+    def _build_grid_index(self):
+        """ position of every sample on the regular grid defined by the median time step """
+        # taken from the time index, good-point selections for all channels and
+        # evaluations pick their grid positions from this array
+        self._grid_index = self.get_time_index()['grid']
+
+    ########################################################################################
+    def get_good_grid_index(self, channel_list):
+        """ grid positions of the points marked as good for all channels in list """
+        channel_mask = 0
+        for channel in channel_list:
+            channel_mask |= (1 << channel) # look only at gathered flag
+        key = ('grid', channel_mask)
+        if key not in self._cache:
+            pick_list = self._data[:, COL.FLAG] & channel_mask == 0
+            self._cache[key] = self._grid_index[pick_list]
+        return self._cache[key]
+
+    ########################################################################################
+    def _build_channel_range_sums(self, flags, channel_data):
+        """ prefix sums over all points, counting only good points of each channel """
+        times = np.array(self._data[:, COL.TIME], dtype=np.float64)
+        self._range_sums['times'] = times
+        self._range_sums['channels'] = [
+            self._prefix_sums(
+                'C{:d}: '.format(ch_index+1)
+                + self._logic.channel_table.parameters[ch_index]['name'].decode('UTF-8'),
+                times, channel_data[:, ch_index], flags & (1 << ch_index) == 0
+                )
+            for ch_index in range(COL.CHANNELS)
+            ]
+        self._range_sums['evaluations'] = []
+
+    ########################################################################################
+    def _build_evaluation_range_sums(self):
+        """ prefix sums of evaluated time series, which contain only good points """
+        self._range_sums['evaluations'] = [
+            self._prefix_sums(
+                'E{:d}: '.format(index+1) + self._logic.evaluation_table.parameters[index]['name'],
+                np.ascontiguousarray(data[:, 0]), data[:, 1], np.ones(len(data), dtype=bool)
+                )
+            for (index, data) in enumerate(self._eval_data)
+            ]
+
+    ########################################################################################
+    def _prefix_sums(self, label, times, values, good):
+        """ cumulative good count, sum and sum of squares (with leading zero) of one series """
+        values = np.where(good, values, 0.0)
+        count = np.concatenate(([0], np.cumsum(good)))
+        # values are shifted by their mean to avoid cancellation in the variance
+        shift = values.sum() / max(1, count[-1])
+        shifted = np.where(good, values - shift, 0.0)
+        return {
+            'label': label,
+            'times': times,
+            'shift': shift,
+            'count': count,
+            'sum': np.concatenate(([0.0], np.cumsum(shifted))),
+            'sum_sq': np.concatenate(([0.0], np.cumsum(shifted**2)))
+            }
+
+    ########################################################################################
+    def range_statistics(self, tstart, tend):
+        """
+        point count, good points, time span, mean and standard deviation of all
+        channels and evaluations between relative times tstart and tend
+        """
+        if 'times' not in self._range_sums:
+            return []
+        if tend < tstart:
+            tstart, tend = tend, tstart
+        all_times = self._range_sums['times']
+        points = int(
+            np.searchsorted(all_times, tend, side='right')
+            - np.searchsorted(all_times, tstart, side='left')
+            )
+        statistics = []
+        for sums in self._range_sums['channels'] + self._range_sums['evaluations']:
+            start = np.searchsorted(sums['times'], tstart, side='left')
+            end = np.searchsorted(sums['times'], tend, side='right')
+            count = sums['count']
+            good = int(count[end] - count[start])
+            entry = {
+                'label': sums['label'], 'points': points, 'good': good,
+                'duration': 0.0, 'mean': np.nan, 'std': np.nan
+                }
+            if good > 0:
+                # first and last good point from the cumulative count
+                first = np.searchsorted(count, count[start] + 1, side='left') - 1
+                last = np.searchsorted(count, count[end], side='left') - 1
+                entry['duration'] = float(sums['times'][last] - sums['times'][first])
+                total = sums['sum'][end] - sums['sum'][start]
+                entry['mean'] = sums['shift'] + total / good
+                if good > 1:
+                    total_sq = sums['sum_sq'][end] - sums['sum_sq'][start]
+                    variance = (total_sq - total**2 / good) / (good - 1)
+                    entry['std'] = math.sqrt(max(variance, 0.0))
+            statistics.append(entry)
+        return statistics
 
     ########################################################################################
     def load_maskfile(self, maskfile):
         """load data from a frequency csv file"""
+        self._filter_stage = None # mask from file is not tracked, filter again
         col_names = ['chan','day', 'start', 'end']
         try:
             maskdata = pandas.read_csv(
@@ -150,48 +442,27 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
                 engine='c',
                 error_bad_lines=False,
                 warn_bad_lines=True,
-                parse_dates=['start','end'],
+                dtype={'start': str, 'end': str}, # converted by timeconvert below
                 #dtype = ['int32', 'int32', 'string', 'string']#,
                 converters={"chan": lambda x: int(x, 2)}
             )
         except FileNotFoundError as error:
             print("no mask file found.")
             maskdata = []
-        for index in range(len(maskdata)):
+        if len(maskdata) > 0:
             # convert to timestamp relative to data reference point of previous UTC midnight
-            start_timestring = maskdata.ix[index, 'start']
-            try:
-                start_datetime = datetime.strptime(start_timestring.strip(), "%H:%M:%S")
-                start_datetime = start_datetime.replace( 
-                    tzinfo=timezone.utc, day=1, month=1, year=1970
+            days = pandas.to_numeric(maskdata['day'], errors='coerce').values
+            start_seconds = timeconvert.parse_time_of_day(maskdata['start'].values)
+            end_seconds = timeconvert.parse_time_of_day(maskdata['end'].values)
+            failed = np.count_nonzero(np.isnan(start_seconds) | np.isnan(end_seconds))
+            if failed > 0:
+                print("Conversion error: ", failed, " mask block(s) not in HH:MM:SS format")
+            maskdata['start'] = np.where(
+                np.isnan(start_seconds), 0, start_seconds + days * timeconvert.SECONDS_PER_DAY
+                )
+            maskdata['end'] = np.where(
+                np.isnan(end_seconds), 0, end_seconds + 0.05 + days * timeconvert.SECONDS_PER_DAY
                 )
-                start_timestamp = start_datetime.timestamp()
-                start_timestamp += maskdata.ix[index, 'day'] * 86400
-            except ValueError as error:
-                print("Conversion error: ",error)
-                start_timestamp = 0
-            maskdata.ix[index, 'start'] = start_timestamp
-            # start_datetime2 = datetime.utcfromtimestamp(start_timestamp + self._tmin)
-            
-            end_timestring = maskdata.ix[index, 'end']
-            try:
-                end_datetime = datetime.strptime(end_timestring.strip(), "%H:%M:%S")
-                end_datetime = end_datetime.replace( 
-                    tzinfo=timezone.utc, day=1, month=1, year=1970
-                    )
-                end_timestamp = end_datetime.timestamp() + 0.05
-                end_timestamp += maskdata.ix[index, 'day'] * 86400
-            except ValueError as error:
-                print("Conversion error: ",error)
-                end_timestamp = 0            
-            maskdata.ix[index, 'end'] = end_timestamp
-            # end_datetime2 = datetime.utcfromtimestamp(end_timestamp + self._tmin)
-            # diagnostic:
-            # print('start: ' + str(start_timestring)
-            #    + ' -> ' + str(start_timestamp) + ' -> ' + start_datetime2.isoformat()
-            #    + '  /  end: ' + str(end_timestring)
-            #    + ' -> ' + str(end_timestamp) + ' -> ' + end_datetime2.isoformat()
-            #    )
         if(len(maskdata) == 0):
             # no data
             return(False, 0)        
@@ -308,129 +579,240 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
             return 0
         
         print('Mask: masking points from index ', start_index, ' to ', end_index)
-        self._data[int(start_index):int(end_index+1), COL.FLAG] |= flags
-        self._cache = {} # clear cache
+        start_index = int(start_index)
+        end_index = int(end_index)
+        # undo information: previous mask bits in the range, run-length encoded
+        previous = (self._flag_array()[start_index:end_index+1] >> 24) & 0xFF
+        offsets = np.concatenate(([0], np.flatnonzero(previous[1:] != previous[:-1]) + 1))
+        self._mask_undo.append((
+            start_index, end_index, flags & 0xFF,
+            offsets.astype(np.int32), previous[offsets].astype(np.uint8)
+            ))
+        self._mask_redo.clear()
+        self._apply_mask_bits(start_index, end_index, flags)
         return end_index - start_index + 1
+
+    ########################################################################################
+    def _apply_mask_bits(self, start_index, end_index, flags):
+        """ OR flags into range of flag column """
+        self._data[start_index:end_index+1, COL.FLAG] |= flags
+        self._cache = {} # clear cache
+        self._note_mask_change(start_index, end_index, flags & 0xFF)
+
+    ########################################################################################
+    def _note_mask_change(self, start_index, end_index, channel_bits):
+        """ extend range that needs re-filtering """
+        if self._mask_changed is not None:
+            (start, end, bits) = self._mask_changed
+            start_index = min(start, start_index)
+            end_index = max(end, end_index)
+            channel_bits |= bits
+        self._mask_changed = (start_index, end_index, channel_bits)
+
+    ########################################################################################
+    def undo_mask(self):
+        """ revert last mask operation, returns False if there is none """
+        if not self._mask_undo:
+            return False
+        change = self._mask_undo.pop()
+        (start_index, end_index, channel_bits, offsets, values) = change
+        previous = np.repeat(values, np.diff(np.append(offsets, end_index - start_index + 1)))
+        flags = self._flag_array()[start_index:end_index+1]
+        # gathered bits are rebuilt by the next filter run
+        flags = (flags & 0x00FFFFFF) | (previous.astype(np.uint32) << 24)
+        self._data[start_index:end_index+1, COL.FLAG] = flags
+        self._cache = {} # clear cache
+        self._note_mask_change(start_index, end_index, channel_bits)
+        self._mask_redo.append(change)
+        return True
+
+    ########################################################################################
+    def redo_mask(self):
+        """ re-apply last undone mask operation, returns False if there is none """
+        if not self._mask_redo:
+            return False
+        change = self._mask_redo.pop()
+        (start_index, end_index, channel_bits) = change[:3]
+        self._apply_mask_bits(start_index, end_index, channel_bits | (channel_bits << 24))
+        self._mask_undo.append(change)
+        return True
     
     ########################################################################################
     def save_maskfile(self, maskfile):
         """ save mask data """
-        result = False
-        message = 'undefined'
+        # blocks of consecutive points with identical mask flags
+        mask_flags = (self._flag_array() >> 24) & 0xFF
+        times = np.array(self._data[:, COL.TIME], dtype=np.float64)
+        changes = np.flatnonzero(mask_flags[1:] != mask_flags[:-1]) + 1
+        starts = np.concatenate(([0], changes))
+        ends = np.concatenate((changes - 1, [len(mask_flags) - 1]))
+        masked = mask_flags[starts] != 0x00 # write only blocks that *have* a mask
+        starts = starts[masked]
+        ends = ends[masked]
+        days = (times[starts] // timeconvert.SECONDS_PER_DAY).astype(np.int64) # multi-day runs
+        start_strings = timeconvert.utc_strings(times[starts] + self._tmin)
+        end_strings = timeconvert.utc_strings(times[ends] + self._tmin)
         try:
-            with open(maskfile,'w', encoding="ascii") as file:
-                outstring = 'channel ,day,  start  ,   end\n'
-                file.write(outstring)
-                flags = 0x00 # start with no mask set
-                timestamp_a = 0
-                timestamp_b = 0
-                for row in self._data:
-                    new_flags = (row[COL.FLAG] & 0xFF000000) >> 24
-                    if new_flags == flags:
-                        # still in the same block, push along timestamp_b
-                        timestamp_b = row[COL.TIME]
-                    else:                        
-                        # new block:
-                        # write out previous block: (flags) from (timestamp_a to timestamp_b)
-                        if flags != 0x00:
-                            #...but only if there *was* a mask
-                            print('({:08b}) for {:f} --> {:f}'.format(
-                                flags, timestamp_a, timestamp_b
-                                ))
-                            day = int(timestamp_a // 86400) # enable multi-day runs
-                            start_date = datetime.utcfromtimestamp(timestamp_a + self._tmin)                    
-                            end_date = datetime.utcfromtimestamp(timestamp_b + self._tmin)
-                            outstring = '{:08b},{:3d},{:>9s},{:>9s}\n'.format(
-                                flags, day, 
-                                start_date.strftime("%H:%M:%S"),
-                                end_date.strftime("%H:%M:%S")     
-                                )
-                            file.write(outstring)
-                        # in any case, initialize new block
-                        timestamp_a = timestamp_b = row[COL.TIME]
-                        flags = new_flags
-                    
-                # at end of loop, we need to write out final block
-                if flags != 0x00:
-                    #...but only if there *was* a mask
-                    print('({:08b}) for {:f} --> {:f}'.format(
-                        flags, timestamp_a, timestamp_b
+            with open(maskfile, 'w', encoding="ascii") as file:
+                file.write('channel ,day,  start  ,   end\n')
+                for (index, start) in enumerate(starts):
+                    file.write('{:08b},{:3d},{:>9s},{:>9s}\n'.format(
+                        int(mask_flags[start]), int(days[index]),
+                        start_strings[index], end_strings[index]
                         ))
-                    day = timestamp_a // 86400 # enable multi-day runs
-                    start_date = datetime.utcfromtimestamp(timestamp_a + self._tmin)                    
-                    end_date = datetime.utcfromtimestamp(timestamp_b + self._tmin)
-                    outstring = '{:08b},{:3d},{:>9s},{:>9s}\n'.format(
-                        flag, day, 
-                        start_date.strftime("%H:%M:%S"),
-                        end_date.strftime("%H:%M:%S")     
-                        )
-                    file.write(outstring)
-                result = True
-                message = 'ok'
         except (FileNotFoundError, PermissionError, IOError) as error:
-            errno, strerror = error.args 
-            result = False
-            message = 'Failed to open file '+maskfile+':\n'+strerror
-        finally:
-            file.close()
-        return(result, message)
+            return (False, 'Failed to open file '+maskfile+':\n'+str(error.strerror))
+        print(len(starts), ' mask block(s) written to ', maskfile)
+        return (True, 'ok')
 
     ########################################################################################
     def save_report(self, repfile):
-        """ generate and save report """
-        print("dummy: save report file to "+repfile)
-        return (False, "Not implemented.")
-        
-    ########################################################################################
-    def filter_unlocked(self, bands, is_critical, overhang):
-        """ mark where points are out of specified bands """
-        block_cnt = 0
-        block_forward   = overhang[0]     # pylint: disable=locally-disabled, bad-whitespace
-        block_backwards = overhang[1]
-
-        if len(is_critical) != COL.CHANNELS:
-            print("Need critical channel selection for ", COL.CHANNELS, " channels.")
-            return -1
-
-        if len(bands) != COL.CHANNELS:
-            print("Need band specification for ", COL.CHANNELS, " channels.")
-            return -1
+        """ generate and save report (and JSON twin) from current results """
+        if self._data is None:
+            return (False, 'No data loaded.')
+        report = self.report_data()
+        result, message = reportwriter.write_report(repfile, report)
+        database = self._logic.config['CONFIG'].get('result_db', '')
+        if result and database:
+            try:
+                with resultstore.ResultStore(database) as store:
+                    store.store_report(report)
+            except sqlite3.Error as error:
+                return (False, 'Failed to store results in ' + database + ':\n' + str(error))
+        return (result, message)
 
+    ########################################################################################
+    def report_data(self):
+        """ collect current evaluation results for report, does not re-run any analysis """
+        adev_table = self._logic.adev_table
+        channel_parameters = self._logic.channel_table.parameters
+        flags = self._flag_array()
+        report = {}
+        report['info'] = {
+            'version': reportwriter.REPORT_VERSION,
+            'data_file': self.filename,
+            'mjd': int(timeconvert.unix_to_mjd_day(self._tmin)),
+            'utc_first': timeconvert.iso_strings(self._tmin + self._data[0, COL.TIME]),
+            'utc_last': timeconvert.iso_strings(self._tmin + self._data[-1, COL.TIME]),
+            'points': len(self._data),
+            'time_step': adev_table.time_step,
+            'statistic': adev_table.statistic,
+            'config_hash': resultstore.config_hash(self._logic.config),
+            'time_scan': timescan.summary(self.get_time_index())
+            }
+        # point counts per channel, a point can be rejected for several reasons
+        report['channels'] = []
         for ch_index in range(COL.CHANNELS):
-            flag_bit = (1 << ch_index) << 8 # flag bit for single-channel filter-rejection
-            block_cnt = 0
-            for row in self._data:
-                # locate out-of_band data
-                if abs(row[COL.CH1+ch_index]) > bands[ch_index]:
-                    block_cnt = block_forward+1
-                # extend rejected data according to forward overhand:
-                if block_cnt > 0:
-                    block_cnt -= 1
-                    # set individual channel rejection flag:
-                    row[COL.FLAG] |= flag_bit
-            # second, backwards pass to extend rejected data according to backwards overhang
-            block_cnt = 0
-            for row in self._data[::-1]:
-                if row[COL.FLAG] & flag_bit != 0:
-                    block_cnt = block_backwards+1
-                if block_cnt > 0:
-                    block_cnt -= 1
-                    row[COL.FLAG] |= flag_bit # set filter-rejected flag
+            ch_flag = 1 << ch_index
+            par = channel_parameters[ch_index]
+            report['channels'].append({
+                'channel': ch_index+1,
+                'name': par['name'].decode('UTF-8'),
+                'baseline': par['base'],
+                'mean': par['mean'],
+                'tolerance': par['tole'],
+                'critical': par['filt'],
+                'outlier_filter': par['ofil'].decode('UTF-8'),
+                'good_points': int(np.count_nonzero(flags & ch_flag == 0)),
+                'filtered_points': int(np.count_nonzero(flags & (ch_flag << 8))),
+                'transferred_points': int(np.count_nonzero(flags & (ch_flag << 16))),
+                'masked_points': int(np.count_nonzero(flags & (ch_flag << 24)))
+                })
+        report['evaluations'] = []
+        for (index, par) in enumerate(self._logic.evaluation_table.parameters):
+            try:
+                points = len(self._eval_data[index])
+            except IndexError:
+                points = 0
+            report['evaluations'].append({
+                'name': par['name'],
+                'type': {1:'absolute', 2:'ratio'}.get(par['type'], 'none'),
+                'mean_mjd': float(
+                    timeconvert.relative_to_mjd(float(par['mean_time']), self._tmin)
+                    ),
+                'start_time': par['start_time'],
+                'stop_time': par['stop_time'],
+                'time_span': par['time_span'],
+                'points': points,
+                'relative': par['mean_relative'],
+                'baseline': par.get('baseline'),
+                'sys_cor': par.get('sys_cor'),
+                'sys_unc': par.get('sys_unc'),
+                'stat_unc': par['stat_unc_ext'],
+                'stat_unc_1s': par['stat_unc_1s'],
+                'uncert': par.get('uncert'),
+                'result': par.get('result'),
+                'target': par.get('target'),
+                'deviation': par.get('deviation'),
+                'frac_dev': par.get('frac_dev'),
+                'frac_unc': par.get('frac_unc')
+                })
+        series = []
+        labels = {}
+        for (index, adev) in sorted(adev_table.channel_adev.items()):
+            if adev is None:
+                continue
+            label = 'C{:d}: '.format(index+1) + channel_parameters[index]['name'].decode('UTF-8')
+            labels[('channel', index)] = label
+            series.append(self._report_adev(label, adev))
+        for (index, adev) in sorted(adev_table.evaluation_adev.items()):
+            if adev is None:
+                continue
+            label = 'E{:d}: '.format(index+1) + self._logic.evaluation_table.parameters[index]['name']
+            labels[('evaluation', index)] = label
+            series.append(self._report_adev(label, adev))
+        report['adev'] = {
+            'taus': list(adev_table.tau_values),
+            'key_tau': adev_table.tau_values[adev_table.key_tau_index],
+            'series': series
+            }
+        if self.bootstrap: # only if bootstrap_adev was run for the current results
+            report['bootstrap'] = [
+                dict(self.bootstrap[key], label=labels[key])
+                for key in sorted(self.bootstrap) if key in labels
+                ]
+        return report
 
-            # for critical channels (fCEO and frep), transfer rejection to all channels
-            if is_critical[ch_index]:
-                for row in self._data:
-                    if row[COL.FLAG] & flag_bit != 0:
-                        row[COL.FLAG] |= 0b11111111 << 16 # flag all channels as bad-by-transfer
+    ########################################################################################
+    def _report_adev(self, label, adev):
+        """ report entry for ADev results of one series """
+        stats = {}
+        for (name, entry) in adev.get('stats', {}).items():
+            stats[name] = {
+                key: entry[key] for key in (
+                    'taus', 'frac_devs', 'frac_devs_lower', 'frac_devs_upper', 'pending'
+                    )
+                }
+        return {
+            'label': label,
+            'ref': adev['ref'],
+            'time_span': adev['time_span'],
+            'good_time': adev['good_time'],
+            'points': adev['length'],
+            'key_tau': adev['key_tau'],
+            'key_alpha': adev['key_alpha'],
+            'alphas': adev['alphas'],
+            'frac_dev_1s': adev['dev_1s'] / adev['ref'],
+            'frac_dev_ext': adev['dev_ext'] / adev['ref'],
+            'stats': stats
+            }
 
+    ########################################################################################
+    def filter_unlocked(self, executor, channel_data, bands, overhang):
+        """ mark where points are out of specified bands, returns rejections per channel """
+        futures = [
+            executor.submit(
+                filters.band_rejections, channel_data[:, ch_index], bands[ch_index], overhang
+                )
+            for ch_index in range(COL.CHANNELS)
+            ]
+        return [future.result() for future in futures]
 
     ########################################################################################
-    def filter_outliers(self, threshold_factor, is_critical, overhang):
-        """ outlier/glitch detection """
-        # TODO: extend to better handle data with drift
+    def _outlier_candidates(self, flags):
+        """ points not rejected so far, for each channel """
+        candidates = []
         for ch_index in range(COL.CHANNELS):
-            freq_data = self._data[:,COL.CH1+ch_index]
-            
             ch_flag = 1 << ch_index
             combined_mask = (
                 ch_flag
@@ -438,69 +820,38 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
                 | ch_flag << 16
                 | ch_flag << 24
             )
-            #print('outliers: channel ',ch_index,' ---> ',combined_mask)
-            pick_list = self._data[:, COL.FLAG] & combined_mask == 0
-            freq_good = freq_data[pick_list]
-            length = freq_good.shape[0]
-            #print('size of selected data: ',length)
-            if length < 100:
-                continue # no remaining data
-            splits = math.ceil(length/300)
-            block_length = math.ceil(length/splits)
-            #print('actual block length: ',block_length)
-            meanlist = np.zeros(splits)
-            varlist = np.zeros(splits)
-            end_index = -1
-            for block in range(splits):
-                start_index = end_index + 1
-                end_index += block_length 
-                if end_index >= length:
-                    end_index = length # should be -1 ?
-                varlist[block] = np.var(freq_good[start_index:end_index])
-                # print("   (", block, ") ", meanlist[cnt], "+-", varlist[cnt], " Hz")
-
-            varlist[ (varlist == 0) ] = 1E6 # avoid divide by zero.
-            var = np.average(varlist, weights=1/varlist)
-            lim = math.sqrt(var) * threshold_factor
-            #print("weigthed mean of variance: ",var, " --> ", math.sqrt(var), " Hz")
-
-            # compare data to local mean, constrain to "good" limit of deviation
-            width = 2 # total block to average: center element plus X on each side
-            elements = 2 * width + 1
-            freq_filt = np.convolve(freq_data, np.ones((elements,))/elements, mode='same')
-            # left edge of data uses first full block average
-            for index in range(0, width):
-                if abs(freq_data[index]-freq_filt[width]) > lim:
-                    self._data[index, COL.FLAG] |= ch_flag << 8
-            # main region uses a sliding window average 
-            for index in range(width,len(freq_data)-width):
-                if abs(freq_data[index]-freq_filt[index]) > lim:
-                    self._data[index, COL.FLAG] |= ch_flag << 8
-            # left edge of data uses last full block average
-            for index in range(len(freq_data)-width, len(freq_data)):
-#                print('R (',index,')  ',freq_data[index],' <--> ',block_mean)                
-                if abs(freq_data[index]-freq_filt[len(freq_data)-width-1]) > lim:
-                    self._data[index, COL.FLAG] |= ch_flag << 8
+            candidates.append(flags & combined_mask == 0)
+        return candidates
+
+    ########################################################################################
+    def filter_outliers(self, executor, channel_data, flags, threshold_factor, methods, windows):
+        """ outlier/glitch detection, returns rejections per channel """
+        futures = []
+        for (ch_index, pick_list) in enumerate(self._outlier_candidates(flags)):
+            futures.append(executor.submit(
+                filters.channel_outliers, channel_data[:, ch_index], pick_list,
+                methods[ch_index].decode('UTF-8'), int(windows[ch_index]), threshold_factor
+                ))
+        return [future.result() for future in futures]
 
+    ########################################################################################
+    def _merge_rejections(self, flags, rejected, is_critical):
+        """ set filter flags for rejected points, transfer critical channel rejections """
+        for (ch_index, reject) in enumerate(rejected):
+            flag_bit = (1 << ch_index) << 8 # flag bit for single-channel filter-rejection
+            flags[reject] |= flag_bit
             # for critical channels (fCEO and frep), transfer rejection to all channels
             if is_critical[ch_index]:
-                flag_bit = ch_flag << 8
-                for row in self._data:
-                    if row[COL.FLAG] & flag_bit != 0:
-                        row[COL.FLAG] |= 0b11111111 << 16 # flag all channels as bad-by-transfer
+                flags[flags & flag_bit != 0] |= 0b11111111 << 16 # bad-by-transfer
 
     ########################################################################################
-    def filter_gather_results(self):
+    def filter_gather_results(self, flags):
         """ gather all individual rejections into merged convenience flag """
-        for ch_index in range(COL.CHANNELS):
-            for row in self._data:
-                masked_flags = (row[COL.FLAG] >> 24) & 0xFF
-                transfered_flags = (row[COL.FLAG] >> 16) & 0xFF
-                filtered_flags = (row[COL.FLAG] >> 8) & 0xFF
-                gathered_flags = masked_flags | transfered_flags | filtered_flags
-                row[COL.FLAG] &= 0xFFFFFF00 # clear old flag bits
-                row[COL.FLAG] |= gathered_flags # set new gathered flags
-                #print("   (", block, ") ", meanlist[cnt], "+-", varlist[cnt], " Hz")
+        masked_flags = (flags >> 24) & 0xFF
+        transfered_flags = (flags >> 16) & 0xFF
+        filtered_flags = (flags >> 8) & 0xFF
+        flags &= 0xFFFFFF00 # clear old flag bits
+        flags |= masked_flags | transfered_flags | filtered_flags # set new gathered flags
 
     ########################################################################################
     def get_good_points_multiple(self, channel_list):
@@ -569,6 +920,60 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
             return []
         return self._eval_data[eval_index]
 
+    ########################################################################################
+    def export_good_data(self, basename, channel, fmt='npy'):
+        """ export good data of a channel in chunks, returns (result, message) """
+        if channel >= COL.CHANNELS:
+            return (False, 'No channel {:d} in data.'.format(channel+1))
+        pick_list = self._flag_array() & (1 << channel) == 0 # look only at gathered flag
+        par = self._logic.channel_table.parameters[channel]
+        metadata = {
+            'data_file': self.filename,
+            'channel': channel+1,
+            'name': par['name'].decode('UTF-8'),
+            'baseline': float(par['base']),
+            'mjd': int(timeconvert.unix_to_mjd_day(self._tmin)),
+            'values': 'UNIX time (s), frequency - baseline (Hz)'
+            }
+        return exporter.export_series(
+            basename, ['time', 'ch{:d}'.format(channel+1)],
+            self._export_chunks(self._data, pick_list, [COL.TIME, COL.CH1+channel]),
+            int(np.count_nonzero(pick_list)), fmt, metadata
+            )
+
+    ########################################################################################
+    def export_evaluation(self, basename, eval_index, fmt='npy'):
+        """ export evaluated time series in chunks, returns (result, message) """
+        if eval_index >= len(self._eval_data):
+            return (False, 'No evaluation {:d} in data.'.format(eval_index+1))
+        data = self._eval_data[eval_index]
+        par = self._logic.evaluation_table.parameters[eval_index]
+        metadata = {
+            'data_file': self.filename,
+            'evaluation': eval_index+1,
+            'name': par['name'],
+            'baseline': str(par.get('baseline')), # Decimal, keep all digits
+            'mjd': int(timeconvert.unix_to_mjd_day(self._tmin)),
+            'values': 'UNIX time (s), result - baseline - systematic correction'
+            }
+        return exporter.export_series(
+            basename, ['time', 'eval{:d}'.format(eval_index+1)],
+            self._export_chunks(data, None, [0, 1]),
+            len(data), fmt, metadata
+            )
+
+    ########################################################################################
+    def _export_chunks(self, data, pick_list, columns):
+        """ float64 chunks of selected rows and columns, with UNIX time in first column """
+        # only one chunk is converted at a time, data is never copied as a whole
+        for start in range(0, len(data), exporter.CHUNK_ROWS):
+            block = data[start:start+exporter.CHUNK_ROWS] # view
+            if pick_list is not None:
+                block = block[pick_list[start:start+exporter.CHUNK_ROWS]]
+            chunk = np.array(block[:, columns], dtype=np.float64)
+            chunk[:, 0] += self._tmin
+            yield chunk
+
     ########################################################################################
     def get_mskd_points(self, channel):
         if channel >= COL.CHANNELS:
@@ -615,6 +1020,9 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
         """ evaluate filtered data """
         #new_adev_obj = ADevData(COL.CHANNELS) # make new object to store ADev data
         reference_values = self._logic.channel_table.parameters['aref']
+        self._adev_refine_queue = []
+        self.bootstrap = {}
+        series_count = COL.CHANNELS + self._logic.evaluation_table.count
 
         for ch_index in range(COL.CHANNELS):
             # TODO: This should not collect good data again, but use a buffered copy
@@ -622,117 +1030,99 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
             del range_info
             times = data[:,0]
             values = data[:,1]
+            grid = self.get_good_grid_index((ch_index,))
             meanval = np.mean(values)
             #print("mean of channel ",ch_index+1," is ",meanval)
             self._logic.channel_table.set_mean(ch_index, meanval)
             # prepare ADev data
-            adev = self.calculate_adev(values, reference_values[ch_index])
+            coarse = self._logic.adev_table.use_coarse(len(values), series_count)
+            adev = self.calculate_adev(
+                values, reference_values[ch_index], coarse, grid, self.adev_statistics
+                )
+            if coarse and adev is not None:
+                self._adev_refine_queue.append(('channel', ch_index, values, grid))
+            # None (no usable tau) leaves the table column and the plot empty
             self._logic.adev_table.add_channel_adev(ch_index, adev)
             # print('adev results for channel ', ch_index, '\n', adev)
 
     ########################################################################################
     def evaluate_eval_data(self):
         """ evaluate filtered data """
-        self._eval_data = []
-        for cnt in range(self._logic.evaluation_table.count):
+        # Evaluations are grouped by the set of channels they use. Each group needs
+        # one selection of good points, and one product with a coefficient matrix
+        # (one column per evaluation) gives all of its series in double-double precision.
+        count = self._logic.evaluation_table.count
+        self.bootstrap = {
+            key: entry for (key, entry) in self.bootstrap.items() if key[0] != 'evaluation'
+            }
+        self._eval_data = [np.zeros((0, 2))] * count
+        self._eval_grids = [None] * count
+        series_count = COL.CHANNELS + count
+        groups = {}
+        coefficients = {}
+        for cnt in range(count):
             params = self._logic.evaluation_table.parameters[cnt]
-            ###########################################################################
-            if params['type'] == 1: # absolute frequency mode
-                # print('(evaluation ',cnt,') absolute frequency : ',params['name'])
-                # absolute frequency in terms of maser reference is:
-                # f = fCEO + "n_a" * frep + f_beat
-                # f = fCEO(MEASURED) + "n_a"/"n_r" * frep(MEASURED) + f_beat(MEASURED) 
-                # f = baseline + fCEO(DEVIATION) + "n_a"/"n_r" * frep(DEVIATION) + f_beat(DEVIATION)
-                # negative channel indices indicate negative beat frequencies
-                ch_ceo = params['ch_ceo']-1
-                if ch_ceo < 0:
-                    s_ceo = -1 # set negative sign
-                else:
-                    s_ceo = +1 # set positive sign
-                ch_ceo = int(abs(ch_ceo))
-                ch_rep = int(abs(params['ch_rep'])-1)  # repetition rate is always positive
-                n_rep = params['n_rep'] # set f_rep harmonic
-                n_a = abs(params['n_a']) # set line index
-                ch_a = int(params['ch_a']-1)
-                if ch_a < 0:
-                    s_a = -1 # set negative sign
-                else:
-                    s_a = +1 # set positive sign
-                ch_a = int(abs(ch_a))
-
-                #print('calculating relative frequency as:')
-                #outstring = '{:+2.0f}*(CH{:1.0f}) {:+2.0f}*(CH{:1.0f})/{:2.0f} {:+2.0f}*(CH{:1.0f})'.format(
-                #    s_ceo, ch_ceo,
-                #    n_a, ch_rep, n_rep,
-                #    s_a, ch_a
-                #)
-                #print(outstring)
-                data= self.get_good_points_multiple((ch_ceo, ch_rep, ch_a))
-                row_vector = np.array([0, s_ceo, n_a/n_rep, s_a], dtype=np.float64) # relative frequency, see above
-                multiplier = float(params['multiplier'])
-                # print('multiplier: ',multiplier)
-                row_vector *= multiplier  # correction for In frequency
-                values = data.dot(row_vector)                
-                times = data[:,0]
-            ###########################################################################
-            elif params['type'] == 2: # frequency ratio mode                
-                #print('(evaluation ',cnt,') frequency ratio    : ',params['name'])
-                # frequency ratio is relative to comb line ratio is:
-                # R = r_ab + ( (fCEO + f_a) - r_ab ( fCEO + f_b ) ) / (n_b f_rep + fCEO + f_b)
-                # R = r_ab + ( (fCEO + f_a) - r_ab ( fCEO + f_b ) ) / f_target_b
-                #     with correction at 1E-6 relative to r_ab:
-                #     can afford 1E-13 deviation of true Sr frequency from target for 1E-19 accuracy
-                #     r_ab already contains multiplier.
-                ch_ceo = params['ch_ceo']-1
-                if ch_ceo < 0:
-                    s_ceo = -1 # set negative sign
-                else:
-                    s_ceo = +1 # set positive sign
-                ch_ceo = int(abs(ch_ceo))
-                r_ab = params['r_ab'] # set line ratio
-                ch_a = int(params['ch_a']-1)
-                if ch_a < 0:
-                    s_a = -1 # set negative sign
-                else:
-                    s_a = +1 # set positive sign
-                ch_a = int(abs(ch_a))
-                ch_b = int(params['ch_b']-1)
-                if ch_b < 0:
-                    s_b = -1 # set negative sign
-                else:
-                    s_b = +1 # set positive sign
-                ch_b = int(abs(ch_b))
-                # relative correction to ratio value
-                row_vector = np.array([0, s_ceo - s_ceo*r_ab, s_a, -s_b*r_ab], dtype=np.float64) 
-                # division by reference frequency is part of equation
-                # multiplier covers In fourth-harmonic generation
-                multiplier = float(params['multiplier'])
-                ref_b = float(params['ref_b'])
-                # print('multiplier: ',multiplier,'    reference (b): ', ref_b)
-                row_vector *= multiplier/ref_b
-
-                data= self.get_good_points_multiple((ch_ceo, ch_a, ch_b))
-                values = data.dot(row_vector)                
-                times = data[:,0]
-            ###########################################################################
+            channel_coefficients = self._evaluation_coefficients(params)
+            if channel_coefficients is None:
+                continue
+            coefficients[cnt] = channel_coefficients
+            channel_mask = 0
+            for channel in channel_coefficients:
+                channel_mask |= 1 << channel
+            groups.setdefault(channel_mask, []).append(cnt)
+
+        series = {}
+        for (channel_mask, members) in groups.items():
+            channels = [ch for ch in range(COL.CHANNELS) if channel_mask & (1 << ch)]
+            data = self.get_good_points_multiple(channels)
+            grid = self.get_good_grid_index(channels)
+            # coefficient matrix: column 0 of data is time, then channels in ascending order
+            coef_hi = np.zeros((len(channels)+1, len(members)))
+            coef_lo = np.zeros((len(channels)+1, len(members)))
+            for (col, cnt) in enumerate(members):
+                row_vector = [dec.Decimal(0)] + [
+                    coefficients[cnt].get(channel, dec.Decimal(0)) for channel in channels
+                    ]
+                coef_hi[:, col], coef_lo[:, col] = dd.vector_from_decimal(row_vector)
+            values_hi, values_lo = dd.dd_dot(data, coef_hi, coef_lo)
+            times = np.array(data[:, 0], dtype=np.float64)
+            for (col, cnt) in enumerate(members):
+                series[cnt] = (
+                    times, np.ascontiguousarray(values_hi[:, col]),
+                    np.ascontiguousarray(values_lo[:, col]), grid
+                    )
+
+        for cnt in range(count):
+            params = self._logic.evaluation_table.parameters[cnt]
+            if cnt in series:
+                (times, values, values_lo, grid) = series[cnt]
             else:
-                times = []
-                values = []
-            # print('shape of ...times:', times.shape, ' ...values', values.shape )                
-            rel_data = np.column_stack((times, values))                
-            #print('shape of resulting relative data: ', rel_data.shape)
-            #print('repr. of resulting relative data: ', repr(rel_data))
-            # store deviation from baseline for this channel:
-            self._eval_data.append(rel_data) 
+                times = np.array([])
+                values = np.array([])
+                values_lo = np.array([])
+                grid = None
+            # store deviation from baseline for this evaluation:
+            self._eval_data[cnt] = np.column_stack((times, values))
+            self._eval_grids[cnt] = grid
+            # mean value is accumulated in double-double precision, see doubledouble.py
+            mean_hi, mean_lo = dd.dd_mean(values, values_lo)
             self._logic.evaluation_table.set_means(
                 cnt,
                 np.mean(times),
                 times.min(),
                 times.max(),
-                np.mean(values)
+                dd.to_decimal(mean_hi, mean_lo)
+                )
+            coarse = self._logic.adev_table.use_coarse(len(values), series_count)
+            adev = self.calculate_adev(
+                values, float(params['target']), coarse, grid, self.adev_statistics
                 )
-            adev = self.calculate_adev(values, float(params['target']))
+            if coarse and adev is not None:
+                self._adev_refine_queue.append(('evaluation', cnt, values, grid))
             self._logic.adev_table.add_evaluation_adev(cnt, adev)
+            if adev is None:
+                self._logic.evaluation_table.set_statistics(cnt, np.nan, np.nan, np.nan)
+                continue
             self._logic.evaluation_table.set_statistics(
                 cnt,
                 adev['dev_1s'],
@@ -740,58 +1130,408 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
                 adev['time_span']
                 )
         # end of evaluation enumeration
+        self._build_evaluation_range_sums()
 
     ########################################################################################
-    def calculate_adev(self, values, reference):                       
-        """ calculate Allan deviation and confidence intervals """
-        time_step = self._logic.adev_table.time_step 
-        rate = 1/time_step
-        tau_req = self._logic.adev_table.tau_values
-        key_tau_index = self._logic.adev_table.key_tau_index
-        (tau_act, devs, errs, ns) = allantools.oadev(values, rate=rate, data_type='freq', taus=tau_req)
-        try:
-            key_tau = tau_act[key_tau_index]
-            key_dev = devs[key_tau_index]
-        except IndexError as err:
-            key_tau = tau_act[key_tau_index]
-            key_dev = devs[key_tau_index]
-        time_span = time_step * len(values)
-        dev_extrapolated = key_dev * math.sqrt(key_tau / time_span)
-        dev_1s = key_dev * math.sqrt(key_tau)
-        #print(
-        #    'from ', key_dev, ' @ ', key_tau, 's, extrapolated to ', 
-        #    dev_1s, ' @ 1s and ', dev_extrapolated, ' @ ',time_span, ' s.'
-        #    )
-        devs_lower = np.zeros_like(devs)
-        devs_upper = np.zeros_like(devs)
+    def _evaluation_coefficients(self, params):
+        """
+        coefficients of the relative evaluation result for each (zero-based) channel,
+        as dictionary of Decimal values, None for unknown evaluation type
+        """
+        ###########################################################################
+        if params['type'] == 1: # absolute frequency mode
+            # absolute frequency in terms of maser reference is:
+            # f = fCEO + "n_a" * frep + f_beat
+            # f = fCEO(MEASURED) + "n_a"/"n_r" * frep(MEASURED) + f_beat(MEASURED)
+            # f = baseline + fCEO(DEVIATION) + "n_a"/"n_r" * frep(DEVIATION) + f_beat(DEVIATION)
+            # negative channel indices indicate negative beat frequencies
+            ch_ceo = params['ch_ceo']-1
+            if ch_ceo < 0:
+                s_ceo = -1 # set negative sign
+            else:
+                s_ceo = +1 # set positive sign
+            ch_ceo = int(abs(ch_ceo))
+            ch_rep = int(abs(params['ch_rep'])-1)  # repetition rate is always positive
+            n_rep = params['n_rep'] # set f_rep harmonic
+            n_a = abs(params['n_a']) # set line index
+            ch_a = int(params['ch_a']-1)
+            if ch_a < 0:
+                s_a = -1 # set negative sign
+            else:
+                s_a = +1 # set positive sign
+            ch_a = int(abs(ch_a))
+            multiplier = params['multiplier'] # correction for In frequency
+            terms = (
+                (ch_ceo, multiplier * s_ceo),
+                (ch_rep, multiplier * n_a / n_rep),
+                (ch_a, multiplier * s_a)
+                )
+        ###########################################################################
+        elif params['type'] == 2: # frequency ratio mode
+            # frequency ratio is relative to comb line ratio is:
+            # R = r_ab + ( (fCEO + f_a) - r_ab ( fCEO + f_b ) ) / (n_b f_rep + fCEO + f_b)
+            # R = r_ab + ( (fCEO + f_a) - r_ab ( fCEO + f_b ) ) / f_target_b
+            #     with correction at 1E-6 relative to r_ab:
+            #     can afford 1E-13 deviation of true Sr frequency from target for 1E-19 accuracy
+            #     r_ab already contains multiplier.
+            ch_ceo = params['ch_ceo']-1
+            if ch_ceo < 0:
+                s_ceo = -1 # set negative sign
+            else:
+                s_ceo = +1 # set positive sign
+            ch_ceo = int(abs(ch_ceo))
+            r_ab = params['r_ab'] # set line ratio
+            ch_a = int(params['ch_a']-1)
+            if ch_a < 0:
+                s_a = -1 # set negative sign
+            else:
+                s_a = +1 # set positive sign
+            ch_a = int(abs(ch_a))
+            ch_b = int(params['ch_b']-1)
+            if ch_b < 0:
+                s_b = -1 # set negative sign
+            else:
+                s_b = +1 # set positive sign
+            ch_b = int(abs(ch_b))
+            # relative correction to ratio value
+            # division by reference frequency is part of equation
+            # multiplier covers In fourth-harmonic generation
+            scale = params['multiplier'] / params['ref_b']
+            terms = (
+                (ch_ceo, (s_ceo - s_ceo*r_ab) * scale),
+                (ch_a, s_a * scale),
+                (ch_b, -s_b * r_ab * scale)
+                )
+        else:
+            return None
+        channel_coefficients = {}
+        for (channel, coefficient) in terms:
+            if channel >= COL.CHANNELS:
+                print('channel specification ', channel, ' exceeds number of channels')
+                return None
+            # a channel used twice contributes the sum of its coefficients
+            channel_coefficients[channel] = (
+                channel_coefficients.get(channel, dec.Decimal(0)) + coefficient
+                )
+        return channel_coefficients
+
+    ########################################################################################
+    def calculate_adev( # pylint: disable=locally-disabled, too-many-arguments
+            self, values, reference, coarse=False, grid=None, statistics=None, cached=True,
+            settings=None
+        ):
+        """
+        calculate Allan deviation (and related statistics) with confidence intervals
+        returns None if the series is too short for any tau value
+        """
+        # coarse mode uses non-overlapping estimates, which are much faster at long tau.
+        # These are marked as pending and later replaced by refine_adev_step().
+        # If a grid index is given and gap-aware mode is active, gaps are excluded instead
+        # of joining the remaining data end-to-end.
+        # statistics limits the calculation to some statistics (others are NaN),
+        # such partial results are never cached.
+        # settings (from ADevTableModel.settings) replace the live table settings in
+        # worker threads, the cache is not used then.
+        cached = cached and statistics is None and settings is None
+        settings = self._adev_settings(settings)
+        tau_req = settings.tau_values
+        if cached:
+            cache_key = self.adev_cache_key(values, reference, grid)
+            adev = self._logic.adev_table.cache.get(cache_key)
+            if adev is not None:
+                return adev # complete result known, no need for coarse estimates either
+        if coarse:
+            statistics = ('oadev', 'hdev') # the only ones with non-overlapping estimates
+        elif statistics is None:
+            statistics = deviations.STATISTICS
+        (tau_act, devs) = self._adev_points(
+            values, tau_req, not coarse, grid, statistics, settings
+            )
+        if len(tau_act) == 0:
+            return None
         for (index, tau) in enumerate(tau_act):
             # sanity check tau values:
             if abs(tau-tau_req[index]) > 0.0001:
                 print('Tau value differs from expectation: ', tau,' != ',tau_req[index])
-            dev = devs[index]
-            # Greenhall's EDF (Equivalent Degrees of Freedom)
-            edf = allantools.edf_greenhall(
-                alpha=0, # assuming WFM noise  (alpha +2,...,-4   noise type)
-                d=2,     # 1: first-difference variance, 2: allan variance, 3: hadamard variance
-                m=tau/time_step, # tau/tau0 averaging factor
-                N=len(values), # number of observations
-                overlapping=True, # sets stride to tau?
-                modified=False,
-                verbose=False
-                )
-            # To get CIs, for 1-sigma confidence we set
-            # ci = scipy.special.erf(1/math.sqrt(2)) = 0.68268949213708585
-            (lo, hi) = allantools.confidence_interval( 
-                dev=dev, ci=0.68268949213708585, edf=edf 
+        pending = np.full(len(tau_act), coarse, dtype=bool)
+        # noise type for each tau, sets confidence intervals and extrapolation
+        alphas = deviations.noise_identification(
+            values, self._effective_grid(grid, settings),
+            np.round(tau_act/settings.time_step)
+            )
+        adev = self._assemble_adev(
+            tau_act, devs, pending, self._series_length(values, grid, settings), reference,
+            alphas, self._grid_span(grid, settings), settings
+            )
+        if cached and not coarse:
+            self._logic.adev_table.cache.put(cache_key, adev)
+        return adev
+
+    ########################################################################################
+    def window_series(self, tstart, tend):
+        """
+        good data of all channels and evaluations between relative times tstart and tend
+        returns list of (kind, index, values, grid, reference), values and grid are views
+        """
+        if tend < tstart:
+            tstart, tend = tend, tstart
+        reference_values = self._logic.channel_table.parameters['aref']
+        sources = []
+        for ch_index in range(COL.CHANNELS):
+            key = ('float', 1 << ch_index)
+            if key not in self._cache:
+                # typed copy once per filter run, windows are slices of it
+                data, range_info = self.get_good_points(ch_index)
+                del range_info
+                self._cache[key] = np.array(data, dtype=np.float64)
+            sources.append((
+                'channel', ch_index, self._cache[key],
+                self.get_good_grid_index((ch_index,)), reference_values[ch_index]
+                ))
+        for (index, data) in enumerate(self._eval_data):
+            if index >= len(self._eval_grids):
+                break
+            sources.append((
+                'evaluation', index, data, self._eval_grids[index],
+                float(self._logic.evaluation_table.parameters[index]['target'])
+                ))
+        series = []
+        for (kind, index, data, grid, reference) in sources:
+            start = np.searchsorted(data[:, 0], tstart, side='left')
+            end = np.searchsorted(data[:, 0], tend, side='right')
+            if grid is not None:
+                grid = grid[start:end]
+            series.append((kind, index, data[start:end, 1], grid, reference))
+        return series
+
+    ########################################################################################
+    def window_adev(self, series, settings, cancel=None):
+        """
+        ADev of series from window_series, suitable for a worker thread
+        settings: snapshot from ADevTableModel.settings(), taken in the GUI thread
+        only the displayed statistic is calculated, results are not cached
+        returns list of (kind, index, adev), None if cancel (threading.Event) is set
+        """
+        min_points = 4 # shortest series with a usable ADev at the time step
+        statistics = tuple(set(('oadev', settings.statistic)))
+        results = []
+        for (kind, index, values, grid, reference) in series:
+            if cancel is not None and cancel.is_set():
+                return None
+            if len(values) < min_points:
+                continue
+            adev = self.calculate_adev(
+                values, reference, grid=grid, statistics=statistics, settings=settings
                 )
-            # print('confidence interval: ', lo, ' <-- ', dev, ' --> ',hi)
-            devs_lower[index] = lo
-            devs_upper[index] = hi
-            log_devs = np.log10(devs/reference)
-            # for plotting, we need the LENGTH of the error bars
-            log_bar_down = abs(np.log10(devs_lower/reference) - log_devs)
-            log_bar_up   = abs(np.log10(devs_upper/reference) - log_devs)
-        adev = { # assembly into dictionary
+            if adev is None:
+                continue # e.g. gap-aware mode and no complete difference at any tau
+            results.append((kind, index, adev))
+        return results
+
+    ########################################################################################
+    def bootstrap_adev(self, resamples, block_factor=4, seed=0, workers=None):
+        """
+        block bootstrap confidence intervals for the overlapping ADev of all series
+        and for their extrapolated statistical uncertainty, results go to self.bootstrap
+        """
+        # The work is split for the GUI: bootstrap_jobs takes a snapshot of data and
+        # ADev results, bootstrap_intervals runs in a worker thread and does not touch
+        # shared state, and apply_bootstrap stores the results.
+        jobs = self.bootstrap_jobs(resamples, block_factor, seed)
+        self.apply_bootstrap(self.bootstrap_intervals(jobs, workers))
+        return self.bootstrap
+
+    ########################################################################################
+    def bootstrap_jobs(self, resamples, block_factor=4, seed=0):
+        """ copies of good data and current ADev results of all series for bootstrap_intervals """
+        # Each series gets a seed derived from the given one, so results do not
+        # depend on the number of workers. Only the tau values of the current ADev
+        # results are resampled.
+        adev_table = self._logic.adev_table
+        jobs = []
+        for (kind, index, values, grid, reference) in self.window_series(-np.inf, np.inf):
+            if kind == 'channel':
+                adev = adev_table.channel_adev.get(index)
+                offset = 0
+            else:
+                adev = adev_table.evaluation_adev.get(index)
+                offset = COL.CHANNELS
+            if adev is None or len(values) < 2:
+                continue
+            m_list = np.round(np.asarray(adev['taus']) / adev_table.time_step).astype(np.int64)
+            grid = self._effective_grid(grid)
+            jobs.append((kind, index, adev, reference, (
+                np.array(values, dtype=np.float64), None if grid is None else np.array(grid),
+                m_list, resamples, block_factor, seed + offset + index
+                )))
+        return jobs
+
+    ########################################################################################
+    def bootstrap_intervals(self, jobs, workers=None):
+        """
+        bootstrap intervals for jobs from bootstrap_jobs, safe to run in a worker thread
+        returns list of (kind, index, adev, entry) for apply_bootstrap
+        """
+        # Each series is resampled in its own process (see deviations.bootstrap_oadev).
+        # The extrapolated interval scales the interval at the key tau like the ADev
+        # itself, i.e. the identified noise type is taken as known.
+        # The results are not part of the evaluation and not stored in the database.
+        if workers is None or workers < 1:
+            workers = os.cpu_count() or 1
+        if workers == 1 or len(jobs) < 2:
+            bounds = [deviations.bootstrap_oadev(*job[-1]) for job in jobs]
+        else:
+            # spawned workers: forking the GUI process from a worker thread is not safe
+            with ProcessPoolExecutor(
+                    max_workers=min(workers, len(jobs)),
+                    mp_context=multiprocessing.get_context('spawn')
+                ) as executor:
+                futures = [executor.submit(deviations.bootstrap_oadev, *job[-1]) for job in jobs]
+                bounds = [future.result() for future in futures]
+        results = []
+        for ((kind, index, adev, reference, job), (lower, upper)) in zip(jobs, bounds):
+            taus = np.asarray(adev['taus'])
+            entry = {
+                'taus': taus,
+                'resamples': job[3],
+                'block_factor': job[4],
+                'seed': job[5],
+                'frac_devs': adev['devs'] / reference,
+                'frac_devs_lower': lower / reference,
+                'frac_devs_upper': upper / reference,
+                'analytic_devs_lower': adev['devs_lower'] / reference,
+                'analytic_devs_upper': adev['devs_upper'] / reference,
+                'frac_dev_ext': adev['dev_ext'] / reference,
+                'frac_dev_ext_lower': np.nan,
+                'frac_dev_ext_upper': np.nan,
+                'analytic_ext_lower': np.nan,
+                'analytic_ext_upper': np.nan
+                }
+            key = np.flatnonzero(taus == adev['key_tau'])
+            if len(key) > 0 and adev['devs'][key[0]] > 0:
+                key = key[0]
+                factor = adev['dev_ext'] / adev['devs'][key] / reference
+                entry.update({
+                    'frac_dev_ext_lower': lower[key] * factor,
+                    'frac_dev_ext_upper': upper[key] * factor,
+                    'analytic_ext_lower': adev['devs_lower'][key] * factor,
+                    'analytic_ext_upper': adev['devs_upper'][key] * factor
+                    })
+            results.append((kind, index, adev, entry))
+        return results
+
+    ########################################################################################
+    def apply_bootstrap(self, results):
+        """
+        store results from bootstrap_intervals in self.bootstrap, skipping series whose
+        ADev results were replaced in the meantime; returns number of series stored
+        """
+        adev_table = self._logic.adev_table
+        current = {'channel': adev_table.channel_adev, 'evaluation': adev_table.evaluation_adev}
+        self.bootstrap = {
+            (kind, index): entry for (kind, index, adev, entry) in results
+            if current[kind].get(index) is adev
+            }
+        return len(self.bootstrap)
+
+    ########################################################################################
+    def adev_cache_key(self, values, reference, grid=None):
+        """ key for memoized ADev results of a series with current settings """
+        adev_table = self._logic.adev_table
+        if not adev_table.gap_aware:
+            grid = None # grid does not affect result
+        return adev_table.cache.make_key(
+            values, reference, adev_table.time_step, adev_table.tau_values, grid,
+            extra=(adev_table.key_tau_index, deviations.STATISTICS)
+            )
+
+    ########################################################################################
+    def _adev_points( # pylint: disable=locally-disabled, too-many-arguments
+            self, values, taus, overlapping, grid=None, statistics=deviations.STATISTICS,
+            settings=None
+        ):
+        """
+        raw deviations for list of tau values
+        returns usable tau values and dictionary of deviation arrays per statistic
+        """
+        settings = self._adev_settings(settings)
+        time_step = settings.time_step
+        grid = self._effective_grid(grid, settings)
+        taus = np.array(taus, dtype=np.float64)
+        m_list = np.round(taus/time_step).astype(np.int64)
+        results = deviations.deviation_engine(values, grid, m_list, statistics, overlapping)
+        usable = results['oadev'][1] > 0 # ADev sets the tau range for all statistics
+        devs = {}
+        for name in deviations.STATISTICS:
+            if name in results:
+                devs[name] = results[name][0][usable]
+            else:
+                devs[name] = np.full(np.count_nonzero(usable), np.nan)
+        return taus[usable], devs
+
+    ########################################################################################
+    def _adev_settings(self, settings=None):
+        """ ADev settings: snapshot from ADevTableModel.settings() or the live table """
+        return self._logic.adev_table if settings is None else settings
+
+    ########################################################################################
+    def _effective_grid(self, grid, settings=None):
+        """ grid index if gap-aware mode is active, None to join good data end-to-end """
+        if not self._adev_settings(settings).gap_aware:
+            return None
+        return grid
+
+    ########################################################################################
+    def _series_length(self, values, grid, settings=None):
+        """ number of samples entering the ADev, duplicates on the time grid count once """
+        grid = self._effective_grid(grid, settings)
+        if grid is None:
+            return len(values)
+        return deviations.grid_points(grid)
+
+    ########################################################################################
+    def _grid_span(self, grid, settings=None):
+        """ time span covered by grid index, None if not in gap-aware mode """
+        settings = self._adev_settings(settings)
+        if grid is None or len(grid) < 1 or not settings.gap_aware:
+            return None
+        return (grid.max() - grid.min() + 1) * settings.time_step
+
+    ########################################################################################
+    def _deviation_entry( # pylint: disable=locally-disabled, too-many-arguments
+            self, statistic, tau_act, devs, pending, length, reference, alphas, settings=None,
+            previous=None, update=None
+        ):
+        """
+        confidence intervals and plotting values for one statistic
+        previous: earlier entry for the same taus, its confidence intervals are kept
+        except at the indices in update (all indices if no previous entry is given)
+        """
+        time_step = self._adev_settings(settings).time_step
+        if previous is None:
+            devs_lower = np.full_like(devs, np.nan)
+            devs_upper = np.full_like(devs, np.nan)
+            update = np.arange(len(devs))
+        else:
+            devs_lower = np.array(previous['devs_lower'])
+            devs_upper = np.array(previous['devs_upper'])
+            update = np.asarray(update, dtype=np.int64)
+            devs_lower[update] = np.nan
+            devs_upper[update] = np.nan
+        update = update[np.isfinite(devs[update])]
+        edfs = deviations.edf_batch(
+            statistic, np.asarray(tau_act)[update]/time_step, length,
+            np.asarray(alphas)[update], ~np.asarray(pending)[update]
+            )
+        # 1-sigma intervals: confidence level erf(1/sqrt(2))
+        (devs_lower[update], devs_upper[update]) = deviations.confidence_intervals(
+            devs[update], edfs
+            )
+        log_devs = np.log10(devs/reference)
+        # for plotting, we need the LENGTH of the error bars
+        log_bar_down = abs(np.log10(devs_lower/reference) - log_devs)
+        log_bar_up   = abs(np.log10(devs_upper/reference) - log_devs)
+        return {
             'taus':tau_act,
             'devs':devs,
             'devs_lower':devs_lower,
@@ -803,14 +1543,154 @@ class DataHandler(object): # pylint: disable=locally-disabled, too-many-instance
             'log_devs':log_devs,
             'log_bar_down':log_bar_down,
             'log_bar_up'  :log_bar_up,
+            'pending':pending # True for coarse values still awaiting refinement
+            }
+
+    ########################################################################################
+    def _assemble_adev( # pylint: disable=locally-disabled, too-many-arguments
+            self, tau_act, devs, pending, length, reference, alphas, time_span=None, settings=None,
+            previous=None, update=None
+        ):
+        """ add confidence intervals and derived values, assemble into dictionary """
+        # devs holds one array of deviations per statistic. The top level of the
+        # dictionary holds the overlapping ADev, which is also used for extrapolation,
+        # all statistics are available in adev['stats'].
+        # alphas holds the identified noise type for each tau.
+        # time_span is the covered time including gaps, if known.
+        # Extrapolation uses the time actually spent on good data and the noise
+        # type identified at the key tau.
+        # previous and update limit the recalculation of confidence intervals to
+        # changed values, see _deviation_entry.
+        settings = self._adev_settings(settings)
+        time_step = settings.time_step
+        key_tau_index = settings.key_tau_index
+        oadevs = devs['oadev']
+        try:
+            key_tau = tau_act[key_tau_index]
+            key_dev = oadevs[key_tau_index]
+            key_alpha = alphas[key_tau_index]
+        except IndexError as err:
+            # data set is too short for key tau, use longest available tau
+            key_tau = tau_act[-1]
+            key_dev = oadevs[-1]
+            key_alpha = alphas[-1]
+        good_time = time_step * length
+        if time_span is None:
+            time_span = good_time
+        exponent = deviations.extrapolation_exponent(key_alpha)
+        dev_extrapolated = key_dev * (good_time / key_tau)**exponent
+        dev_1s = key_dev * math.sqrt(key_tau)
+        #print(
+        #    'from ', key_dev, ' @ ', key_tau, 's, extrapolated to ', 
+        #    dev_1s, ' @ 1s and ', dev_extrapolated, ' @ ',time_span, ' s.'
+        #    )
+        stats = {}
+        for name in deviations.STATISTICS:
+            stats[name] = self._deviation_entry(
+                name, tau_act, devs[name], pending, length, reference, alphas, settings,
+                None if previous is None else previous['stats'][name], update
+                )
+        adev = dict(stats['oadev']) # assembly into dictionary
+        adev.update({
+            'stats':stats,
             'ref':reference,
             'time_span':time_span,
+            'good_time':good_time,
             'key_tau':key_tau,
+            'alphas':alphas,
+            'key_alpha':key_alpha,
             'dev_1s':dev_1s,
-            'dev_ext':dev_extrapolated
-            }
+            'dev_ext':dev_extrapolated,
+            'length':length
+            })
         return adev
 
+    ########################################################################################
+    def adev_refinement_pending(self):
+        """ check if coarse ADev results are waiting for refinement """
+        return len(self._adev_refine_queue) > 0
+
+    ########################################################################################
+    def next_refinement(self, chunk=4):
+        """
+        next block of coarse ADev values to refine, up to (chunk) taus of one series,
+        largest taus first; returns job for refine_adev or None when done
+        """
+        while self._adev_refine_queue:
+            kind, index, values, grid = self._adev_refine_queue[0]
+            if kind == 'channel':
+                adev = self._logic.adev_table.channel_adev[index]
+            else:
+                adev = self._logic.adev_table.evaluation_adev[index]
+            todo = np.nonzero(adev['pending'])[0][::-1][:chunk]
+            if len(todo) == 0:
+                self._adev_refine_queue.pop(0)
+                continue
+            return (kind, index, values, grid, adev, todo)
+        return None
+
+    ########################################################################################
+    def refine_adev(self, job, settings):
+        """
+        replace coarse ADev estimates by overlapping ones for one job from next_refinement
+        and add the statistics that have no non-overlapping estimate
+        settings: snapshot from ADevTableModel.settings(), safe to run in a worker thread
+        returns the new ADev result for apply_refinement
+        """
+        # Only the refined taus change, so only their confidence intervals are
+        # recalculated; the rest of the result is cheap to assemble again.
+        (kind, index, values, grid, adev, todo) = job
+        del kind, index
+        devs = {}
+        for name in deviations.STATISTICS:
+            devs[name] = np.array(adev['stats'][name]['devs'])
+        (tau_act, new_devs) = self._adev_points(
+            values, adev['taus'][todo], True, grid, settings=settings
+            )
+        for (tau_index, tau) in enumerate(tau_act):
+            match = np.isclose(adev['taus'], tau)
+            for name in deviations.STATISTICS:
+                devs[name][match] = new_devs[name][tau_index]
+        # taus that are too long for an overlapping estimate keep the coarse value
+        pending = np.array(adev['pending'])
+        pending[todo] = False
+        return self._assemble_adev(
+            adev['taus'], devs, pending, adev['length'], adev['ref'], adev['alphas'],
+            adev['time_span'], settings, adev, todo
+            )
+
+    ########################################################################################
+    def apply_refinement(self, job, new_adev):
+        """ store refined result in the tables (GUI thread), returns (kind, index) """
+        (kind, index, values, grid, adev, todo) = job
+        del todo
+        if not new_adev['pending'].any():
+            self._logic.adev_table.cache.put(
+                self.adev_cache_key(values, adev['ref'], grid), new_adev
+                )
+        if kind == 'channel':
+            self._logic.adev_table.add_channel_adev(index, new_adev)
+        else:
+            self._logic.adev_table.add_evaluation_adev(index, new_adev)
+            self._logic.evaluation_table.set_statistics(
+                index,
+                new_adev['dev_1s'],
+                new_adev['dev_ext'],
+                new_adev['time_span']
+                )
+        return kind, index
+
+    ########################################################################################
+    def refine_adev_step(self, chunk=4):
+        """
+        refine one block of coarse ADev values in the calling thread
+        returns ('channel'|'evaluation', index) of the updated series or None when done
+        """
+        job = self.next_refinement(chunk)
+        if job is None:
+            return None
+        return self.apply_refinement(job, self.refine_adev(job, self._logic.adev_table.settings()))
+
 ########################################################################################
 if __name__ == '__main__':
     print("test")
@@ -0,0 +1,383 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+frequency stability statistics (ADev, MDev, HDev, TotDev) for data on a regular time grid
+Created on 2026/10/19
+@author: agent
+"""
+
+# Samples are placed on a regular grid by their integer grid index. Missing
+# grid points are excluded from all averages: an averaging window only
+# contributes if it is completely filled, and a difference of windows
+# only contributes if all of them are complete. Window sums come from a
+# single cumulative sum over the grid (the integrated phase), shared by
+# all statistics, so each tau costs O(grid length) per statistic.
+# Samples sharing a grid index (duplicated time stamps) are averaged into
+# one grid point, which then counts as one sample for the length of the
+# series (see grid_points).
+# Confidence intervals are calculated for whole arrays of deviations, one
+# allantools.confidence_interval call per tau is slow with many taus.
+
+import sys
+import functools
+import numpy as np
+import scipy.stats
+import allantools
+
+STATISTICS = ('oadev', 'mdev', 'hdev', 'totdev')
+ONE_SIGMA = 0.68268949213708585 # confidence level of error bars, erf(1/sqrt(2))
+MIN_BOOTSTRAP_BLOCKS = 10 # fewer blocks than this give no usable bootstrap interval
+BOOTSTRAP_CHUNK = 1 << 21 # block indices drawn at once, limits memory use
+
+###################################################################################################
+def fill_grid(values, grid_index):
+    """
+    place values on a regular grid
+    returns grid values (zero where missing) and boolean validity array
+    """
+    grid_index = np.asarray(grid_index, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.zeros(0), np.zeros(0, dtype=bool)
+    # min/max instead of first/last: tolerate unsorted or duplicated timestamps
+    offset = grid_index - grid_index.min()
+    length = int(offset.max()) + 1
+    counts = np.bincount(offset, minlength=length)
+    # subtracting the mean keeps the cumulative sums small, ADev does not depend on it
+    sums = np.bincount(offset, weights=values - np.mean(values), minlength=length)
+    valid = counts > 0
+    grid_values = np.where(valid, sums / np.maximum(counts, 1), 0.0) # duplicates are averaged
+    return grid_values, valid
+
+###################################################################################################
+def grid_points(grid_index):
+    """ number of occupied grid points, duplicated indices count once """
+    if len(grid_index) == 0:
+        return 0
+    return len(np.unique(grid_index))
+
+###################################################################################################
+def window_averages(cum_values, cum_count, m):
+    """
+    averages over all windows of m grid points, NaN for incomplete windows
+    cum_values and cum_count are cumulative sums with a leading zero
+    """
+    sums = cum_values[m:] - cum_values[:-m]
+    counts = cum_count[m:] - cum_count[:-m]
+    averages = sums / m
+    averages[counts != m] = np.nan
+    return averages
+
+###################################################################################################
+def window_sums(values, m):
+    """
+    sums over all windows of m consecutive entries, NaN where any entry is NaN
+    """
+    valid = ~np.isnan(values)
+    cum_values = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    cum_count = np.concatenate(([0], np.cumsum(valid)))
+    sums = cum_values[m:] - cum_values[:-m]
+    sums[(cum_count[m:] - cum_count[:-m]) != m] = np.nan
+    return sums
+
+###################################################################################################
+def total_deviation(phase, m):
+    """
+    total deviation from gapless phase data (in units of time step * frequency)
+    phase is extended by reflection at both ends, as in Howe's TOTVAR
+    """
+    count = len(phase)
+    if m < 1 or m > count - 2:
+        return np.nan, 0
+    # x*(1-j) = 2 x(1) - x(1+j)  and  x*(N+j) = 2 x(N) - x(N-j)
+    left = 2.0 * phase[0] - phase[1:-1][::-1]
+    right = 2.0 * phase[-1] - phase[1:-1][::-1]
+    extended = np.concatenate((left, phase, right))
+    mid = len(left)
+    centers = np.arange(mid + 1, mid + count - 1) # i = 2 ... N-1
+    diffs = extended[centers - m] - 2.0 * extended[centers] + extended[centers + m]
+    return np.sqrt(np.mean(diffs**2) / (2.0 * m * m)), len(diffs)
+
+###################################################################################################
+def deviation_engine(values, grid_index, m_list, statistics=STATISTICS, overlapping=True):
+    """
+    frequency stability statistics for frequency data, optionally with gaps
+    values: frequency values of good samples
+    grid_index: integer grid position of each value, None for gapless data
+    m_list: averaging factors (tau / time step)
+    statistics: names from STATISTICS to calculate
+    overlapping: False gives (faster) non-overlapping estimates for oadev and hdev,
+        mdev and totdev are only defined as overlapping statistics
+    returns dictionary of (deviations, number of contributing terms) per statistic,
+    deviations are NaN where no complete set of windows exists
+    """
+    # The phase (integrated frequency) is calculated once as cumulative sum
+    # over the grid. Window averages for each m are differences of the phase
+    # and are shared between all statistics.
+    if grid_index is None:
+        grid_index = np.arange(len(values))
+    grid_values, valid = fill_grid(values, grid_index)
+    phase = np.concatenate(([0.0], np.cumsum(grid_values)))
+    cum_count = np.concatenate(([0], np.cumsum(valid)))
+    gapless = bool(np.all(valid))
+    results = {}
+    for name in statistics:
+        results[name] = (np.full(len(m_list), np.nan), np.zeros(len(m_list), dtype=np.int64))
+    for (index, m) in enumerate(m_list):
+        m = int(m)
+        if m < 1 or 2 * m > len(grid_values):
+            continue
+        averages = window_averages(phase, cum_count, m)
+        if overlapping:
+            first_diffs = averages[m:] - averages[:-m]
+            second_diffs = averages[2*m:] - 2.0 * averages[m:-m] + averages[:-2*m]
+        else:
+            first_diffs = np.diff(averages[::m])
+            second_diffs = np.diff(averages[::m], n=2)
+        for name in statistics:
+            if name == 'oadev':
+                terms = first_diffs[~np.isnan(first_diffs)]
+                variance = 0.5 * np.mean(terms**2) if len(terms) > 0 else np.nan
+            elif name == 'hdev':
+                terms = second_diffs[~np.isnan(second_diffs)]
+                variance = np.mean(terms**2) / 6.0 if len(terms) > 0 else np.nan
+            elif name == 'mdev':
+                if not overlapping:
+                    continue
+                # modified ADev averages m consecutive first differences before squaring
+                terms = window_sums(first_diffs, m)
+                terms = terms[~np.isnan(terms)]
+                variance = np.mean(terms**2) / (2.0 * m * m) if len(terms) > 0 else np.nan
+            elif name == 'totdev':
+                if not overlapping or not gapless:
+                    continue # reflection at data ends is not defined across gaps
+                (dev, count) = total_deviation(phase, m)
+                results[name][0][index] = dev
+                results[name][1][index] = count
+                continue
+            else:
+                continue
+            if len(terms) > 0:
+                results[name][0][index] = np.sqrt(variance)
+                results[name][1][index] = len(terms)
+    return results
+
+###################################################################################################
+def bootstrap_oadev( # pylint: disable=locally-disabled, too-many-arguments, too-many-locals
+        values, grid_index, m_list, resamples, block_factor=4, seed=0, confidence=ONE_SIGMA
+    ):
+    """
+    moving block bootstrap confidence intervals for the overlapping ADev
+    values, grid_index, m_list: as for deviation_engine
+    block_factor: block length in units of m (averaging factor)
+    seed: seed for numpy RandomState, same seed gives the same intervals
+    returns (lower, upper) arrays, NaN where there are too few blocks
+    """
+    # For each tau, the squared first differences of window averages are the
+    # terms of the Allan variance. Neighbouring terms are correlated over about
+    # 2m samples (longer for flicker noise), so they are resampled in blocks
+    # of block_factor * m consecutive terms. Block sums for all start positions
+    # come from one cumulative sum; each resample is a sum over randomly drawn
+    # block sums, so all resamples of one tau are a single indexing operation.
+    # The interval is given by the percentiles of the resampled deviations.
+    # Blocks are never shortened: if fewer than MIN_BOOTSTRAP_BLOCKS blocks fit,
+    # there is no interval for that tau. Even so, the block bootstrap tends to
+    # underestimate the spread; for white FM noise the nominal 68 % intervals
+    # contain the true value in about 60 % of cases (see bootstrap_coverage).
+    rng = np.random.RandomState(seed)
+    if grid_index is None:
+        grid_index = np.arange(len(values))
+    grid_values, valid = fill_grid(values, grid_index)
+    phase = np.concatenate(([0.0], np.cumsum(grid_values)))
+    cum_count = np.concatenate(([0], np.cumsum(valid)))
+    lower = np.full(len(m_list), np.nan)
+    upper = np.full(len(m_list), np.nan)
+    percentiles = (50.0 * (1.0 - confidence), 50.0 * (1.0 + confidence))
+    for (index, m) in enumerate(m_list):
+        m = int(m)
+        if m < 1 or 2 * m > len(grid_values):
+            continue
+        averages = window_averages(phase, cum_count, m)
+        diffs = averages[m:] - averages[:-m]
+        complete = ~np.isnan(diffs)
+        length = len(diffs)
+        block = block_factor * m
+        if block * MIN_BOOTSTRAP_BLOCKS > length:
+            continue # shorter blocks would cut correlations and give too narrow intervals
+        cum_terms = np.concatenate(([0.0], np.cumsum(np.where(complete, diffs**2, 0.0))))
+        cum_complete = np.concatenate(([0], np.cumsum(complete)))
+        block_sums = cum_terms[block:] - cum_terms[:-block]
+        block_counts = cum_complete[block:] - cum_complete[:-block]
+        blocks = -(-length // block) # blocks per resample, ceiling division
+        devs = np.empty(resamples)
+        chunk = max(1, BOOTSTRAP_CHUNK // blocks)
+        for start in range(0, resamples, chunk):
+            count = min(chunk, resamples - start)
+            picks = rng.randint(0, len(block_sums), size=(count, blocks))
+            sums = block_sums[picks].sum(axis=1)
+            counts = block_counts[picks].sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                devs[start:start+count] = np.sqrt(0.5 * sums / counts)
+        devs = devs[np.isfinite(devs)]
+        if len(devs) > 0:
+            (lower[index], upper[index]) = np.percentile(devs, percentiles)
+    return lower, upper
+
+###################################################################################################
+def bootstrap_coverage( # pylint: disable=locally-disabled, too-many-arguments
+        length, m_list, trials, resamples, block_factor=4, seed=0
+    ):
+    """
+    fraction of bootstrap_oadev intervals that contain the true ADev of simulated
+    white FM noise (unit variance, ADev = 1/sqrt(m)) of the given length
+    returns coverage for each m, NaN where no intervals were given
+    """
+    m_list = np.asarray(m_list, dtype=np.int64)
+    true_devs = 1.0 / np.sqrt(m_list)
+    hits = np.zeros(len(m_list))
+    given = np.zeros(len(m_list))
+    for trial in range(trials):
+        values = np.random.RandomState(seed + trial).randn(length)
+        (lower, upper) = bootstrap_oadev(
+            values, None, m_list, resamples, block_factor, seed + trials + trial
+            )
+        finite = np.isfinite(lower) & np.isfinite(upper)
+        given += finite
+        hits += finite & (lower <= true_devs) & (true_devs <= upper)
+    with np.errstate(invalid='ignore'):
+        return np.where(given > 0, hits / given, np.nan)
+
+###################################################################################################
+def lag1_autocorrelation(values):
+    """ lag-1 autocorrelation of a series, NaN entries are excluded from all sums """
+    residuals = values - np.nanmean(values)
+    pairs = residuals[1:] * residuals[:-1]
+    pairs = pairs[~np.isnan(pairs)]
+    squares = residuals[~np.isnan(residuals)]**2
+    if len(pairs) < 1 or np.sum(squares) == 0:
+        return np.nan
+    # normalize per term, so that missing pairs do not bias the estimate
+    return np.mean(pairs) / np.mean(squares)
+
+###################################################################################################
+def noise_identification(values, grid_index, m_list, min_points=30, dmax=2):
+    """
+    power-law noise identification by lag-1 autocorrelation (Riley and Greenhall)
+    values: frequency values of good samples
+    grid_index: integer grid position of each value, None for gapless data
+    m_list: averaging factors (tau / time step)
+    returns integer alpha (+2: white PM ... -2: random walk FM) for each m.
+    Averaging factors with fewer than min_points independent averages take
+    the alpha of the longest identifiable averaging time, 0 (white FM) if none.
+    """
+    # frequency data averaged over non-overlapping windows of m points are
+    # differenced until the lag-1 autocorrelation r1 indicates a stationary series,
+    # delta = r1/(1+r1) < 0.25. Then alpha = -2 (delta + d) for d differences.
+    if grid_index is None:
+        grid_index = np.arange(len(values))
+    grid_values, valid = fill_grid(values, grid_index)
+    phase = np.concatenate(([0.0], np.cumsum(grid_values)))
+    cum_count = np.concatenate(([0], np.cumsum(valid)))
+    alphas = np.zeros(len(m_list), dtype=np.int64)
+    last_alpha = None
+    for (index, m) in sorted(enumerate(m_list), key=lambda item: item[1]):
+        m = int(m)
+        identified = False
+        if m >= 1 and len(grid_values) // m >= min_points:
+            series = window_averages(phase, cum_count, m)[::m]
+            for d in range(dmax + 1):
+                if np.count_nonzero(~np.isnan(series)) < min_points - d:
+                    break
+                r1 = lag1_autocorrelation(series)
+                if np.isnan(r1):
+                    break
+                delta = r1 / (1 + r1)
+                if delta < 0.25 or d == dmax:
+                    alpha = -2.0 * (delta + d)
+                    last_alpha = int(np.clip(np.round(alpha), -2, 2))
+                    identified = True
+                    break
+                series = np.diff(series)
+        if identified:
+            alphas[index] = last_alpha
+        elif last_alpha is not None:
+            alphas[index] = last_alpha
+    return alphas
+
+###################################################################################################
+@functools.lru_cache(maxsize=4096)
+def _edf(statistic, alpha, m, length, overlapping):
+    """ memoized equivalent degrees of freedom for a single deviation value, NaN if undefined """
+    if statistic == 'totdev':
+        return allantools.edf_totdev(N=length, m=m, alpha=alpha)
+    # Greenhall's EDF (Equivalent Degrees of Freedom)
+    try:
+        return allantools.edf_greenhall(
+            alpha=alpha, # noise type (alpha +2,...,-4)
+            d=3 if statistic == 'hdev' else 2, # 2: allan variance, 3: hadamard variance
+            m=m,     # tau/tau0 averaging factor
+            N=length, # number of observations
+            overlapping=overlapping, # coarse estimates are non-overlapping
+            modified=(statistic == 'mdev'),
+            verbose=False
+            )
+    except ZeroDivisionError: # too few terms, e.g. non-overlapping estimate at longest taus
+        return np.nan
+
+###################################################################################################
+def edf_batch(statistic, m_list, length, alphas, overlapping):
+    """
+    equivalent degrees of freedom for all averaging factors of a series
+    overlapping: single bool or one bool per averaging factor
+    """
+    overlapping = np.broadcast_to(np.asarray(overlapping, dtype=bool), (len(m_list),))
+    edfs = np.zeros(len(m_list))
+    for index in range(len(m_list)):
+        edfs[index] = _edf(
+            statistic, int(alphas[index]), int(round(m_list[index])), int(length),
+            bool(overlapping[index])
+            )
+    return edfs
+
+###################################################################################################
+def confidence_intervals(devs, edfs, confidence=ONE_SIGMA):
+    """
+    chi-squared confidence intervals as allantools.confidence_interval, for arrays of
+    deviations and equivalent degrees of freedom, returns (lower, upper) arrays
+    """
+    devs = np.asarray(devs, dtype=np.float64)
+    edfs = np.asarray(edfs, dtype=np.float64)
+    tail = min(confidence, 1.0 - confidence) / 2.0
+    variances = devs**2
+    lower = np.sqrt(edfs * variances / scipy.stats.chi2.ppf(1.0 - tail, edfs))
+    upper = np.sqrt(edfs * variances / scipy.stats.chi2.ppf(tail, edfs))
+    return lower, upper
+
+###################################################################################################
+def extrapolation_exponent(alpha):
+    """
+    exponent x for extrapolating the deviation at tau to a longer time T as (T/tau)**x
+    white FM: -1/2, flicker FM: 0, random walk FM: +1/2, PM noise: -1
+    """
+    return max(-1.0, (-alpha - 1) / 2.0)
+
+###################################################################################################
+if __name__ == '__main__':
+    # coverage check of the bootstrap intervals: python deviations.py
+    # Long taus, where fewer than MIN_BOOTSTRAP_BLOCKS blocks fit, must give
+    # no interval, all others must cover the true ADev reasonably often.
+    COVERAGE_M = (1, 10, 100, 300, 1000, 3000, 9000)
+    COVERAGE_LIMITS = (0.45, 0.85) # nominal 0.68, 100 trials
+    coverage = bootstrap_coverage(20000, COVERAGE_M, 100, 300)
+    failed = False
+    for (m_value, fraction) in zip(COVERAGE_M, coverage):
+        expected = 4 * m_value * MIN_BOOTSTRAP_BLOCKS <= 20000 - 2 * m_value + 1
+        if expected:
+            ok = COVERAGE_LIMITS[0] <= fraction <= COVERAGE_LIMITS[1]
+        else:
+            ok = np.isnan(fraction)
+        failed = failed or not ok
+        print('m = {:5d}: coverage {:5.2f} {:s}'.format(
+            m_value, fraction, 'ok' if ok else 'FAILED'
+            ))
+    sys.exit(1 if failed else 0)
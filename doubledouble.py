@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+vectorized double-double arithmetic for evaluation of frequency data
+Created on 2026/10/19
+@author: agent
+"""
+
+# Each value is represented by an unevaluated sum (hi, lo) of two float64
+# numbers with |lo| <= ulp(hi)/2, giving about 106 bits (32 digits) of
+# significand. All functions operate elementwise on numpy arrays.
+#
+# Error bounds (u = 2**-53):
+#   two_sum, two_prod          exact
+#   dd_add, dd_mul             relative error < 4 u**2 ~ 4.4E-32
+#   dd_sum (pairwise cascade)  error < ceil(log2 N) * 4 u**2 * sum(|x|)
+#   dd_div_scalar              relative error < 4 u**2
+# For the largest evaluations (1E6 samples of relative frequencies up to
+# 1E7 Hz against optical frequencies of 4E14 Hz), this keeps the rounding
+# error of the mean below 1E-22 relative to the optical frequency,
+# comfortably inside the 1E-19 accuracy budget.
+
+# pylint: disable=locally-disabled, invalid-name
+
+import decimal as dec
+import numpy as np
+
+SPLITTER = 134217729.0 # 2**27 + 1, Dekker splitting constant for float64
+
+###################################################################################################
+def two_sum(a, b):
+    """ error-free sum: returns s, e with s + e == a + b exactly """
+    s = a + b
+    bb = s - a
+    e = (a - (s - bb)) + (b - bb)
+    return s, e
+
+###################################################################################################
+def quick_two_sum(a, b):
+    """ error-free sum for |a| >= |b|, used for renormalization """
+    s = a + b
+    e = b - (s - a)
+    return s, e
+
+###################################################################################################
+def split(a):
+    """ Dekker split of a into two halves of 26 bits each """
+    t = SPLITTER * a
+    hi = t - (t - a)
+    lo = a - hi
+    return hi, lo
+
+###################################################################################################
+def two_prod(a, b):
+    """ error-free product: returns p, e with p + e == a * b exactly """
+    p = a * b
+    a_hi, a_lo = split(a)
+    b_hi, b_lo = split(b)
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+###################################################################################################
+def dd_add(a_hi, a_lo, b_hi, b_lo):
+    """ sum of two double-double values """
+    s, e = two_sum(a_hi, b_hi)
+    t, f = two_sum(a_lo, b_lo)
+    e += t
+    s, e = quick_two_sum(s, e)
+    e += f
+    return quick_two_sum(s, e)
+
+###################################################################################################
+def dd_mul(a_hi, a_lo, b_hi, b_lo):
+    """ product of two double-double values """
+    p, e = two_prod(a_hi, b_hi)
+    e += a_hi * b_lo + a_lo * b_hi
+    return quick_two_sum(p, e)
+
+###################################################################################################
+def dd_div_scalar(a_hi, a_lo, divisor):
+    """ division of a double-double value by a float64 scalar """
+    q1 = a_hi / divisor
+    p, e = two_prod(q1, divisor)
+    s, f = two_sum(a_hi, -p)
+    f -= e
+    f += a_lo
+    q2 = (s + f) / divisor
+    return quick_two_sum(q1, q2)
+
+###################################################################################################
+def dd_sum(a_hi, a_lo=None):
+    """ sum of an array of double-double values by pairwise cascade """
+    hi = np.array(a_hi, dtype=np.float64).ravel()
+    if a_lo is None:
+        lo = np.zeros_like(hi)
+    else:
+        lo = np.array(a_lo, dtype=np.float64).ravel()
+    if len(hi) == 0:
+        return 0.0, 0.0
+    while len(hi) > 1:
+        if len(hi) % 2 == 1:
+            # pad to even length, zero does not change the sum
+            hi = np.append(hi, 0.0)
+            lo = np.append(lo, 0.0)
+        hi, lo = dd_add(hi[0::2], lo[0::2], hi[1::2], lo[1::2])
+    return float(hi[0]), float(lo[0])
+
+###################################################################################################
+def dd_mean(a_hi, a_lo=None):
+    """ mean of an array of double-double values """
+    count = np.size(a_hi)
+    if count == 0:
+        return np.nan, 0.0
+    s_hi, s_lo = dd_sum(a_hi, a_lo)
+    hi, lo = dd_div_scalar(s_hi, s_lo, float(count))
+    return float(hi), float(lo)
+
+###################################################################################################
+def dd_dot(data, coef_hi, coef_lo):
+    """
+    row-wise dot product of float64 data (N x M) with double-double coefficients
+    coefficients of shape (M) give hi and lo arrays of length N,
+    coefficient matrices (M x K) give hi and lo arrays of shape (N x K)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    coef_hi = np.asarray(coef_hi, dtype=np.float64)
+    coef_lo = np.asarray(coef_lo, dtype=np.float64)
+    shape = (data.shape[0],) + coef_hi.shape[1:]
+    res_hi = np.zeros(shape, dtype=np.float64)
+    res_lo = np.zeros(shape, dtype=np.float64)
+    for col in range(data.shape[1]):
+        if not np.any(coef_hi[col]) and not np.any(coef_lo[col]):
+            continue
+        # broadcast data column against all coefficients of this row
+        column = data[:, col].reshape((-1,) + (1,) * (coef_hi.ndim - 1))
+        p_hi, p_lo = dd_mul(column, 0.0, coef_hi[col], coef_lo[col])
+        res_hi, res_lo = dd_add(res_hi, res_lo, p_hi, p_lo)
+    return res_hi, res_lo
+
+###################################################################################################
+def from_decimal(value):
+    """ converts a Decimal into (hi, lo) float64 pair """
+    value = dec.Decimal(value)
+    hi = float(value)
+    lo = float(value - dec.Decimal(hi)) # conversion of float to Decimal is exact
+    return hi, lo
+
+###################################################################################################
+def vector_from_decimal(values):
+    """ converts a list of Decimal values into hi and lo float64 arrays """
+    pairs = [from_decimal(value) for value in values]
+    hi = np.array([pair[0] for pair in pairs], dtype=np.float64)
+    lo = np.array([pair[1] for pair in pairs], dtype=np.float64)
+    return hi, lo
+
+###################################################################################################
+def to_decimal(hi, lo):
+    """ converts (hi, lo) float64 pair into a Decimal """
+    with dec.localcontext() as context:
+        context.prec = 40 # enough to hold both halves without rounding
+        value = dec.Decimal(float(hi)) + dec.Decimal(float(lo))
+    return value
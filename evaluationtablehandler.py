@@ -22,6 +22,7 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
     """ adjust handling of data in evaluation matrix/table """
 
     ROW_NUMBER = 19
+    DIVIDER_ROWS = (5, 9, 14)
     ROW_HEADER = (
         "",
         "main  n_a",
@@ -51,6 +52,10 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
         self._logic = logic
         self.count = 0 # number of known evaluations
         self.parameters = []
+        self._config_key = None # channel table snapshot for configuration-dependent values
+        self._dirty = set() # evaluations with new data
+        self._display = [] # per evaluation: formatted strings by row
+        self._background = [] # per evaluation: background colors by row
 
     #######################################################################
     def set_from_config(self, config):
@@ -127,26 +132,45 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
             new_dict['time_span'] = dec.Decimal('NaN')
             self.parameters.append(new_dict)
         ### done initializing parameter dictionary ###############################
+        self._config_key = None # recalculate all derived values on next update
+        self._display = []
+        self._background = []
 
     #######################################################################
     def set_means(self, index, mean_time, start_time, stop_time, mean_value):
         """ called by data handler to set mean time and evaluation value """
-        self.parameters[index]['mean_time'] = dec.Decimal(mean_time)
-        self.parameters[index]['start_time'] = dec.Decimal(start_time)
-        self.parameters[index]['stop_time'] = dec.Decimal(stop_time)
-        self.parameters[index]['mean_relative'] = dec.Decimal(mean_value)
+        self._set_value(index, 'mean_time', mean_time)
+        self._set_value(index, 'start_time', start_time)
+        self._set_value(index, 'stop_time', stop_time)
+        self._set_value(index, 'mean_relative', mean_value)
 
     #######################################################################
     def set_statistics(self, index, dev_1s, dev_ext, time_span):
         """ called by data handler to set mean time and evaluation value """
-        self.parameters[index]['stat_unc_1s'] = dec.Decimal(dev_1s)
-        self.parameters[index]['stat_unc_ext'] = dec.Decimal(dev_ext)
-        self.parameters[index]['time_span'] = dec.Decimal(time_span)
-        
+        self._set_value(index, 'stat_unc_1s', dev_1s)
+        self._set_value(index, 'stat_unc_ext', dev_ext)
+        self._set_value(index, 'time_span', time_span)
+
     #######################################################################
-    def update(self):
-        """ update calculation results for values now in parameters """
-        print("updating evaluation table")
+    def _set_value(self, index, key, value):
+        """ store data-dependent value, mark evaluation for update if it changed """
+        value = dec.Decimal(value)
+        # compare_total treats NaN as equal to NaN
+        if self.parameters[index][key].compare_total(value) != 0:
+            self.parameters[index][key] = value
+            self._dirty.add(index)
+
+    #######################################################################
+    def _channel_key(self):
+        """ snapshot of the channel table values used by the derived quantities """
+        return (
+            self._logic.channel_table.parameters['base'].tobytes(),
+            self._logic.channel_table.parameters['corr'].tobytes()
+            )
+
+    #######################################################################
+    def _update_config_values(self):
+        """ calculate quantities that depend only on configuration and channel table """
         baselines = self._logic.channel_table.parameters['base']
         corrections = self._logic.channel_table.parameters['corr']
         for index in range(self.count):
@@ -160,12 +184,12 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
                 base_ceo = dec.Decimal(int(-baselines[abs(ch_ceo)-1]))
                 corr_ceo = dec.Decimal(int(-corrections[abs(ch_ceo)-1]))
             base_ceo += corr_ceo
-            
-            ch_rep = par['ch_rep']            
+
+            ch_rep = par['ch_rep']
             base_rep = dec.Decimal(int(baselines[ch_rep-1]))
             corr_rep = dec.Decimal(int(corrections[ch_rep-1]))
             base_rep += corr_rep
-            
+
             ch_beat = par['ch_a']
             if ch_beat > 0:
                 base_beat = dec.Decimal(int(+baselines[abs(ch_beat)-1]))
@@ -175,9 +199,7 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
                 corr_beat = dec.Decimal(int(-corrections[abs(ch_beat)-1]))
             base_beat += corr_beat
             del corr_ceo, corr_rep, corr_beat
-            
-            relative = par['mean_relative'] # extracted from time series data
-            stat_unc = par['stat_unc_ext'] # extracted from Allan deviation
+
             n_a = par['n_a']
             n_b = par['n_b']
             n_rep = par['n_rep']
@@ -188,7 +210,7 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
             ref_b = par['ref_b']
             sys_cor_b = par['sys_cor_b']
             sys_unc_b = par['sys_unc_b']
-            
+
             if par['type'] == 1: # absolute frequency mode
                 r_ab = n_a/n_rep
                 result_baseline = base_ceo + (n_a/n_rep) * base_rep + base_beat
@@ -197,66 +219,85 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
                 sys_unc = sys_unc_a # direct correction for systematic effects
                 target = ref_a
             elif par['type'] == 2: # frequency ratio mode
-                r_ab = n_a/n_b # r_ab does not include multiplier 
+                r_ab = n_a/n_b # r_ab does not include multiplier
                 result_baseline = r_ab * multiplier # baseline is line ratio * multiplier
                 target = ref_a / ref_b
                 rel_cor_a = sys_cor_a / ref_a
                 rel_cor_b = sys_cor_b / ref_b
-                sys_cor = (rel_cor_a - rel_cor_b) * target                
-                sys_var = (sys_unc_a/ref_a)**2 + (sys_unc_b/ref_b)**2                
-                sys_unc = sys_var.sqrt()                
+                sys_cor = (rel_cor_a - rel_cor_b) * target
+                sys_var = (sys_unc_a/ref_a)**2 + (sys_unc_b/ref_b)**2
+                sys_unc = sys_var.sqrt()
             else:
                 r_ab = dec.Decimal('NaN')
                 result_baseline = dec.Decimal('NaN')
-                frac_dev = dec.Decimal('NaN')
-                frac_unc = dec.Decimal('NaN')
                 sys_cor = dec.Decimal('NaN')
                 sys_unc = dec.Decimal('NaN')
-            
-            result = result_baseline + relative + sys_cor
-            deviation = result - target
-            frac_dev = deviation / result
-
-            combined_var = sys_unc**2 + stat_unc**2
-            combined_unc = combined_var.sqrt()
-
-            frac_dev = deviation / result
-            frac_unc = combined_unc / result
-            #print(
-            #    'f_ceo: ', repr(base_ceo),
-            #    '   f_rep: ', repr(base_rep),
-            #    '   f_freq: ', repr(baseline),
-            #    '   decimals precision: ', dec.getcontext().prec
-            #    )
-            # calculation (particularly of ratio value) uses reference value
-            # in places where full accuracy is not required.
-            # for ratio "relative" number, the correction term is of order 1E-7
-            # (40 MHz AOM shifts over 400 THz Sr optical frequency)
-            # a relative error of 1E-12 is therefore acceptable to achieve 1E-19
-            # accuracy.
-            if not relative.is_nan() and abs(relative/target) > 1E-7:
-                par['deviation_warning'] = True
-                num_string = '{:3.1E}'.format(target * dec.Decimal(1E-7))
-                text = (
-                    'The relative correction for ' + par['name']
-                    + ' exceeds ' + num_string
-                    + ' (1E-7). Results will be inaccurate.'
-                )
-                self._logic.warning('Deviation from reference', text)
-                par['dev_warn'] = True
-            else:
-                par['dev_warn'] = False
+                target = dec.Decimal('NaN')
             par['r_ab'] = r_ab
             par['baseline'] = result_baseline
-            par['result'] = result
             par['sys_cor'] = sys_cor
             par['sys_unc'] = sys_unc
-            par['uncert'] = combined_unc
             par['target'] = target
-            par['deviation'] = deviation
-            par['frac_dev'] = frac_dev
-            par['frac_unc'] = combined_unc/result
-        self.update_view()
+
+    #######################################################################
+    def _update_data_values(self, index):
+        """ calculate results that depend on the evaluated data """
+        par = self.parameters[index] # parameter dictionary for this evaluation
+        relative = par['mean_relative'] # extracted from time series data
+        stat_unc = par['stat_unc_ext'] # extracted from Allan deviation
+        target = par['target']
+
+        result = par['baseline'] + relative + par['sys_cor']
+        deviation = result - target
+
+        combined_var = par['sys_unc']**2 + stat_unc**2
+        combined_unc = combined_var.sqrt()
+
+        frac_dev = deviation / result
+        frac_unc = combined_unc / result
+        # calculation (particularly of ratio value) uses reference value
+        # in places where full accuracy is not required.
+        # for ratio "relative" number, the correction term is of order 1E-7
+        # (40 MHz AOM shifts over 400 THz Sr optical frequency)
+        # a relative error of 1E-12 is therefore acceptable to achieve 1E-19
+        # accuracy.
+        if not relative.is_nan() and abs(relative/target) > 1E-7:
+            num_string = '{:3.1E}'.format(target * dec.Decimal(1E-7))
+            text = (
+                'The relative correction for ' + par['name']
+                + ' exceeds ' + num_string
+                + ' (1E-7). Results will be inaccurate.'
+            )
+            self._logic.warning('Deviation from reference', text)
+            par['dev_warn'] = True
+        else:
+            par['dev_warn'] = False
+        par['result'] = result
+        par['uncert'] = combined_unc
+        par['deviation'] = deviation
+        par['frac_dev'] = frac_dev
+        par['frac_unc'] = frac_unc
+
+    #######################################################################
+    def update(self):
+        """
+        update calculation results for values now in parameters
+        configuration-dependent values are only recalculated after set_from_config
+        or a change in the channel table, results only for evaluations with new data
+        """
+        channel_key = self._channel_key()
+        config_changed = channel_key != self._config_key
+        if config_changed:
+            print("updating evaluation table")
+            self._update_config_values()
+            self._config_key = channel_key
+            self._dirty = set(range(self.count))
+            self._display = [] # format all columns again
+        changed = sorted(self._dirty)
+        for index in changed:
+            self._update_data_values(index)
+        self._dirty = set()
+        self.refresh_display(changed)
 
     #######################################################################
     # table data interface used by QTableView
@@ -291,122 +332,100 @@ class EvaluationTableModel(QtCore.QAbstractTableModel): # pylint: disable=locall
         return QtC.ItemIsEnabled
 
     #######################################################################
-    def data(self, index, role): # pylint: disable=locally-disabled, too-many-branches
+    def data(self, index, role):
         """ TableView: return formatted data """
         if not index.isValid():
             return None
         col = index.column()
         row = index.row()
+        if col >= len(self._display):
+            return None # not formatted yet
 
+        if role == QtC.DisplayRole:
+            return self._display[col][row]
+        elif role == QtC.BackgroundColorRole:
+            return self._background[col][row]
+        elif role == QtC.TextAlignmentRole:
+            if row == 0:
+                return QtC.AlignCenter
+            return QtC.AlignCenter | QtC.AlignRight
+        elif row == 0:
+            if role == QtC.ForegroundRole:
+                return self._logic.BLACK
+            elif role == QtC.CheckStateRole:
+                if self.parameters[col]['show']:
+                    return QtC.Checked
+                else:
+                    return QtC.Unchecked
+        return None
+
+    #######################################################################
+    def _format_column(self, col): # pylint: disable=locally-disabled, too-many-branches
+        """ formatted strings and background colors for all rows of one evaluation """
+        par = self.parameters[col]
         # number formatting for absolute frequency and ratio results
         style_absolute = '{:24,.4f}'
         style_ratio = '{:24,.19f}'
-        if self.parameters[col]['type'] == 1: # absolute frequency mode
+        if par['type'] == 1: # absolute frequency mode
             style = style_absolute
-        elif self.parameters[col]['type'] == 2: # frequency ratio mode
+        elif par['type'] == 2: # frequency ratio mode
             style = style_ratio
         else:
             style = 'undefined'
 
-        if row == 0:
-            if role == QtC.DisplayRole:
-                string = self.parameters[col]['name']
-                return string
-            elif role == QtC.BackgroundColorRole:
-                color = self.parameters[col]['color']
-                return color
-            elif role == QtC.ForegroundRole:
-                return self._logic.BLACK
-            elif role == QtC.TextAlignmentRole:
-                return QtC.AlignCenter
-            elif role == QtC.CheckStateRole:
-                if self.parameters[col]['show']:
-                    return QtC.Checked
-                else:
-                    return QtC.Unchecked
-            return None
-
-        if role == QtC.TextAlignmentRole:
-            return QtC.AlignCenter | QtC.AlignRight
-        elif role == QtC.BackgroundColorRole:
-            divider_rows = [5, 9, 14, 19]
-            if row in divider_rows:
-                color = self.parameters[col]['color']
-                return color
-            elif row == 8: # deviation warning
-                if self.parameters[col]['dev_warn']:
-                    return  Gr.DK_RED
-                else:
-                    return None
-            elif row == 11: # highlight main result
-                return  Gr.BLACK
-            return None
+        strings = [''] * self.ROW_NUMBER
+        strings[0] = par['name']
+        strings[1] = '{:11,.0f}     [ch {:+2d}]'.format(par['n_a'], int(par['ch_a']))
+        if par['type'] == 2:
+            # reference line only used for ratio
+            strings[2] = '{:11,.0f}     [ch {:+2d}]'.format(par['n_b'], int(par['ch_b']))
+        strings[3] = '{:11,.0f}     [ch {:+2d}]'.format(par['n_rep'], int(par['ch_rep']))
+        strings[4] = '{:11,.0f} // [ch {:+2d}]'.format(par['multiplier'], int(par['ch_ceo']))
+        for (row, key) in (
+                (6, 'r_ab'), (7, 'baseline'), (8, 'mean_relative'), (10, 'sys_cor'),
+                (11, 'result'), (12, 'uncert'), (13, 'sys_unc'), (15, 'target'),
+                (16, 'deviation')
+            ):
+            strings[row] = style.format(par[key])
+        strings[17] = '{:E}'.format(round(par['frac_dev'], 19))
+        strings[18] = '{:E}'.format(round(par['frac_unc'], 19))
 
-        elif role != QtC.DisplayRole:
-            return None
+        backgrounds = [None] * self.ROW_NUMBER
+        backgrounds[0] = par['color']
+        for row in self.DIVIDER_ROWS:
+            backgrounds[row] = par['color']
+        if par['dev_warn']: # deviation warning
+            backgrounds[8] = Gr.DK_RED
+        backgrounds[11] = Gr.BLACK # highlight main result
+        return strings, backgrounds
 
-        string = ''
-        if row == 1:
-            string = '{:11,.0f}     [ch {:+2d}]'.format(
-                self.parameters[col]['n_a'],
-                int(self.parameters[col]['ch_a'])
-            )
-        elif row == 2:
-            if self.parameters[col]['type'] == 2:
-                # reference line only used for ratio
-                string = '{:11,.0f}     [ch {:+2d}]'.format(
-                    self.parameters[col]['n_b'],
-                    int(self.parameters[col]['ch_b'])
-                )
-        elif row == 3:
-            string = '{:11,.0f}     [ch {:+2d}]'.format(
-                self.parameters[col]['n_rep'],
-                int(self.parameters[col]['ch_rep'])
-            )
-        elif row == 4:
-            string = '{:11,.0f} // [ch {:+2d}]'.format(
-                self.parameters[col]['multiplier'],
-                int(self.parameters[col]['ch_ceo'])
-            )
-        elif row == 6:
-            value = self.parameters[col]['r_ab']
-            string = style.format(value)
-        elif row == 7:
-            value = self.parameters[col]['baseline']
-            string = style.format(value)            
-        elif row == 8:
-            value = self.parameters[col]['mean_relative']
-            string = style.format(value)
-        elif row == 10:
-            value = self.parameters[col]['sys_cor']
-            string = style.format(value)
-        elif row == 11:
-            value = self.parameters[col]['result']
-            string = style.format(value)
-        elif row == 12:
-            value = self.parameters[col]['uncert']
-            string = style.format(value)
-        elif row == 13:
-            value = self.parameters[col]['sys_unc']
-            string = style.format(value)
-        elif row == 15:
-            value = self.parameters[col]['target']
-            string = style.format(value)
-        elif row == 16:
-            value = self.parameters[col]['deviation']
-            string = style.format(value)
-        elif row == 17:
-            value = self.parameters[col]['frac_dev']
-            value = round(value, 19)
-            string = '{:E}'.format(value)
-        elif row == 18:
-            value = self.parameters[col]['frac_unc']
-            value = round(value, 19)
-            string = '{:E}'.format(value)
-        return string
-    # TODO: implement plotting selection box
-        if role == QtC.CheckStateRole:
-            return None
+    #######################################################################
+    def refresh_display(self, columns):
+        """
+        format given columns (all columns if not yet formatted) and
+        notify view of cells that changed
+        """
+        if len(self._display) != self.count:
+            self._display = []
+            self._background = []
+            for col in range(self.count):
+                strings, backgrounds = self._format_column(col)
+                self._display.append(strings)
+                self._background.append(backgrounds)
+            self.update_view()
+            return
+        for col in columns:
+            strings, backgrounds = self._format_column(col)
+            changed = [
+                row for row in range(self.ROW_NUMBER)
+                if strings[row] != self._display[col][row]
+                or backgrounds[row] is not self._background[col][row]
+                ]
+            self._display[col] = strings
+            self._background[col] = backgrounds
+            for row in changed:
+                cell = self.createIndex(row, col)
+                self.dataChanged.emit(cell, cell, [QtC.DisplayRole, QtC.BackgroundColorRole])
 
     #######################################################################
     def update_view(self):
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+chunked export of time series to binary and text files
+Created on 2026/10/19
+@author: agent
+"""
+
+# Series are passed in as an iterator over row chunks (time in the first
+# column) together with the total number of rows. Only one chunk is held
+# in memory at a time, so a month of 1 s data exports with a memory
+# footprint set by the chunk size.
+#
+# Formats:
+#   npy      single N x C float64 .npy file, header written before the data
+#   columns  one N element .npy file per column, for memory-mapped loading
+#   csv      text file with '#' comment header, for sanity checks by hand
+# Binary formats get a .json sidecar with column names and metadata.
+
+import json
+
+import numpy as np
+
+EXPORT_FORMATS = ('npy', 'columns', 'csv')
+CHUNK_ROWS = 1 << 16
+DTYPE = np.dtype('<f8')
+
+###################################################################################################
+def export_series(basename, names, chunks, rows, fmt='npy', metadata=None):
+    """
+    write series to basename + extension for given format, returns (result, message)
+    names: list of column names, chunks: iterator over (n x len(names)) arrays
+    rows: total number of rows provided by chunks
+    """
+    if fmt not in EXPORT_FORMATS:
+        return (False, 'Unknown export format ' + str(fmt))
+    metadata = dict(metadata or {})
+    try:
+        if fmt == 'npy':
+            filename = basename + '.npy'
+            _write_npy(filename, len(names), chunks, rows)
+        elif fmt == 'columns':
+            filename = basename + '_{:s}.npy'.format(names[0])
+            _write_columns(basename, names, chunks, rows)
+        else:
+            filename = basename + '.csv'
+            _write_csv(filename, names, chunks, metadata)
+        if fmt != 'csv':
+            metadata.update({'format': fmt, 'columns': list(names), 'rows': rows})
+            with open(basename + '.json', 'w', encoding='utf-8') as file:
+                json.dump(metadata, file, indent=1)
+    except (OSError, ValueError) as error:
+        return (False, 'Failed to export to ' + basename + ':\n' + str(error))
+    return (True, filename)
+
+###################################################################################################
+def _npy_header(file, shape):
+    """ write .npy header for a C-ordered float64 array of given shape """
+    np.lib.format.write_array_header_1_0(file, {
+        'descr': np.lib.format.dtype_to_descr(DTYPE),
+        'fortran_order': False,
+        'shape': shape
+        })
+
+###################################################################################################
+def _write_npy(filename, columns, chunks, rows):
+    """ stream chunks into single 2D .npy file """
+    written = 0
+    with open(filename, 'wb') as file:
+        _npy_header(file, (rows, columns))
+        for chunk in chunks:
+            file.write(np.ascontiguousarray(chunk, dtype=DTYPE).tobytes())
+            written += len(chunk)
+    if written != rows:
+        raise ValueError('expected {:d} rows, received {:d}'.format(rows, written))
+
+###################################################################################################
+def _write_columns(basename, names, chunks, rows):
+    """ stream chunks into one .npy file per column """
+    files = [open(basename + '_{:s}.npy'.format(name), 'wb') for name in names]
+    written = 0
+    try:
+        for file in files:
+            _npy_header(file, (rows,))
+        for chunk in chunks:
+            for (col, file) in enumerate(files):
+                file.write(np.ascontiguousarray(chunk[:, col], dtype=DTYPE).tobytes())
+            written += len(chunk)
+    finally:
+        for file in files:
+            file.close()
+    if written != rows:
+        raise ValueError('expected {:d} rows, received {:d}'.format(rows, written))
+
+###################################################################################################
+def _write_csv(filename, names, chunks, metadata):
+    """ stream chunks into text file """
+    formats = ['%.3f'] + ['%.12g'] * (len(names) - 1) # time, values
+    with open(filename, 'w', encoding='utf-8') as file:
+        for (key, value) in metadata.items():
+            file.write('# {:s}: {:s}\n'.format(str(key), str(value)))
+        file.write(','.join(names) + '\n')
+        for chunk in chunks:
+            np.savetxt(file, np.asarray(chunk, dtype=DTYPE), fmt=formats, delimiter=',')
@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+vectorized data filters for frequency data
+Created on 2026/10/19
+@author: agent
+"""
+
+# All kernels take float64 arrays of one channel and return boolean
+# rejection arrays without touching the flag column, so that channels
+# can be processed in parallel worker threads. They only use numpy and
+# pandas operations that release the GIL for the bulk of the work.
+#
+# The rolling median follows linear drift exactly and is not pulled by
+# isolated glitches, so the residuals of a drifting beat note stay centered
+# on zero. Their spread is estimated by a second rolling median over the
+# absolute residuals, an O(N log w) stand-in for the per-window MAD (which
+# would need O(N w)). Both use the skiplist implementation in pandas.
+
+import math
+import numpy as np
+import pandas
+
+MAD_SCALE = 1.482602218505602 # MAD to standard deviation for gaussian noise
+MIN_GOOD_POINTS = 100 # outlier detection is skipped for channels with less good data
+
+###################################################################################################
+def band_rejections(values, band, overhang):
+    """
+    points out of the band +/- band around zero, with rejection extended by
+    overhang[0] points after and overhang[1] points before each out-of-band point
+    """
+    out_of_band = np.abs(values) > band
+    (block_forward, block_backwards) = overhang
+    # point i is rejected if any out-of-band point lies in [i - forward, i + backwards]
+    length = len(values)
+    counts = np.concatenate(([0], np.cumsum(out_of_band)))
+    index = np.arange(length)
+    lower = np.clip(index - block_forward, 0, length)
+    upper = np.clip(index + block_backwards + 1, 0, length)
+    return counts[upper] - counts[lower] > 0
+
+###################################################################################################
+def channel_outliers(values, good, method, window, threshold_factor):
+    """
+    outlier detection for one channel by selected method ('block' or 'median')
+    good: boolean array of points not rejected so far
+    returns boolean array, True for rejected points
+    """
+    rejected = np.zeros(len(values), dtype=bool)
+    good_values = values[good]
+    if len(good_values) < MIN_GOOD_POINTS:
+        return rejected # no remaining data
+    if method == 'median':
+        # drift-robust detection on good data only
+        rejected[good] = rolling_median_outliers(good_values, window, threshold_factor)
+        return rejected
+    return block_variance_outliers(values, good_values, threshold_factor)
+
+###################################################################################################
+def block_variance_outliers(values, good_values, threshold_factor):
+    """
+    compare all points to 5-point moving mean, limit from block-wise variance of good data
+    """
+    # data with drift are better handled by rolling_median_outliers
+    length = good_values.shape[0]
+    splits = math.ceil(length/300)
+    block_length = math.ceil(length/splits)
+    varlist = np.zeros(splits)
+    end_index = -1
+    for block in range(splits):
+        start_index = end_index + 1
+        end_index += block_length
+        if end_index >= length:
+            end_index = length # should be -1 ?
+        varlist[block] = np.var(good_values[start_index:end_index])
+    varlist[(varlist == 0)] = 1E6 # avoid divide by zero.
+    var = np.average(varlist, weights=1/varlist)
+    lim = math.sqrt(var) * threshold_factor
+
+    # compare data to local mean, constrain to "good" limit of deviation
+    width = 2 # total block to average: center element plus X on each side
+    elements = 2 * width + 1
+    local_mean = np.convolve(values, np.ones((elements,))/elements, mode='same')
+    # edges of data use first and last full block average
+    local_mean[:width] = local_mean[width]
+    local_mean[len(values)-width:] = local_mean[len(values)-width-1]
+    return np.abs(values - local_mean) > lim
+
+###################################################################################################
+def counter_resolution(values):
+    """ smallest non-zero step between consecutive values """
+    steps = np.abs(np.diff(values))
+    steps = steps[steps > 0]
+    return steps.min() if len(steps) > 0 else 0
+
+###################################################################################################
+def rolling_median_outliers(values, window, threshold_factor, resolution=None):
+    """
+    outlier detection against a centered rolling median
+    values: frequency data without gaps or previously rejected points
+    window: number of points in rolling window, rounded up to an odd number
+    threshold_factor: rejection limit in (MAD-estimated) standard deviations
+    resolution: counter resolution, determined from values if not given
+    returns boolean array, True for rejected points
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 3:
+        return np.zeros(len(values), dtype=bool)
+    window = int(window) | 1 # odd length keeps the window centered
+    series = pandas.Series(values)
+    median = series.rolling(window, center=True, min_periods=1).median()
+    residuals = (series - median).abs()
+    mad = residuals.rolling(window, center=True, min_periods=1).median().values
+    # quantized counter data can have windows with zero MAD,
+    # never reject a deviation of a single counter step
+    if resolution is None:
+        resolution = counter_resolution(values)
+    sigma = MAD_SCALE * np.maximum(mad, resolution)
+    return residuals.values > threshold_factor * sigma
+
+###################################################################################################
+def update_channel_outliers( # pylint: disable=locally-disabled, too-many-arguments
+        values, good, previous, method, window, threshold_factor, start, end
+    ):
+    """
+    outlier detection after the good points changed only between indices start and end
+    previous: (good, rejected) arrays of the last detection for this channel
+    returns the same result as channel_outliers(values, good, method, window, threshold_factor)
+    """
+    # The block method compares to a limit from all good data, a full run is
+    # needed (and cheap). The rolling median result at a point depends only on
+    # the good values within two half-windows, so only the points within that
+    # reach of the changed range are recalculated, from a slice twice as wide.
+    (previous_good, previous_rejected) = previous
+    good_index = np.flatnonzero(good)
+    good_values = values[good_index]
+    if (
+            method != 'median' or len(good_index) < MIN_GOOD_POINTS
+            or np.count_nonzero(previous_good) < MIN_GOOD_POINTS
+        ):
+        return channel_outliers(values, good, method, window, threshold_factor)
+    resolution = counter_resolution(good_values)
+    if resolution != counter_resolution(values[previous_good]):
+        return channel_outliers(values, good, method, window, threshold_factor)
+    reach = 2 * ((int(window) | 1) // 2) + 1
+    first = np.searchsorted(good_index, start, side='left')
+    last = np.searchsorted(good_index, end, side='right')
+    update_start = max(0, first - reach)
+    update_end = min(len(good_index), last + reach)
+    slice_start = max(0, update_start - reach)
+    slice_end = min(len(good_index), update_end + reach)
+    local = rolling_median_outliers(
+        good_values[slice_start:slice_end], window, threshold_factor, resolution
+        )
+    rejected = previous_rejected & good
+    rejected[good_index[update_start:update_end]] = (
+        local[update_start-slice_start:update_end-slice_start]
+        )
+    return rejected
@@ -19,7 +19,7 @@ from PyQt5.QtWidgets import ( # pylint: disable=locally-disabled, no-name-in-mod
     #QApplication, QWidget, #QPlainTextEdit,
     QFrame, QLabel, QTableView, QHeaderView, #QTableWidget, QTableWidgetItem,
     QFileDialog, QPushButton, QComboBox,
-    QAction,
+    QAction, QActionGroup,
     #QHBoxLayout,
     QVBoxLayout,
     QGridLayout,
@@ -149,6 +149,22 @@ class FreqEvalMain(QMainWindow):
         report_act.setStatusTip('Generate report and save config for current data file')
         report_act.triggered.connect(self._logic.save_report_passthru)
 
+        export_good_act = QAction('Export g&ood data', self)
+        export_good_act.setStatusTip('Export good data of all channels (format set by export_format)')
+        export_good_act.triggered.connect(
+            lambda checked: self._logic.export_passthru('good')
+            )
+
+        export_eval_act = QAction('Export &evaluated data', self)
+        export_eval_act.setStatusTip('Export evaluated time series (format set by export_format)')
+        export_eval_act.triggered.connect(
+            lambda checked: self._logic.export_passthru('evaluated')
+            )
+
+        sweep_act = QAction('Filter parameter s&weep', self)
+        sweep_act.setStatusTip('Evaluate a grid of filter settings (sweep_* in config)')
+        sweep_act.triggered.connect(self._logic.sweep_passthru)
+
         save_config_act = QAction('Save &default config', self)
         #save_config_act.setShortcut('Ctrl+O')
         save_config_act.setStatusTip('Save current channel and evaluation configuration as default')
@@ -163,6 +179,9 @@ class FreqEvalMain(QMainWindow):
         file_menu.addAction(open_act)
         file_menu.addAction(savemask_act)
         file_menu.addAction(report_act)
+        file_menu.addAction(export_good_act)
+        file_menu.addAction(export_eval_act)
+        file_menu.addAction(sweep_act)
         file_menu.addAction(save_config_act)
         file_menu.addAction(exit_act)
 
@@ -171,6 +190,16 @@ class FreqEvalMain(QMainWindow):
         mask_act.setStatusTip('Mask data between selected points')
         mask_act.triggered.connect(self._logic.mask_selected_passthru)
 
+        undo_mask_act = QAction('&Undo mask', self)
+        undo_mask_act.setShortcut('Ctrl+U')
+        undo_mask_act.setStatusTip('Revert last mask operation')
+        undo_mask_act.triggered.connect(self._logic.undo_mask_passthru)
+
+        redo_mask_act = QAction('&Redo mask', self)
+        redo_mask_act.setShortcut('Ctrl+Shift+U')
+        redo_mask_act.setStatusTip('Re-apply last reverted mask operation')
+        redo_mask_act.triggered.connect(self._logic.redo_mask_passthru)
+
         edit_mask_act = QAction('((&Edit masks))', self)
         edit_mask_act.setStatusTip('Edit list of applied masks')
         edit_mask_act.setChecked(True)
@@ -178,6 +207,8 @@ class FreqEvalMain(QMainWindow):
 
         mask_menu = menubar.addMenu('&Mask')
         mask_menu.addAction(mask_act)
+        mask_menu.addAction(undo_mask_act)
+        mask_menu.addAction(redo_mask_act)
         mask_menu.addAction(edit_mask_act)
 
         view_all_act = QAction('View &all', self)
@@ -218,6 +249,67 @@ class FreqEvalMain(QMainWindow):
         mask_menu.addAction(view3_act)        
         mask_menu.addAction(redraw_act)
 
+        adev_menu = menubar.addMenu('&ADev')
+        statistic_group = QActionGroup(self)
+        for (statistic, label) in self._logic.adev_table.STATISTIC_NAMES.items():
+            statistic_act = QAction(label, self, checkable=True)
+            statistic_act.setStatusTip('Select frequency stability statistic for table and plots')
+            statistic_act.setChecked(statistic == self._logic.adev_table.statistic)
+            statistic_act.triggered.connect(
+                lambda checked, name=statistic: self._logic.set_statistic_passthru(name)
+                )
+            statistic_group.addAction(statistic_act)
+            adev_menu.addAction(statistic_act)
+        adev_menu.addSeparator()
+        tau_mode_group = QActionGroup(self)
+        tau_mode_names = (
+            ('decade', 'τ: &decades'),
+            ('octave', 'τ: &octaves'),
+            ('decade10', 'τ: &10 per decade'),
+            ('all', 'τ: &all values')
+            )
+        for (tau_mode, label) in tau_mode_names:
+            tau_act = QAction(label, self, checkable=True)
+            tau_act.setStatusTip('Select spacing of averaging times for Allan deviations')
+            tau_act.setChecked(tau_mode == self._logic.adev_table.tau_mode)
+            tau_act.triggered.connect(
+                lambda checked, mode=tau_mode: self._logic.set_tau_mode_passthru(mode)
+                )
+            tau_mode_group.addAction(tau_act)
+            adev_menu.addAction(tau_act)
+        adev_menu.addSeparator()
+        budget_act = QAction('&Time-budgeted ADev', self, checkable=True)
+        budget_act.setStatusTip('Show fast non-overlapping estimates first and refine them later')
+        budget_act.setChecked(self._logic.adev_table.time_budget > 0)
+        budget_act.triggered.connect(self._logic.set_time_budget_passthru)
+        adev_menu.addAction(budget_act)
+        gaps_act = QAction('&Gap-aware ADev', self, checkable=True)
+        gaps_act.setStatusTip('Place data on regular time grid and exclude gaps from ADev')
+        gaps_act.setChecked(self._logic.adev_table.gap_aware)
+        gaps_act.triggered.connect(self._logic.set_gap_mode_passthru)
+        adev_menu.addAction(gaps_act)
+        adev_menu.addSeparator()
+        window_group = QActionGroup(self)
+        window_mode_names = (
+            ('off', 'Window overlay: o&ff'),
+            ('selection', 'Window overlay: &selected range'),
+            ('visible', 'Window overlay: &visible range')
+            )
+        for (window_mode, label) in window_mode_names:
+            window_act = QAction(label, self, checkable=True)
+            window_act.setStatusTip('Overlay ADev of a time window on the whole-file ADev')
+            window_act.setChecked(window_mode == self._logic.window_mode)
+            window_act.triggered.connect(
+                lambda checked, mode=window_mode: self._logic.set_window_mode_passthru(mode)
+                )
+            window_group.addAction(window_act)
+            adev_menu.addAction(window_act)
+        adev_menu.addSeparator()
+        bootstrap_act = QAction('&Bootstrap confidence intervals', self)
+        bootstrap_act.setStatusTip('Block bootstrap of ADev error bars (bootstrap_* in config)')
+        bootstrap_act.triggered.connect(self._logic.bootstrap_passthru)
+        adev_menu.addAction(bootstrap_act)
+
         self.file_info_label = QLabel('filename/filename/filename.fil : MJD 12345')
         self.statusBar().addPermanentWidget(self.file_info_label)
 
@@ -263,6 +355,16 @@ class FreqEvalMain(QMainWindow):
             )
         mask_table.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
 
+        range_table = QTableView()
+        range_table.setModel(self._logic.range_stats_table)
+        range_table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        vheader = range_table.verticalHeader()
+        vheader.setSectionResizeMode(QtWidgets.QHeaderView.Fixed) # pylint: disable=locally-disabled, no-member
+        vheader.setDefaultSectionSize(row_height)
+        range_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        range_table.setFixedHeight(mask_table.height())
+        range_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
         mask_button = QPushButton('Mask selected')
         mask_button.clicked.connect(self._logic.mask_selected_passthru)
 
@@ -301,11 +403,12 @@ class FreqEvalMain(QMainWindow):
         mask_frame_layout.addWidget(self._mask_channel_box, 2, 0, 1, 1)
         mask_frame_layout.addWidget(mask_button, 3, 0, 1, 1)
         mask_frame_layout.addWidget(mask_table, 0, 1, 4, 1)
-        mask_frame_layout.addWidget(spacer, 0, 2, 1, 1)
-        mask_frame_layout.addWidget(view_label, 0, 3, 1, 1)
-        mask_frame_layout.addWidget(view_button1, 1, 3, 1, 1)
-        mask_frame_layout.addWidget(view_button2, 2, 3, 1, 1)
-        mask_frame_layout.addWidget(view_button3, 3, 3, 1, 1)
+        mask_frame_layout.addWidget(range_table, 0, 2, 4, 1)
+        mask_frame_layout.addWidget(spacer, 0, 3, 1, 1)
+        mask_frame_layout.addWidget(view_label, 0, 4, 1, 1)
+        mask_frame_layout.addWidget(view_button1, 1, 4, 1, 1)
+        mask_frame_layout.addWidget(view_button2, 2, 4, 1, 1)
+        mask_frame_layout.addWidget(view_button3, 3, 4, 1, 1)
         
         ### scrollable sub-frame for results and configuration tables
         hor_spacer = QFrame()
@@ -313,8 +416,11 @@ class FreqEvalMain(QMainWindow):
 
         channel_table_title_label = QLabel("Channel settings")
         channel_table_title_label.setStyleSheet("font-weight: bold;")
-        ch_adev_table_title_label = QLabel("Instabilities (overlapping Allan deviation)")
-        ch_adev_table_title_label.setStyleSheet("font-weight: bold;")
+        self._adev_table_title_label = QLabel()
+        self._adev_table_title_label.setStyleSheet("font-weight: bold;")
+        self.set_adev_title(
+            self._logic.adev_table.STATISTIC_NAMES[self._logic.adev_table.statistic]
+            )
         evaluation_table_title_label = QLabel("Evaluation settings and results")
         evaluation_table_title_label.setStyleSheet("font-weight: bold;")
 
@@ -387,7 +493,7 @@ class FreqEvalMain(QMainWindow):
         results_frame_layout.addWidget(self._channel_table)
         results_frame_layout.addWidget(evaluation_table_title_label)
         results_frame_layout.addWidget(self._evaluation_table_view)
-        results_frame_layout.addWidget(ch_adev_table_title_label)
+        results_frame_layout.addWidget(self._adev_table_title_label)
         results_frame_layout.addWidget(self._adev_table_view)
         
         ### create scrollable area to wrap results frame ###
@@ -431,6 +537,10 @@ class FreqEvalMain(QMainWindow):
         """set normal display text of status bar"""
         self.statusBar().showMessage(text)
 
+    def set_adev_title(self, text):
+        """set title of instability table to name of displayed statistic"""
+        self._adev_table_title_label.setText("Instabilities (" + text + ")")
+
     def set_file_info(self, text):
         """set file information text in status bar"""
         self.file_info_label.setText(text)
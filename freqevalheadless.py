@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Program logic without GUI: evaluate data files and write reports
+Created on 2026/10/19
+@author: agent
+"""
+
+# HeadlessLogic provides the attributes DataHandler expects from the GUI
+# logic (configuration and table models), but no plots or status bar.
+# The table models are plain QObjects and work without a QApplication.
+# Results go to the same .rep/.json report files the GUI writes, and
+# ADev results are kept in the disk cache if adev_cache_dir is set, so
+# that opening the file in the GUI later finds them ready.
+
+import os.path
+import configparser
+
+from datahandler import DataHandler
+from channeltablehandler import ChannelTableModel
+from adevtablehandler import ADevTableModel
+from evaluationtablehandler import EvaluationTableModel
+
+class HeadlessLogic(object):
+    """ program logic for evaluation without GUI """
+
+    def __init__(self, config_file='default.cfg', cache_dir=None, settings=None):
+        super().__init__()
+        self.parameters = { # same defaults as FreqEvalLogic
+            'overhangs':[1, 10], # points marked bad before/after "out-of-band" point
+            'threshold':10 # x-sigma threshold for outlier detection
+        }
+        self.config = configparser.ConfigParser()
+        if config_file is not None:
+            self.config.read(config_file)
+        if settings is not None: # {section: {key: value}}, e.g. the GUI's current configuration
+            self.config.read_dict(settings)
+        if cache_dir is not None:
+            self.config['CONFIG']['adev_cache_dir'] = cache_dir
+
+        self.channel_table = ChannelTableModel(None, self)
+        self.channel_table.set_from_config()
+        self.evaluation_table = EvaluationTableModel(None, self)
+        self.evaluation_table.set_from_config(self.config)
+        self.evaluation_table.update()
+        self.adev_table = ADevTableModel(None, self)
+        self.adev_table.set_from_config(self.config)
+        self.adev_table.time_budget = 0 # nobody is waiting, always calculate full results
+        self.data = None
+
+    ###############################################################################################
+    def evaluate_file(self, filename, report=True):
+        """ load, filter and evaluate data file, returns (result, message) """
+        data = DataHandler(self)
+        loaded_values = data.load_file(filename)
+        if loaded_values <= 1:
+            return (False, 'No data in file ' + filename)
+        self.data = data
+        path, ext = os.path.splitext(filename)
+        del ext
+        retval, mask_count = data.load_maskfile(path+'.msk')
+        del retval
+        print(filename, ': ', mask_count, ' points masked')
+        data.filter_data(self.parameters['overhangs'], self.parameters['threshold'])
+        data.evaluate_ch_data()
+        data.evaluate_eval_data()
+        self.evaluation_table.update() # has new data from evaluation call
+        if not report:
+            return (True, 'ok')
+        if self.config['CONFIG'].getboolean('bootstrap_in_reports', False):
+            self.run_bootstrap()
+        return data.save_report(path+'.rep')
+
+    ###############################################################################################
+    def run_bootstrap(self):
+        """ bootstrap confidence intervals for current data, with bootstrap_* settings """
+        section = self.config['CONFIG']
+        return self.data.bootstrap_adev(
+            section.getint('bootstrap_resamples', 1000),
+            section.getint('bootstrap_block', 4),
+            section.getint('bootstrap_seed', 12345),
+            section.getint('bootstrap_workers', 0)
+            )
+
+    ###############################################################################################
+    def make_color(self, colorstring):
+        """ colors are only used for drawing, keep the string """
+        return colorstring
+
+    ###############################################################################################
+    def warning(self, title, text):
+        """ allow warning messages to be posted by subroutines """
+        print('!! '+title+': '+text)
+
+###################################################################################################
+def evaluate_file(filename, config_file='default.cfg', cache_dir=None):
+    """ evaluate a single file with fresh logic, suitable for worker processes """
+    logic = HeadlessLogic(config_file, cache_dir)
+    return logic.evaluate_file(filename)
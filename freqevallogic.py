@@ -10,11 +10,14 @@ Created on 2017/09/04
 # pylint: disable=locally-disabled, too-many-instance-attributes
 
 import os.path
+import threading
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 import pyqtgraph_core as pg
 
 from PyQt5 import Qt
 from PyQt5.QtCore import Qt as QtC # pylint: disable=locally-disabled, no-name-in-module
+from PyQt5.QtCore import QTimer # pylint: disable=locally-disabled, no-name-in-module
 from PyQt5.QtGui import QColor # pylint: disable=locally-disabled, no-name-in-module
 from PyQt5.QtGui import QPen # pylint: disable=locally-disabled, no-name-in-module
 # import pandas
@@ -23,10 +26,14 @@ import numpy as np
 
 from freqevalconstants import Gr # color definitions
 from datahandler import DataHandler, COL
-from selectiontablehandler import SelectionTableModel
+from prefetcher import DataPrefetcher
+import freqevalsweep
+import reportwriter
+from selectiontablehandler import SelectionTableModel, RangeStatsTableModel
 from channeltablehandler import ChannelTableModel
 from adevtablehandler import ADevTableModel
 from evaluationtablehandler import EvaluationTableModel
+import timeconvert
 
 class SelectedPoints(object):
     """ stores two selected points and their time values for mask selection """
@@ -36,6 +43,24 @@ class SelectedPoints(object):
         self.point_b = None
         self.color_b = None
 
+class UTCAxisItem(pg.AxisItem):
+    """ time axis labelled in UTC, plots use time relative to tmin """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tmin = 0
+
+    def set_tmin(self, tmin):
+        """ set reference time (UNIX timestamp) of loaded data and redraw """
+        self.tmin = tmin
+        self.picture = None
+        self.update()
+
+    def tickStrings(self, values, scale, spacing): # pylint: disable=locally-disabled, invalid-name
+        """ all tick labels are converted in one call """
+        decimals = 1 if spacing * scale < 1 else 0
+        times = np.asarray(values, dtype=np.float64) * scale + self.tmin
+        return list(timeconvert.utc_strings(times, decimals))
+
 # replaced by dictionary
 #class PlotInformation(object):
 #    """ stores reference to individual plots and their min/max values """
@@ -50,6 +75,9 @@ class FreqEvalLogic(object):
 
     BLACK = QColor('Black')
     GRAY = QColor('DarkGray')
+    WINDOW_MODES = ('off', 'selection', 'visible') # source of time window for ADev overlay
+    WINDOW_DELAY = 150 # ms without further changes before window ADev is started
+    WORKER_POLL = 50 # ms between checks for finished background work
 
     def __init__(self, gui):
         super().__init__()
@@ -57,6 +85,18 @@ class FreqEvalLogic(object):
         self.gui.set_status("Initializing backend")
         self._ch_plots = []
         self._eval_plots = []
+        self._utc_axes = []
+        # windowed ADev runs in a single background thread, newer requests cancel older ones
+        self.window_mode = 'off'
+        self._window_executor = ThreadPoolExecutor(max_workers=1)
+        self._window_generation = 0
+        self._window_cancel = threading.Event()
+        self._window_adev = {'channel': {}, 'evaluation': {}}
+        self._window_timer = QTimer()
+        self._window_timer.setSingleShot(True)
+        self._window_timer.timeout.connect(self._start_window_adev)
+        self._sweep_future = None # running filter parameter sweep
+        self._bootstrap_future = None # running bootstrap of ADev confidence intervals
         self._data_obj = None
         self._points = SelectedPoints() # initialize point selection storage
         self.parameters = {
@@ -69,6 +109,7 @@ class FreqEvalLogic(object):
 
         # logic class tracks table models and makes them available as needed
         self.selection_table = SelectionTableModel(None, self)
+        self.range_stats_table = RangeStatsTableModel(None, self)
         self.channel_table = ChannelTableModel(None, self)
         self.channel_table.set_from_config()
         print("now ", self.channel_table.count, " channels known.")
@@ -79,6 +120,14 @@ class FreqEvalLogic(object):
         self.evaluation_table.update()
 
         self.adev_table = ADevTableModel(None, self)
+        self.adev_table.set_from_config(self.config)
+        self._refine_generation = 0 # invalidates pending ADev refinement steps
+        self._refine_executor = ThreadPoolExecutor(max_workers=1) # ADev refinement steps
+        self._prefetcher = DataPrefetcher(
+            self,
+            self.config['CONFIG'].getint('prefetch_days', 0),
+            self.config['CONFIG'].getfloat('prefetch_memory', 1000)
+            )
 
         self.gui.set_status("Writing back to configuration file")
         with open('default.cfg', 'w') as configfile:
@@ -101,15 +150,19 @@ class FreqEvalLogic(object):
         self._g1.setSpacing(0.)
         self._g1.setContentsMargins(0., 1., 0., 1.)
         self._ch_plots = []
+        self._utc_axes = []
         num_plots = self.channel_table.count
         for index in range(num_plots):         
             name = 'plotA{:1.0f}'.format(index+1)
-            plot = self._g1.addPlot(row=index, col=0, name=name)
+            utc_axis = UTCAxisItem(orientation='bottom')
+            self._utc_axes.append(utc_axis)
+            plot = self._g1.addPlot(row=index, col=0, name=name, axisItems={'bottom': utc_axis})
             axis = plot.getAxis('left')
             axis.setStyle(tickTextWidth=textwidth, autoExpandTextSpace=False)
             plot.setContentsMargins(0, 0, 2, 0)  # left, top, right, bottom
             if index == 0:
                 first_plot = plot            
+                plot.sigXRangeChanged.connect(self._visible_range_changed)
             if index in (1, 2, 3):
                 # link x axis to first plot
                 plot.setXLink(first_plot)
@@ -132,7 +185,9 @@ class FreqEvalLogic(object):
         num_plots = self.evaluation_table.count
         for index in range(num_plots):
             name = 'plotB{:1.0f}'.format(index+1)
-            plot = self._g2.addPlot(row=index, col=0, name=name)
+            utc_axis = UTCAxisItem(orientation='bottom')
+            self._utc_axes.append(utc_axis)
+            plot = self._g2.addPlot(row=index, col=0, name=name, axisItems={'bottom': utc_axis})
             plot.setContentsMargins(0, 0, 2, 0)  # left, top, right, bottom
             plot.setXLink(first_plot)
             axis = plot.getAxis('left')
@@ -227,6 +282,17 @@ class FreqEvalLogic(object):
         time = self._points.point_a.pos()[0]
         self._points.point_a.setPen(penWhite)
         self.selection_table.set_selection(time)
+        self.update_range_statistics()
+        if self.window_mode == 'selection':
+            self.request_window_adev()
+
+    ###############################################################################################
+    def update_range_statistics(self):
+        """ show statistics for the time range between the selected points """
+        if not self._data_obj:
+            return
+        tstart, tend = self.selection_table.selected_range()
+        self.range_stats_table.set_statistics(self._data_obj.range_statistics(tstart, tend))
 
     ###############################################################################################
     def plot_time_series(self):
@@ -364,31 +430,34 @@ class FreqEvalLogic(object):
             print('[plot_adev] Reqested undefined plot for ', typestr)
             return
         plot.clear()
+        label = 'fractional ' + ADevTableModel.STATISTIC_NAMES[self.adev_table.statistic]
+        plot.setLabel('left', text=label, units=None, unitPrefix=None)
         for index in range(count):
             if do_channel:
-                adev = self.adev_table.channel_adev[index]
+                adev = self.adev_table.channel_adev.get(index)
                 color = self.channel_table.parameters[index]['color']
             elif do_evaluation:
-                adev = self.adev_table.evaluation_adev[index]
+                adev = self.adev_table.evaluation_adev.get(index)
                 color = self.evaluation_table.parameters[index]['color']
             else:
                 print('[plot_adev] Reqested undefined plot for ', typestr)
                 return
-            if not adev:
-                print('[plot_adev] Missing ADev data for index ', index)
-                return
+            if not adev: # missing, or series too short for any tau
+                continue
+            selected = self.adev_table.select(adev)
+            valid = np.isfinite(selected['log_devs'])
             scatter = pg.ScatterPlotItem(size=5, pen=pg.mkPen(None))
             scatter.addPoints(
-                x=adev['log_taus'],
-                y=adev['log_devs'],
+                x=selected['log_taus'][valid],
+                y=selected['log_devs'][valid],
                 brush=color
                 )
             bar = pg.ErrorBarItem(size=3, pen=color, beam=0.04)
             bar.setData(
-                x=adev['log_taus'],
-                y=adev['log_devs'],
-                top=adev['log_bar_up'],
-                bottom=adev['log_bar_down']
+                x=selected['log_taus'][valid],
+                y=selected['log_devs'][valid],
+                top=selected['log_bar_up'][valid],
+                bottom=selected['log_bar_down'][valid]
                 )
             times = np.log10([1, adev['time_span']])
             ref = adev['ref']
@@ -399,14 +468,32 @@ class FreqEvalLogic(object):
             plot.addItem(line)
             plot.addItem(bar)
             plot.addItem(scatter)
+            window_adev = self._window_adev[lower_typestring].get(index)
+            if window_adev is not None:
+                # ADev of the time window, same statistic as the whole-file result
+                selected = self.adev_table.select(window_adev)
+                valid = np.isfinite(selected['log_devs'])
+                overlay = pg.PlotCurveItem(
+                    pen=pg.mkPen(color, width=2, style=QtC.DashLine),
+                    x=selected['log_taus'][valid], y=selected['log_devs'][valid]
+                    )
+                plot.addItem(overlay)
         
     ###############################################################################################
     def open_data_file(self, filename):
         """ load data from file, trigger eval and redraw """
         outstring = "loading file "+ filename
         self.gui.set_status(outstring)
-        new_data = DataHandler(self)
-        loaded_values = new_data.load_file(filename)
+        new_data, filtered = self._prefetcher.take(
+            filename, self.parameters['overhangs'], self.parameters['threshold']
+            )
+        if new_data is not None:
+            print('using prefetched data for ', filename)
+            new_data.activate()
+            loaded_values = new_data.point_count()
+        else:
+            new_data = DataHandler(self)
+            loaded_values = new_data.load_file(filename)
         outstring = "loaded "+str(loaded_values)+" values per channel."
         print(outstring)
         self.gui.set_status(outstring)
@@ -416,29 +503,39 @@ class FreqEvalLogic(object):
             return
 
         tmin_mjd = self.selection_table.set_tmin(self._data_obj.get_tmin())
+        for axis in self._utc_axes:
+            axis.set_tmin(self._data_obj.get_tmin())
         file_info = '{:s} : MJD{:6.0f}'.format(filename, tmin_mjd)
         self.gui.set_file_info(file_info)
 
-        path, ext = os.path.splitext(filename)
-        maskfile = path+'.msk'
-        print('mask file candidate:', maskfile)
+        if filtered:
+            # mask was loaded and filters applied by the prefetcher
+            self._filter_plot_evaluate(refilter=False)
+        else:
+            path, ext = os.path.splitext(filename)
+            maskfile = path+'.msk'
+            print('mask file candidate:', maskfile)
 
-        outstring = "checking for mask file "+maskfile
-        self.gui.set_status(outstring)
-        retval, mask_count = self._data_obj.load_maskfile(maskfile)
-        del retval
-        outstring = str(mask_count)+" points masked"
-        self.gui.set_status(outstring)
-        self._filter_plot_evaluate()
+            outstring = "checking for mask file "+maskfile
+            self.gui.set_status(outstring)
+            retval, mask_count = self._data_obj.load_maskfile(maskfile)
+            del retval
+            outstring = str(mask_count)+" points masked"
+            self.gui.set_status(outstring)
+            self._filter_plot_evaluate()
+        self._prefetcher.schedule(
+            filename, self.parameters['overhangs'], self.parameters['threshold']
+            )
 
     ###############################################################################
-    def _filter_plot_evaluate(self):
+    def _filter_plot_evaluate(self, refilter=True):
         """ gets called on load and after manually adding to mask """
-        self.gui.set_status("filtering data")
-        self._data_obj.filter_data(
-            self.parameters['overhangs'],
-            self.parameters['threshold'],
-            )
+        if refilter:
+            self.gui.set_status("filtering data")
+            self._data_obj.filter_data(
+                self.parameters['overhangs'],
+                self.parameters['threshold'],
+                )
         self.gui.set_status('Evaluating channel data')
         self._data_obj.evaluate_ch_data()
         self.gui.set_status('Evaluating measurements')
@@ -448,7 +545,8 @@ class FreqEvalLogic(object):
 
         self.gui.set_status('Updating tables')
         self.channel_table.update_view()
-        self.evaluation_table.update_view()
+        self.update_range_statistics()
+        self.request_window_adev() # data changed, window results are outdated
         self.gui.set_status('Plotting data')
         self.plot_time_series()
         self.gui.set_status('Plotting channel Allan deviations')
@@ -457,7 +555,189 @@ class FreqEvalLogic(object):
         self.plot_eval_time_series()
         self.gui.set_status('Plotting evaluation Allan deviations')
         self.plot_adev('evaluation')
-        self.gui.set_status("ok")
+        self.adev_table.update_view()
+        self._refine_generation += 1
+        if self._data_obj.adev_refinement_pending():
+            # coarse results are shown now, refinement runs in a worker thread
+            self.gui.set_status('Refining Allan deviations')
+            self._refine_adev(self._refine_generation)
+        else:
+            self.gui.set_status("ok")
+
+    ###############################################################################
+    def _refine_adev(self, generation):
+        """ submit the next block of coarse ADev results to the refinement thread """
+        if generation != self._refine_generation or not self._data_obj:
+            return # data was re-evaluated in the meantime
+        job = self._data_obj.next_refinement()
+        if job is None:
+            self.gui.set_status("ok")
+            return
+        # settings are taken here, the worker must not read the live tables
+        future = self._refine_executor.submit(
+            self._data_obj.refine_adev, job, self.adev_table.settings()
+            )
+        QTimer.singleShot(
+            self.WORKER_POLL, lambda: self._collect_refinement(future, job, generation)
+            )
+
+    ###############################################################################
+    def _collect_refinement(self, future, job, generation):
+        """ show refined ADev results and continue with the next block """
+        if generation != self._refine_generation or not self._data_obj:
+            return # outdated, the result is discarded
+        if not future.done():
+            QTimer.singleShot(
+                self.WORKER_POLL, lambda: self._collect_refinement(future, job, generation)
+                )
+            return
+        try:
+            new_adev = future.result()
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            print('ADev refinement failed: ', repr(error))
+            self.gui.set_status('ADev refinement failed')
+            return
+        kind, index = self._data_obj.apply_refinement(job, new_adev)
+        del index
+        if kind == 'evaluation':
+            self.evaluation_table.update()
+        self.adev_table.update_view()
+        self.plot_adev(kind)
+        self._refine_adev(generation)
+
+    ###############################################################################################
+    def set_tau_mode_passthru(self, tau_mode):
+        """ select tau spacing for ADev calculation and re-evaluate """
+        if not self.adev_table.set_tau_mode(tau_mode):
+            return
+        self.config['CONFIG']['tau_mode'] = tau_mode
+        if self._data_obj:
+            self.gui.set_status('Recalculating Allan deviations for tau mode ' + tau_mode)
+            self._filter_plot_evaluate()
+
+    ###############################################################################################
+    def set_statistic_passthru(self, statistic):
+        """ switch displayed stability statistic, results are already available """
+        if not self.adev_table.set_statistic(statistic):
+            return
+        self.config['CONFIG']['adev_statistic'] = statistic
+        self.gui.set_adev_title(ADevTableModel.STATISTIC_NAMES[statistic])
+        self.adev_table.update_view()
+        if self._data_obj:
+            self.plot_adev('channel')
+            self.plot_adev('evaluation')
+
+    ###############################################################################################
+    def set_window_mode_passthru(self, mode):
+        """ select time window for ADev overlay: 'off', 'selection' or 'visible' range """
+        if mode not in self.WINDOW_MODES:
+            print('unknown window mode: ', mode)
+            return
+        self.window_mode = mode
+        self.request_window_adev()
+
+    ###############################################################################################
+    def _visible_range_changed(self, *args):
+        """ zooming or panning the time series changes the window in 'visible' mode """
+        del args
+        if self.window_mode == 'visible':
+            self.request_window_adev()
+
+    ###############################################################################################
+    def request_window_adev(self):
+        """ (re)start windowed ADev after a short delay, collapsing rapid changes """
+        self._window_cancel.set() # running calculation stops before its next series
+        self._window_timer.start(self.WINDOW_DELAY)
+
+    ###############################################################################################
+    def _window_range(self):
+        """ time window for current mode, None if there is none """
+        if self.window_mode == 'selection':
+            tstart, tend = self.selection_table.selected_range()
+        elif self.window_mode == 'visible' and self._ch_plots:
+            tstart, tend = self._ch_plots[0]['ref'].viewRange()[0]
+        else:
+            return None
+        if tend <= tstart:
+            return None
+        return (tstart, tend)
+
+    ###############################################################################################
+    def _start_window_adev(self):
+        """ submit windowed ADev of all series to the background thread """
+        self._window_generation += 1
+        window = self._window_range() if self._data_obj else None
+        if window is None:
+            if self._window_adev['channel'] or self._window_adev['evaluation']:
+                self._window_adev = {'channel': {}, 'evaluation': {}}
+                self.plot_adev('channel')
+                self.plot_adev('evaluation')
+            return
+        cancel = threading.Event()
+        self._window_cancel = cancel
+        # data views and settings are taken here, the worker must not read the live tables
+        series = self._data_obj.window_series(*window)
+        future = self._window_executor.submit(
+            self._data_obj.window_adev, series, self.adev_table.settings(), cancel
+            )
+        generation = self._window_generation
+        QTimer.singleShot(self.WORKER_POLL, lambda: self._collect_window_adev(future, generation))
+
+    ###############################################################################################
+    def _collect_window_adev(self, future, generation):
+        """ overlay windowed ADev when finished, discard outdated results """
+        if generation != self._window_generation:
+            return # superseded by a newer request
+        if not future.done():
+            QTimer.singleShot(
+                self.WORKER_POLL, lambda: self._collect_window_adev(future, generation)
+                )
+            return
+        try:
+            results = future.result()
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            print('window ADev failed: ', repr(error))
+            self.gui.set_status('window ADev failed')
+            return
+        if results is None:
+            return # cancelled
+        self._window_adev = {'channel': {}, 'evaluation': {}}
+        for (kind, index, adev) in results:
+            self._window_adev[kind][index] = adev
+        self.plot_adev('channel')
+        self.plot_adev('evaluation')
+
+    ###############################################################################################
+    def set_gap_mode_passthru(self, checked):
+        """ toggle gap-aware ADev calculation on regular time grid and re-evaluate """
+        self.adev_table.gap_aware = bool(checked)
+        self.config['CONFIG']['adev_gaps'] = 'yes' if checked else 'no'
+        if self._data_obj:
+            self.gui.set_status('Recalculating Allan deviations')
+            self._filter_plot_evaluate()
+
+    ###############################################################################################
+    def set_time_budget_passthru(self, checked):
+        """ toggle time-budgeted ADev mode (coarse results first, refined in background) """
+        DEFAULT_BUDGET = 2.0 # seconds
+        if checked:
+            budget = self.config['CONFIG'].getfloat('adev_time_budget', 0)
+            if budget <= 0:
+                budget = DEFAULT_BUDGET
+            self.adev_table.time_budget = budget
+        else:
+            self.adev_table.time_budget = 0
+
+    ###############################################################################################
+    def set_outlier_method_passthru(self, ch_index, method):
+        """ select outlier detection method for a channel and re-filter """
+        if not self.channel_table.set_outlier_method(ch_index, method):
+            return
+        self.config['CHANNEL{:d}'.format(ch_index+1)]['outlier_filter'] = method
+        self.channel_table.update_view()
+        if self._data_obj:
+            self.gui.set_status('Re-filtering data with ' + method + ' outlier detection')
+            self._filter_plot_evaluate()
 
     ###############################################################################################
     def save_maskfile_passthru(self, qval):
@@ -522,7 +802,155 @@ class FreqEvalLogic(object):
             self.gui.show_msg(
                 'Generate report file',
                 'Succesfully saved report to file:\n'
-                + maskfile
+                + repfile
+                )
+            self.gui.set_status('ok')
+
+    ###############################################################################################
+    def sweep_passthru(self, qval):
+        """ evaluate grid of filter parameters (sweep_* settings) in the background """
+        del qval
+        if not self._data_obj:
+            self.gui.show_msg(
+                'Failed to run parameter sweep',
+                'No data file is currently loaded.'
+                )
+            return
+        if self._sweep_future is not None:
+            self.gui.set_status('parameter sweep is already running')
+            return
+        points = freqevalsweep.grid_from_config(
+            self.config, (self.parameters['threshold'], self.parameters['overhangs'])
+            )
+        workers = self.config['CONFIG'].getint('sweep_workers', 0)
+        self.gui.set_status('sweeping {:d} filter parameter sets'.format(len(points)))
+        executor = ThreadPoolExecutor(max_workers=1) # waits for the process pool
+        self._sweep_future = executor.submit(
+            freqevalsweep.run_sweep, self._data_obj, self, points, workers
+            )
+        executor.shutdown(wait=False)
+        filename = self._data_obj.filename
+        QTimer.singleShot(self.WORKER_POLL, lambda: self._collect_sweep(filename))
+
+    ###############################################################################################
+    def _collect_sweep(self, filename):
+        """ write sweep table next to data file when finished """
+        if not self._sweep_future.done():
+            QTimer.singleShot(self.WORKER_POLL, lambda: self._collect_sweep(filename))
+            return
+        future = self._sweep_future
+        self._sweep_future = None
+        try:
+            rows = future.result()
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            self.gui.show_msg('Failed to run parameter sweep', repr(error))
+            self.gui.set_status('parameter sweep failed')
+            return
+        path, ext = os.path.splitext(filename)
+        del ext
+        sweepfile = path + '_sweep.csv'
+        status, message = freqevalsweep.write_sweep(sweepfile, rows)
+        if not status:
+            self.gui.show_msg(
+                'Failed to save parameter sweep',
+                'Saving sweep results failed with message:\n' + message
+                )
+            self.gui.set_status('failed to save parameter sweep')
+            return
+        self.gui.show_msg(
+            'Filter parameter sweep',
+            freqevalsweep.format_sweep(rows) + '\n\nTable saved to file:\n' + sweepfile
+            )
+        self.gui.set_status('ok')
+
+    ###############################################################################################
+    def bootstrap_passthru(self, qval):
+        """ bootstrap confidence intervals of ADev results (bootstrap_* settings) """
+        del qval
+        if not self._data_obj:
+            self.gui.show_msg(
+                'Failed to run bootstrap',
+                'No data file is currently loaded.'
+                )
+            return
+        if self._bootstrap_future is not None:
+            self.gui.set_status('bootstrap is already running')
+            return
+        section = self.config['CONFIG']
+        resamples = section.getint('bootstrap_resamples', 1000)
+        self.gui.set_status('bootstrapping ADev with {:d} resamples'.format(resamples))
+        data = self._data_obj
+        # data and ADev results are copied here, the worker must not read the live tables
+        jobs = data.bootstrap_jobs(
+            resamples, section.getint('bootstrap_block', 4), section.getint('bootstrap_seed', 12345)
+            )
+        executor = ThreadPoolExecutor(max_workers=1) # waits for the process pool
+        self._bootstrap_future = executor.submit(
+            data.bootstrap_intervals, jobs, section.getint('bootstrap_workers', 0)
+            )
+        executor.shutdown(wait=False)
+        QTimer.singleShot(self.WORKER_POLL, lambda: self._collect_bootstrap(data))
+
+    ###############################################################################################
+    def _collect_bootstrap(self, data):
+        """ show bootstrap intervals when finished, they are included in later reports """
+        if not self._bootstrap_future.done():
+            QTimer.singleShot(self.WORKER_POLL, lambda: self._collect_bootstrap(data))
+            return
+        future = self._bootstrap_future
+        self._bootstrap_future = None
+        try:
+            results = future.result()
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            self.gui.show_msg('Failed to run bootstrap', repr(error))
+            self.gui.set_status('bootstrap failed')
+            return
+        if data is not self._data_obj:
+            self.gui.set_status('bootstrap results discarded, a different file was opened')
+            return
+        if data.apply_bootstrap(results) < len(results):
+            print('bootstrap: ADev results changed meanwhile, some series were discarded')
+        report = data.report_data()
+        self.gui.show_msg(
+            'Bootstrap confidence intervals',
+            reportwriter.format_bootstrap(report.get('bootstrap', []))
+            )
+        self.gui.set_status('ok')
+
+    ###############################################################################################
+    def export_passthru(self, kind):
+        """ export good data ('good') or evaluated time series ('evaluated') next to data file """
+        if not self._data_obj:
+            self.gui.show_msg(
+                'Failed to export data',
+                'No data file is currently loaded.'
+                )
+            return
+        fmt = self.config['CONFIG'].get('export_format', 'npy').lower()
+        path, ext = os.path.splitext(self._data_obj.filename)
+        del ext
+        messages = []
+        if kind == 'good':
+            for index in range(self.channel_table.count):
+                self.gui.set_status('exporting good data of channel {:d}'.format(index+1))
+                messages.append(self._data_obj.export_good_data(
+                    path + '_ch{:d}'.format(index+1), index, fmt
+                    ))
+        else:
+            for index in range(self.evaluation_table.count):
+                self.gui.set_status('exporting evaluation {:d}'.format(index+1))
+                messages.append(self._data_obj.export_evaluation(
+                    path + '_eval{:d}'.format(index+1), index, fmt
+                    ))
+        failed = [message for (status, message) in messages if not status]
+        if failed:
+            self.gui.show_msg('Failed to export data', '\n'.join(failed))
+            self.gui.set_status('failed to export data')
+        else:
+            self.gui.show_msg(
+                'Export data',
+                'Succesfully exported data to files:\n'
+                + '\n'.join(message for (status, message) in messages)
                 )
             self.gui.set_status('ok')
 
@@ -552,8 +980,34 @@ class FreqEvalLogic(object):
         flags = self.gui.get_mask_flags()
         tstart, tend = self.selection_table.selected_range()
         self._data_obj.add_to_mask(tstart, tend, flags)
+        self._refilter_masked()
+
+    ###############################################################################################
+    def undo_mask_passthru(self, qval):
+        """ revert last mask operation """
+        del qval
+        if not self._data_obj or not self._data_obj.undo_mask():
+            self.gui.set_status("nothing to undo")
+            return
+        self._refilter_masked()
+
+    ###############################################################################################
+    def redo_mask_passthru(self, qval):
+        """ re-apply last reverted mask operation """
+        del qval
+        if not self._data_obj or not self._data_obj.redo_mask():
+            self.gui.set_status("nothing to redo")
+            return
+        self._refilter_masked()
+
+    ###############################################################################################
+    def _refilter_masked(self):
+        """ re-filter only around the changed mask range if possible, then re-evaluate """
         self.gui.set_status("Reevaluating masked data")
-        self._filter_plot_evaluate()
+        refiltered = self._data_obj.refilter_mask(
+            self.parameters['overhangs'], self.parameters['threshold']
+            )
+        self._filter_plot_evaluate(refilter=not refiltered)
 
     ###############################################################################################
     def make_color(self, colorstring):
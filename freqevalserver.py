@@ -0,0 +1,358 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Local JSON-RPC server: query evaluation results of data files from other programs
+Created on 2026/10/19
+@author: agent
+"""
+
+# Requests are JSON-RPC 2.0 calls POSTed to http://127.0.0.1:PORT/ (single
+# calls or batches). The server only binds to the loopback interface.
+# Other programs on this computer are trusted, web pages open in a browser
+# are not: requests must have Content-Type application/json (from a web
+# page, this needs a CORS preflight request, which the server does not
+# answer), and requests with an Origin header, which browsers add to POST
+# requests from pages, are refused.
+# Only files below the data directory given by --root are served.
+# A data file is loaded, filtered and evaluated once by the headless
+# pipeline (see freqevalheadless.py, ADev results come from the disk cache
+# if adev_cache_dir is set) when it is first requested. After that, its
+# report data and good time series are kept in memory as a read-only
+# dataset that all request threads share without locking. Only loading
+# and eviction of datasets is serialized; the least recently used dataset
+# is dropped when more than max_datasets are loaded.
+#
+# methods (params by name or position, 'file' as given to load):
+#   datasets()                          loaded files and their info
+#   load(file), unload(file)
+#   info(file)                          file information from report
+#   channels(file)                      channel statistics
+#   evaluations(file)                   evaluation results (Decimal as string)
+#   adev(file, statistic=None, series=None)
+#                                       ADev curves, all statistics and series by default
+#   timeseries(file, series, tstart=None, tend=None, max_points=2000)
+#                                       good data of 'C1'..'C4' or 'E1'.., relative time (s),
+#                                       averaged in bins if more than max_points
+#
+# usage: python freqevalserver.py --root DATADIR [--port 8765] [--config default.cfg]
+
+import os
+import sys
+import json
+import inspect
+import argparse
+import threading
+import socketserver
+import collections
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+import reportwriter
+from freqevalheadless import HeadlessLogic
+from datahandler import COL
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+MAX_REQUEST_SIZE = 1 << 20 # bytes
+
+class RPCError(Exception):
+    """ error to be returned as JSON-RPC error object """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+###################################################################################################
+def decimate(times, values, max_points):
+    """ average consecutive points in equal bins so that at most max_points remain """
+    length = len(values)
+    if max_points <= 0 or length <= max_points:
+        return times, values, 1
+    bin_size = -(-length // max_points) # ceiling division
+    full = (length // bin_size) * bin_size
+    times_out = times[:full].reshape(-1, bin_size).mean(axis=1)
+    values_out = values[:full].reshape(-1, bin_size).mean(axis=1)
+    if full < length: # shorter last bin
+        times_out = np.append(times_out, times[full:].mean())
+        values_out = np.append(values_out, values[full:].mean())
+    return times_out, values_out, bin_size
+
+class Dataset(object):
+    """ evaluated data file, read-only after construction """
+
+    def __init__(self, filename, config_file, cache_dir=None):
+        super().__init__()
+        self.filename = filename
+        logic = HeadlessLogic(config_file, cache_dir)
+        result, message = logic.evaluate_file(filename, report=False)
+        if not result:
+            raise RPCError(SERVER_ERROR, message)
+        data = logic.data
+        self.report = reportwriter.to_json(data.report_data())
+        self.tmin = data.get_tmin()
+        # typed copies of good data, (times, values) by series name
+        self.series = {}
+        for ch_index in range(COL.CHANNELS):
+            points, range_info = data.get_good_points(ch_index)
+            del range_info
+            points = np.array(points, dtype=np.float64).reshape(-1, 2)
+            self.series['C{:d}'.format(ch_index+1)] = (points[:, 0], points[:, 1])
+        for index in range(logic.evaluation_table.count):
+            points = np.asarray(data.get_evaluation_points(index), dtype=np.float64).reshape(-1, 2)
+            self.series['E{:d}'.format(index+1)] = (points[:, 0], points[:, 1])
+
+class FreqEvalService(object):
+    """ shared datasets and JSON-RPC methods """
+
+    METHODS = (
+        'datasets', 'load', 'unload', 'info', 'channels', 'evaluations', 'adev', 'timeseries'
+        )
+
+    def __init__(self, root, config_file='default.cfg', cache_dir=None, max_datasets=8):
+        super().__init__()
+        self.config_file = os.path.abspath(config_file)
+        self.root = os.path.realpath(root)
+        self.cache_dir = cache_dir
+        self.max_datasets = max(1, max_datasets)
+        self._datasets = collections.OrderedDict() # path: Dataset, least recently used first
+        self._lock = threading.Lock() # protects _datasets and _loading
+        self._loading = {} # path: lock held while that file is being loaded
+
+    ###############################################################################################
+    def _path(self, filename):
+        """ absolute path of requested file, restricted to root directory """
+        if not isinstance(filename, str) or not filename:
+            raise RPCError(INVALID_PARAMS, 'file name required')
+        path = os.path.realpath(os.path.join(self.root, filename))
+        if os.path.commonpath((self.root, path)) != self.root:
+            raise RPCError(INVALID_PARAMS, 'file outside data directory: ' + filename)
+        return path
+
+    ###############################################################################################
+    def _dataset(self, filename):
+        """ loaded dataset for file, loads it on first use """
+        path = self._path(filename)
+        with self._lock:
+            dataset = self._datasets.get(path)
+            if dataset is not None:
+                self._datasets.move_to_end(path)
+                return dataset
+            loading = self._loading.setdefault(path, threading.Lock())
+        with loading: # concurrent requests for the same file wait for a single load
+            with self._lock:
+                dataset = self._datasets.get(path)
+            if dataset is None:
+                print('server: loading ', path)
+                try:
+                    dataset = Dataset(path, self.config_file, self.cache_dir)
+                except: # pylint: disable=locally-disabled, bare-except
+                    with self._lock:
+                        self._loading.pop(path, None)
+                    raise
+                with self._lock: # one step, or a new request could start a second load
+                    self._loading.pop(path, None)
+                    self._datasets[path] = dataset
+                    while len(self._datasets) > self.max_datasets:
+                        evicted, unused = self._datasets.popitem(last=False)
+                        del unused
+                        print('server: dropping ', evicted)
+        return dataset
+
+    ###############################################################################################
+    def call(self, method, params):
+        """ dispatch a method call, params as list or dictionary """
+        if method not in self.METHODS:
+            raise RPCError(METHOD_NOT_FOUND, 'unknown method: ' + str(method))
+        function = getattr(self, 'rpc_' + method)
+        if isinstance(params, dict):
+            (args, kwargs) = ([], params)
+        else:
+            (args, kwargs) = (params, {})
+        try:
+            inspect.signature(function).bind(*args, **kwargs)
+        except TypeError as error:
+            raise RPCError(INVALID_PARAMS, str(error))
+        return function(*args, **kwargs)
+
+    ###############################################################################################
+    def rpc_datasets(self):
+        """ loaded files """
+        with self._lock:
+            datasets = list(self._datasets.values())
+        return [dataset.report['info'] for dataset in datasets]
+
+    ###############################################################################################
+    def rpc_load(self, file):
+        """ load file (if needed), returns file information """
+        return self._dataset(file).report['info']
+
+    ###############################################################################################
+    def rpc_unload(self, file):
+        """ drop dataset from memory, returns False if it was not loaded """
+        with self._lock:
+            return self._datasets.pop(self._path(file), None) is not None
+
+    ###############################################################################################
+    def rpc_info(self, file):
+        """ file information """
+        return self._dataset(file).report['info']
+
+    ###############################################################################################
+    def rpc_channels(self, file):
+        """ channel statistics """
+        return self._dataset(file).report['channels']
+
+    ###############################################################################################
+    def rpc_evaluations(self, file):
+        """ evaluation results """
+        return self._dataset(file).report['evaluations']
+
+    ###############################################################################################
+    def rpc_adev(self, file, statistic=None, series=None):
+        """ ADev curves, optionally only one statistic or series (label or 'C1', 'E2' ...) """
+        adev = self._dataset(file).report['adev']
+        curves = []
+        for entry in adev['series']:
+            if series is not None and entry['label'] != series \
+                    and entry['label'].split(':')[0] != series:
+                continue
+            if statistic is not None:
+                if statistic not in entry['stats']:
+                    raise RPCError(INVALID_PARAMS, 'unknown statistic: ' + str(statistic))
+                entry = dict(entry, stats={statistic: entry['stats'][statistic]})
+            curves.append(entry)
+        return {'taus': adev['taus'], 'key_tau': adev['key_tau'], 'series': curves}
+
+    ###############################################################################################
+    def rpc_timeseries(self, file, series, tstart=None, tend=None, max_points=2000):
+        """ good data of one series between relative times tstart and tend, binned """
+        dataset = self._dataset(file)
+        if series not in dataset.series:
+            raise RPCError(INVALID_PARAMS, 'unknown series: ' + str(series))
+        times, values = dataset.series[series]
+        start = 0 if tstart is None else np.searchsorted(times, float(tstart), side='left')
+        end = len(times) if tend is None else np.searchsorted(times, float(tend), side='right')
+        times, values, bin_size = decimate(times[start:end], values[start:end], int(max_points))
+        return {
+            'series': series,
+            'tmin': dataset.tmin, # UNIX time of relative time zero
+            'points': int(end - start),
+            'bin_size': bin_size,
+            'times': reportwriter.to_json(times),
+            'values': reportwriter.to_json(values)
+            }
+
+    ###############################################################################################
+    def handle(self, request):
+        """ JSON-RPC response for a single request object, None for notifications """
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if (
+                    not isinstance(request, dict) or request.get('jsonrpc') != '2.0'
+                    or not isinstance(request.get('method'), str)
+                ):
+                raise RPCError(INVALID_REQUEST, 'invalid request')
+            params = request.get('params', [])
+            if not isinstance(params, (list, dict)):
+                raise RPCError(INVALID_PARAMS, 'params must be list or object')
+            result = self.call(request['method'], params)
+        except RPCError as error:
+            response = {'code': error.code, 'message': error.message}
+            return {'jsonrpc': '2.0', 'error': response, 'id': request_id}
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            response = {'code': SERVER_ERROR, 'message': repr(error)}
+            return {'jsonrpc': '2.0', 'error': response, 'id': request_id}
+        if isinstance(request, dict) and 'id' not in request:
+            return None # notification
+        return {'jsonrpc': '2.0', 'result': result, 'id': request_id}
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """ HTTP transport for JSON-RPC, POST only """
+
+    ###############################################################################################
+    def do_POST(self): # pylint: disable=locally-disabled, invalid-name
+        """ decode request, dispatch, encode response """
+        service = self.server.service
+        if self.headers.get('Origin') is not None: # sent by browsers, not by local programs
+            self.send_error(403)
+            return
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self.send_error(415)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_REQUEST_SIZE:
+            self.send_error(413)
+            return
+        try:
+            request = json.loads(self.rfile.read(length).decode('UTF-8'))
+        except ValueError:
+            response = {
+                'jsonrpc': '2.0', 'id': None,
+                'error': {'code': PARSE_ERROR, 'message': 'parse error'}
+                }
+        else:
+            if isinstance(request, list): # batch
+                if request:
+                    response = [service.handle(item) for item in request]
+                    response = [item for item in response if item is not None] or None
+                else:
+                    response = service.handle(request)
+            else:
+                response = service.handle(request)
+        if response is None:
+            self.send_response(204)
+            self.end_headers()
+            return
+        body = json.dumps(response, allow_nan=False).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    ###############################################################################################
+    def log_message(self, format, *args): # pylint: disable=locally-disabled, redefined-builtin
+        """ only log errors, not every request """
+        del format, args
+
+class FreqEvalServer(socketserver.ThreadingMixIn, HTTPServer):
+    """ one thread per connection, all sharing the same service """
+    daemon_threads = True
+
+    def __init__(self, port, service):
+        super().__init__(('127.0.0.1', port), RequestHandler)
+        self.service = service
+
+###################################################################################################
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(description='Serve frequency evaluation results locally.')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port on 127.0.0.1')
+    parser.add_argument('--config', default='default.cfg', help='configuration file')
+    parser.add_argument('--root', required=True, help='only serve files below this directory')
+    parser.add_argument('--cache-dir', default=None, help='ADev cache directory')
+    parser.add_argument(
+        '--max-datasets', type=int, default=8, help='number of data files kept in memory'
+        )
+    args = parser.parse_args(argv)
+    service = FreqEvalService(args.root, args.config, args.cache_dir, args.max_datasets)
+    server = FreqEvalServer(args.port, service)
+    print('server: listening on http://127.0.0.1:{:d}/'.format(args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('server: stopping')
+    finally:
+        server.server_close()
+    return 0
+
+###################################################################################################
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Filter parameter sweep: sensitivity of evaluation results to filter settings
+Created on 2026/10/19
+@author: agent
+"""
+
+# Every combination of outlier threshold, band overhangs and a common scale
+# factor for the channel tolerances is filtered and evaluated against the
+# same loaded data. The typed data columns (see DataHandler.typed_columns)
+# are placed in one shared memory block. Each worker process builds its
+# DataHandler from it once and then evaluates its share of grid points;
+# nothing is parsed again and no data are pickled per point.
+#
+# Only the overlapping ADev is calculated in the workers (needed for the
+# extrapolated statistical uncertainty), channel ADev is skipped entirely.
+# For each point and evaluation the table lists the result, its fractional
+# shift from the result with the nominal settings, frac_unc, and the
+# fraction of points rejected.
+#
+# usage: python freqevalsweep.py DATAFILE [--thresholds 5,7,10,15]
+#        [--overhangs 1/10,2/20,5/50] [--tolerance-scales 0.5,1,2] [--workers N]
+
+import os
+import sys
+import csv
+import argparse
+import itertools
+import decimal as dec
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from datahandler import DataHandler
+from freqevalheadless import HeadlessLogic
+
+# channel table fields passed to workers, these may differ from the configuration file
+CHANNEL_FIELDS = ('base', 'tole', 'filt', 'ofil', 'owin', 'corr', 'aref')
+
+_WORKER = {} # per-process state, set up by _init_worker
+
+###################################################################################################
+def parse_list(text, convert=float):
+    """ comma-separated list of values """
+    return [convert(item) for item in text.split(',') if item.strip()]
+
+###################################################################################################
+def parse_overhangs(text):
+    """ comma-separated list of 'after/before' pairs """
+    return [
+        [int(value) for value in item.split('/')] for item in text.split(',') if item.strip()
+        ]
+
+###################################################################################################
+def sweep_grid(thresholds, overhangs, tolerance_scales, nominal):
+    """
+    all combinations of parameters as list of dictionaries
+    nominal: (threshold, overhangs) currently in use, always included with scale 1
+    """
+    nominal = (nominal[0], list(nominal[1]), 1)
+    points = []
+    for (threshold, overhang, scale) in itertools.product(thresholds, overhangs, tolerance_scales):
+        points.append({
+            'threshold': threshold, 'overhangs': list(overhang), 'tole_scale': scale,
+            'nominal': (threshold, list(overhang), scale) == nominal
+            })
+    if not any(point['nominal'] for point in points):
+        points.insert(0, {
+            'threshold': nominal[0], 'overhangs': nominal[1], 'tole_scale': 1, 'nominal': True
+            })
+    return points
+
+###################################################################################################
+def grid_from_config(config, nominal):
+    """ sweep grid from sweep_* settings in [CONFIG] """
+    section = config['CONFIG']
+    return sweep_grid(
+        parse_list(section.get('sweep_thresholds', '5, 7, 10, 15')),
+        parse_overhangs(section.get('sweep_overhangs', '1/10, 2/20, 5/50')),
+        parse_list(section.get('sweep_tolerance_scales', '0.5, 1, 2')),
+        nominal
+        )
+
+###################################################################################################
+def _init_worker(shared_name, shape, tmin, settings, channel_state):
+    """ worker process: build data handler from shared columns once """
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        columns = np.ndarray(shape, dtype=np.float64, buffer=shared.buf)
+        logic = HeadlessLogic(None, settings=settings)
+        parameters = logic.channel_table.parameters
+        for (key, values) in channel_state.items():
+            parameters[key] = values
+        data = DataHandler(logic)
+        data.load_columns(columns, tmin) # copies, shared block is not needed afterwards
+        del columns
+    finally:
+        shared.close()
+    data.adev_statistics = ('oadev',) # enough for the extrapolated uncertainty
+    _WORKER.update({'logic': logic, 'data': data, 'tolerances': parameters['tole'].copy()})
+
+###################################################################################################
+def _evaluate_point(point):
+    """ worker process: filter and evaluate with one set of parameters """
+    logic = _WORKER['logic']
+    data = _WORKER['data']
+    logic.channel_table.parameters['tole'] = _WORKER['tolerances'] * point['tole_scale']
+    data.filter_data(point['overhangs'], point['threshold'])
+    data.evaluate_eval_data()
+    logic.evaluation_table.update()
+    total = data.point_count()
+    rows = []
+    for (index, par) in enumerate(logic.evaluation_table.parameters):
+        points = len(data.get_evaluation_points(index))
+        rows.append({
+            'evaluation': par['name'],
+            'result': par.get('result', dec.Decimal('NaN')),
+            'frac_unc': float(par.get('frac_unc', 'NaN')),
+            'points': points,
+            'rejected': 1 - points / total if total > 0 else float('NaN')
+            })
+    return rows
+
+###################################################################################################
+def run_sweep(data, logic, points, workers=None):
+    """
+    evaluate data (a loaded DataHandler) for all grid points in a process pool
+    returns list of rows, one per grid point and evaluation
+    """
+    columns = data.typed_columns()
+    shared = shared_memory.SharedMemory(create=True, size=max(1, columns.nbytes))
+    try:
+        np.ndarray(columns.shape, dtype=np.float64, buffer=shared.buf)[:] = columns
+        settings = {section: dict(logic.config[section]) for section in logic.config.sections()}
+        parameters = logic.channel_table.parameters
+        channel_state = {key: parameters[key].copy() for key in CHANNEL_FIELDS}
+        workers = workers or os.cpu_count() or 1
+        # spawned workers: forking the GUI process from its sweep thread is not safe
+        with ProcessPoolExecutor(
+                max_workers=min(workers, len(points)),
+                mp_context=multiprocessing.get_context('spawn'), initializer=_init_worker,
+                initargs=(shared.name, columns.shape, data.get_tmin(), settings, channel_state)
+            ) as executor:
+            results = list(executor.map(_evaluate_point, points))
+    finally:
+        shared.close()
+        shared.unlink()
+    nominal = {}
+    for (point, evaluations) in zip(points, results):
+        if point['nominal']:
+            nominal = {row['evaluation']: row['result'] for row in evaluations}
+    rows = []
+    for (point, evaluations) in zip(points, results):
+        for row in evaluations:
+            reference = nominal.get(row['evaluation'], dec.Decimal('NaN'))
+            if row['result'].is_finite() and reference.is_finite() and reference != 0:
+                shift = float((row['result'] - reference) / reference)
+            else:
+                shift = float('NaN')
+            rows.append({
+                'threshold': point['threshold'],
+                'overhang_after': point['overhangs'][0],
+                'overhang_before': point['overhangs'][1],
+                'tole_scale': point['tole_scale'],
+                'evaluation': row['evaluation'],
+                'result': row['result'],
+                'shift': shift, # fractional change from nominal result
+                'frac_unc': row['frac_unc'],
+                'points': row['points'],
+                'rejected': row['rejected']
+                })
+    return rows
+
+###################################################################################################
+def write_sweep(filename, rows):
+    """ write sweep table as CSV, returns (result, message) """
+    fields = (
+        'threshold', 'overhang_after', 'overhang_before', 'tole_scale', 'evaluation',
+        'result', 'shift', 'frac_unc', 'points', 'rejected'
+        )
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+    except OSError as error:
+        return (False, str(error))
+    return (True, 'ok')
+
+###################################################################################################
+def format_sweep(rows):
+    """ text summary: largest shift of each evaluation relative to its uncertainty """
+    lines = []
+    for name in sorted(set(row['evaluation'] for row in rows)):
+        entries = [
+            row for row in rows if row['evaluation'] == name and np.isfinite(row['shift'])
+            ]
+        if not entries:
+            lines.append('{:s}: no results'.format(name))
+            continue
+        worst = max(entries, key=lambda row: abs(row['shift']))
+        lines.append(
+            '{:s}: max. shift {:.2E} ({:.2f} x frac. unc.) at threshold {:g}, '
+            'overhangs {:d}/{:d}, tolerance x{:g}; rejected {:.1%} ... {:.1%}'.format(
+                name, worst['shift'], abs(worst['shift']) / worst['frac_unc'],
+                worst['threshold'], worst['overhang_after'], worst['overhang_before'],
+                worst['tole_scale'],
+                min(row['rejected'] for row in entries), max(row['rejected'] for row in entries)
+                )
+            )
+    return '\n'.join(lines)
+
+###################################################################################################
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(description='Sweep filter parameters for one data file.')
+    parser.add_argument('datafile', help='frequency data file (.csv)')
+    parser.add_argument('--config', default='default.cfg', help='configuration file')
+    parser.add_argument('--thresholds', default=None, help='outlier thresholds, e.g. 5,7,10')
+    parser.add_argument('--overhangs', default=None, help='band overhangs, e.g. 1/10,2/20')
+    parser.add_argument('--tolerance-scales', default=None, help='tolerance factors, e.g. 0.5,1,2')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--output', default=None, help='CSV file (default: DATAFILE_sweep.csv)')
+    args = parser.parse_args(argv)
+    logic = HeadlessLogic(args.config)
+    section = logic.config['CONFIG']
+    for (option, key) in (
+            ('thresholds', 'sweep_thresholds'), ('overhangs', 'sweep_overhangs'),
+            ('tolerance_scales', 'sweep_tolerance_scales')
+        ):
+        if getattr(args, option) is not None:
+            section[key] = getattr(args, option)
+    data = DataHandler(logic)
+    if data.load_file(args.datafile) <= 1:
+        print('sweep: no data in file ', args.datafile)
+        return 1
+    path = os.path.splitext(args.datafile)[0]
+    data.load_maskfile(path + '.msk')
+    points = grid_from_config(
+        logic.config, (logic.parameters['threshold'], logic.parameters['overhangs'])
+        )
+    print('sweep: evaluating ', len(points), ' parameter sets')
+    rows = run_sweep(data, logic, points, args.workers)
+    output = args.output or path + '_sweep.csv'
+    result, message = write_sweep(output, rows)
+    if not result:
+        print('sweep: failed to write ', output, ': ', message)
+        return 1
+    print(format_sweep(rows))
+    print('sweep: table written to ', output)
+    return 0
+
+###################################################################################################
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Watch-folder service: evaluate new or changed data files automatically
+Created on 2026/10/19
+@author: agent
+"""
+
+# The directory is polled (no extra dependencies, works on network shares).
+# A data file is identified by the modification time and size of the .csv
+# file and its .msk file. A file is queued once that signature has been
+# stable for the settle time, so files still being written by the counter
+# software are not picked up early. A new or edited mask file changes the
+# signature and triggers re-evaluation. Files whose report is newer than
+# both data and mask file count as done when the service starts.
+#
+# usage: python freqevalwatch.py DIRECTORY [--config default.cfg] [--workers 2]
+
+import os
+import sys
+import time
+import fnmatch
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import freqevalheadless
+
+class FolderWatcher(object):
+    """ track data files in a directory and evaluate them in a worker pool """
+
+    def __init__( # pylint: disable=locally-disabled, too-many-arguments
+            self, directory, config_file='default.cfg', workers=2,
+            settle_time=60, pattern='freq_MJD_*.csv', cache_dir=None
+        ):
+        super().__init__()
+        self.directory = directory
+        self.config_file = os.path.abspath(config_file)
+        self.workers = max(1, workers)
+        self.settle_time = settle_time
+        self.pattern = pattern
+        self.cache_dir = cache_dir
+        self._done = {} # filename: signature of last evaluation
+        self._candidates = {} # filename: (signature, time first seen with this signature)
+        self._running = {} # future: (filename, signature)
+
+    ###############################################################################################
+    def _signature(self, filename):
+        """ (mtime, size) of data file and mask file, None if data file is missing """
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        try:
+            mask_stat = os.stat(os.path.splitext(filename)[0] + '.msk')
+            signature += (mask_stat.st_mtime_ns, mask_stat.st_size)
+        except OSError:
+            signature += (0, 0)
+        return signature
+
+    ###############################################################################################
+    def _report_is_current(self, filename, signature):
+        """ check if report is newer than data and mask file """
+        try:
+            report_time = os.stat(os.path.splitext(filename)[0] + '.rep').st_mtime_ns
+        except OSError:
+            return False
+        return report_time >= max(signature[0], signature[2])
+
+    ###############################################################################################
+    def scan(self, now):
+        """ update candidate list from directory contents """
+        try:
+            names = os.listdir(self.directory)
+        except OSError as error:
+            print('watch: cannot read directory ', self.directory, ': ', error)
+            return
+        for name in fnmatch.filter(names, self.pattern):
+            filename = os.path.join(self.directory, name)
+            signature = self._signature(filename)
+            if signature is None:
+                continue
+            if filename not in self._done and self._report_is_current(filename, signature):
+                self._done[filename] = signature
+            if self._done.get(filename) == signature:
+                self._candidates.pop(filename, None)
+                continue
+            previous = self._candidates.get(filename)
+            if previous is None or previous[0] != signature:
+                self._candidates[filename] = (signature, now) # new or still changing
+
+    ###############################################################################################
+    def ready(self, now):
+        """ candidates with stable signature that are not being evaluated """
+        busy = set(filename for (filename, signature) in self._running.values())
+        return sorted(
+            filename for (filename, (signature, since)) in self._candidates.items()
+            if now - since >= self.settle_time and filename not in busy
+            )
+
+    ###############################################################################################
+    def _collect(self):
+        """ process finished evaluations """
+        for future in [future for future in self._running if future.done()]:
+            filename, signature = self._running.pop(future)
+            try:
+                status, message = future.result()
+            except Exception as error: # pylint: disable=locally-disabled, broad-except
+                status, message = False, repr(error)
+            if status:
+                print('watch: evaluated ', filename)
+            else:
+                print('watch: failed to evaluate ', filename, ': ', message)
+            # failed files are not retried until they change
+            self._done[filename] = signature
+            candidate = self._candidates.get(filename)
+            if candidate is not None and candidate[0] == signature:
+                del self._candidates[filename]
+
+    ###############################################################################################
+    def run(self, interval=30, once=False):
+        """ poll directory until interrupted, or until all files are done for once=True """
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while True:
+                    now = time.time()
+                    self._collect()
+                    self.scan(now)
+                    for filename in self.ready(now):
+                        if len(self._running) >= self.workers:
+                            break # bounded queue: the rest waits for the next poll
+                        print('watch: queueing ', filename)
+                        future = executor.submit(
+                            freqevalheadless.evaluate_file,
+                            filename, self.config_file, self.cache_dir
+                            )
+                        self._running[future] = (filename, self._candidates[filename][0])
+                    if once and not self._running and not self._candidates:
+                        break
+                    time.sleep(interval)
+            except KeyboardInterrupt:
+                print('watch: stopping, waiting for running evaluations')
+
+###################################################################################################
+def main(argv=None):
+    """ command line entry point """
+    parser = argparse.ArgumentParser(description='Evaluate frequency data files in a directory.')
+    parser.add_argument('directory', help='directory to watch')
+    parser.add_argument('--config', default='default.cfg', help='configuration file')
+    parser.add_argument('--workers', type=int, default=2, help='number of worker processes')
+    parser.add_argument('--interval', type=float, default=30, help='polling interval (s)')
+    parser.add_argument(
+        '--settle', type=float, default=60,
+        help='time (s) a file must remain unchanged before it is evaluated'
+        )
+    parser.add_argument('--pattern', default='freq_MJD_*.csv', help='data file name pattern')
+    parser.add_argument('--cache-dir', default=None, help='ADev cache directory')
+    parser.add_argument('--once', action='store_true', help='exit when all files are evaluated')
+    args = parser.parse_args(argv)
+    watcher = FolderWatcher(
+        args.directory, args.config, args.workers, args.settle, args.pattern, args.cache_dir
+        )
+    print('watch: watching ', args.directory, ' with ', watcher.workers, ' workers')
+    watcher.run(args.interval, args.once)
+    return 0
+
+###################################################################################################
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+background loading of data files for adjacent days
+Created on 2026/10/19
+@author: agent
+"""
+
+# Data files are named by MJD (freq_MJD_57997.csv). After a file is opened,
+# the files of the neighbouring days in the same directory are loaded,
+# masked and filtered in a small worker pool, nearest days first. Loading
+# does not touch the shared table models (DataHandler.load_file with
+# activate=False), so this is safe while the GUI works on the current
+# file. Evaluation and ADev still run when the file is opened, but these
+# profit from the ADev cache.
+#
+# Finished data sets are kept while their estimated size fits into the
+# memory budget; the ones farthest from the current day are dropped first.
+# Filter results are only reused if the filter settings have not changed
+# in the meantime, otherwise the file is filtered again when it is opened.
+# The file of the current day is still being written: modification time
+# and size of data and mask file are recorded before loading, and a
+# prefetched data set is dropped if either file has changed since.
+
+import os
+import re
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from datahandler import DataHandler
+
+MJD_PATTERN = re.compile(r'(MJD_)(\d+)')
+
+###################################################################################################
+def file_mjd(filename):
+    """ MJD from data file name, None if the name does not contain one """
+    match = MJD_PATTERN.search(os.path.basename(filename))
+    return int(match.group(2)) if match else None
+
+###################################################################################################
+def _normalized(filename):
+    """ comparable path, file dialogs and os.path.join may differ in separators """
+    return os.path.normcase(os.path.abspath(filename))
+
+###################################################################################################
+def file_state(filename):
+    """ modification time and size of data file and mask file, None for missing files """
+    state = []
+    for name in (filename, os.path.splitext(filename)[0] + '.msk'):
+        try:
+            stat = os.stat(name)
+        except OSError:
+            state.append(None)
+        else:
+            state.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(state)
+
+###################################################################################################
+def neighbour_files(filename, days):
+    """ existing data files up to 'days' days before and after, nearest first """
+    mjd = file_mjd(filename)
+    if mjd is None:
+        return []
+    directory, basename = os.path.split(filename)
+    neighbours = []
+    for distance in range(1, days+1):
+        for offset in (distance, -distance): # next day first, as days are usually stepped forward
+            name = MJD_PATTERN.sub(
+                lambda match, value=mjd+offset: match.group(1) + str(value), basename, count=1
+                )
+            path = _normalized(os.path.join(directory, name))
+            if os.path.isfile(path):
+                neighbours.append(path)
+    return neighbours
+
+class DataPrefetcher(object):
+    """ load and filter adjacent-day files in background threads """
+
+    def __init__(self, logic, days=1, memory_budget=1000, workers=2):
+        super().__init__()
+        self._logic = logic
+        self.days = days
+        self.memory_budget = memory_budget * 1024 * 1024 # MB
+        self._executor = ThreadPoolExecutor(max_workers=workers) if days > 0 else None
+        self._entries = collections.OrderedDict() # filename: future, nearest day first
+        self._center = None # MJD of the current file
+        self._lock = threading.RLock() # entries are also trimmed from worker threads
+
+    ###############################################################################################
+    def _load(self, filename, overhangs, threshold):
+        """ worker: load, mask and filter file, returns (DataHandler, file state) or None """
+        state = file_state(filename) # before reading, later changes must not go unnoticed
+        data = DataHandler(self._logic)
+        if data.load_file(filename, activate=False) <= 1:
+            return None
+        data.load_maskfile(os.path.splitext(filename)[0] + '.msk')
+        data.filter_data(overhangs, threshold)
+        print('prefetched ', filename, ' ({:.0f} MB)'.format(data.memory_estimate() / 1E6))
+        return (data, state)
+
+    ###############################################################################################
+    def _trim(self, future=None):
+        """ drop finished data sets farthest from current day until the budget is met """
+        del future
+        with self._lock:
+            finished = [
+                (filename, entry) for (filename, entry) in self._entries.items()
+                if entry.done() and not entry.cancelled() and entry.exception() is None
+                and entry.result() is not None
+                ]
+            total = sum(entry.result()[0].memory_estimate() for (filename, entry) in finished)
+            finished.sort(key=lambda item: abs(file_mjd(item[0]) - self._center))
+            while finished and total > self.memory_budget:
+                filename, entry = finished.pop()
+                total -= entry.result()[0].memory_estimate()
+                del self._entries[filename]
+                print('prefetch: memory budget exceeded, dropping ', filename)
+
+    ###############################################################################################
+    def schedule(self, filename, overhangs, threshold):
+        """ start loading the neighbours of the file just opened """
+        if self._executor is None:
+            return
+        wanted = neighbour_files(filename, self.days)
+        with self._lock:
+            self._center = file_mjd(filename)
+            for name in list(self._entries):
+                if name not in wanted:
+                    self._entries.pop(name).cancel() # only stops entries not yet started
+            entries = collections.OrderedDict()
+            for name in wanted:
+                entry = self._entries.get(name)
+                if entry is None:
+                    entry = self._executor.submit(self._load, name, list(overhangs), threshold)
+                    entry.add_done_callback(self._trim)
+                entries[name] = entry
+            self._entries = entries
+
+    ###############################################################################################
+    def take(self, filename, overhangs, threshold):
+        """
+        prefetched data for file, waits if it is being loaded
+        returns (DataHandler, filtered) or (None, False) if not prefetched
+        """
+        with self._lock:
+            entry = self._entries.pop(_normalized(filename), None)
+        if entry is None or entry.cancel(): # not started yet: faster to load directly
+            return (None, False)
+        try:
+            result = entry.result()
+        except Exception as error: # pylint: disable=locally-disabled, broad-except
+            print('prefetch of ', filename, ' failed: ', repr(error))
+            return (None, False)
+        if result is None:
+            return (None, False)
+        data, state = result
+        if file_state(filename) != state:
+            print('prefetch: ', filename, ' has changed, loading it again')
+            return (None, False)
+        return (data, data.is_filtered(overhangs, threshold))
@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+report file generation from evaluation results
+Created on 2026/10/19
+@author: agent
+"""
+
+# The report is assembled by DataHandler.report_data() from results that
+# are already in memory, so writing it never re-runs an analysis step.
+# Each report is written twice: as human-readable .rep text file and as
+# .json twin for scripts. Decimal values are kept as strings in the JSON
+# file to preserve their full precision, NaN values become null.
+
+import os
+import json
+import math
+import decimal as dec
+
+import numpy as np
+
+REPORT_VERSION = 1
+
+###################################################################################################
+def write_report(repfile, report):
+    """ write report to .rep text file and .json twin, returns (result, message) """
+    jsonfile = os.path.splitext(repfile)[0] + '.json'
+    try:
+        with open(repfile, 'w', encoding='utf-8') as file:
+            file.write(format_report(report))
+        with open(jsonfile, 'w', encoding='utf-8') as file:
+            json.dump(to_json(report), file, indent=1, allow_nan=False)
+            file.write('\n')
+    except (OSError, ValueError) as error:
+        return (False, 'Failed to write report file ' + repfile + ':\n' + str(error))
+    return (True, 'ok')
+
+###################################################################################################
+def to_json(value):
+    """ recursively convert report content to JSON-compatible types """
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for (key, item) in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json(item) for item in value]
+    if isinstance(value, dec.Decimal):
+        return None if value.is_nan() else str(value)
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, bytes):
+        return value.decode('UTF-8')
+    return value
+
+###################################################################################################
+def _number(value, fmt):
+    """ format number, NaN or missing values are shown as '---' """
+    try:
+        if isinstance(value, dec.Decimal):
+            if not value.is_finite():
+                return '---'
+        elif value is None or not math.isfinite(value):
+            return '---'
+        return format(value, fmt)
+    except (TypeError, ValueError):
+        return '---'
+
+###################################################################################################
+def format_report(report):
+    """ text representation of report """
+    lines = []
+    info = report['info']
+    lines.append('# frequency evaluation report (version {:d})'.format(info['version']))
+    lines.append('data file     : ' + str(info['data_file']))
+    lines.append('MJD           : {:d}'.format(info['mjd']))
+    lines.append('UTC range     : ' + str(info['utc_first']) + ' -- ' + str(info['utc_last']))
+    lines.append('data points   : {:d}'.format(info['points']))
+    lines.append('time step (s) : ' + _number(info['time_step'], '.3f'))
+    lines.append('statistic     : ' + str(info['statistic']))
+    scan = info['time_scan']
+    lines.append(
+        'time stamps   : {:d} gaps ({:d} missing), {:d} duplicates, {:d} backward,'
+        ' {:d} resyncs'.format(
+            scan['gaps'], scan['missing_points'], scan['duplicates'],
+            scan['backward_steps'], scan['resyncs']
+            ))
+    lines.append('')
+
+    lines.append('[channels]')
+    lines.append('{:>3s} {:<10s} {:>16s} {:>20s} {:>8s} {:>8s} {:>8s} {:>8s} {:>8s}'.format(
+        'ch', 'name', 'baseline (Hz)', 'mean (Hz)', 'good', 'filter', 'transfer', 'mask', 'outlier'
+        ))
+    for channel in report['channels']:
+        lines.append('{:>3d} {:<10s} {:>16s} {:>20s} {:>8d} {:>8d} {:>8d} {:>8d} {:>8s}'.format(
+            channel['channel'], channel['name'],
+            _number(channel['baseline'], ',.0f'),
+            _number(channel['mean'], ',.6f'),
+            channel['good_points'], channel['filtered_points'],
+            channel['transferred_points'], channel['masked_points'],
+            channel['outlier_filter']
+            ))
+    lines.append('')
+
+    for evaluation in report['evaluations']:
+        lines.append('[evaluation ' + evaluation['name'] + ']')
+        for (key, label, fmt) in (
+                ('type', 'type', 's'),
+                ('mean_mjd', 'mean MJD', '.6f'),
+                ('time_span', 'time span (s)', ',.0f'),
+                ('points', 'good points', 'd'),
+                ('baseline', 'baseline', 'f'),
+                ('relative', 'relative', 'f'),
+                ('sys_cor', 'syst. cor.', 'f'),
+                ('result', 'result', 'f'),
+                ('stat_unc', 'stat. unc.', '.3E'),
+                ('sys_unc', 'syst. unc.', '.3E'),
+                ('uncert', 'total unc.', '.3E'),
+                ('target', 'target', 'f'),
+                ('deviation', 'deviation', 'f'),
+                ('frac_dev', 'fract. dev.', '.3E'),
+                ('frac_unc', 'fract. unc.', '.3E'),
+                ):
+            value = evaluation.get(key)
+            if fmt == 's':
+                text = str(value)
+            else:
+                text = _number(value, fmt)
+            lines.append('  {:<14s}: {:s}'.format(label, text))
+        lines.append('')
+
+    adev = report['adev']
+    series = adev['series']
+    lines.append('[adev ' + str(info['statistic']) + ', fractional]')
+    lines.append('{:>12s}'.format('tau (s)') + ''.join(
+        ' {:>11s}'.format(entry['label'][:11]) for entry in series
+        ))
+    lookup = []
+    for entry in series:
+        selected = entry['stats'].get(info['statistic'], {})
+        lookup.append(dict(zip(selected.get('taus', []), selected.get('frac_devs', []))))
+    for tau in adev['taus']:
+        lines.append('{:>12s}'.format(_number(tau, ',.1f')) + ''.join(
+            ' {:>11s}'.format(_number(devs.get(tau), '.3E')) for devs in lookup
+            ))
+    lines.append('{:>12s}'.format('time span') + ''.join(
+        ' {:>11s}'.format(_number(entry['time_span'], ',.0f')) for entry in series
+        ))
+    lines.append('{:>12s}'.format('noise alpha') + ''.join(
+        ' {:>11s}'.format(_number(entry['key_alpha'], 'd')) for entry in series
+        ))
+    lines.append('{:>12s}'.format('extrapol.') + ''.join(
+        ' {:>11s}'.format(_number(entry['frac_dev_ext'], '.3E')) for entry in series
+        ))
+    lines.append('')
+    if report.get('bootstrap'):
+        lines.append(format_bootstrap(report['bootstrap']))
+        lines.append('')
+    return '\n'.join(lines)
+
+###################################################################################################
+def format_bootstrap(series):
+    """ text table of analytic and bootstrap 1-sigma intervals, as from DataHandler.bootstrap_adev """
+    lines = []
+    for entry in series:
+        lines.append('[bootstrap oadev ' + entry['label'] + ', fractional]')
+        lines.append('  {:d} resamples, blocks of {:d} x m terms, seed {:d}'.format(
+            entry['resamples'], entry['block_factor'], entry['seed']
+            ))
+        lines.append('{:>12s} {:>11s} {:>23s} {:>23s}'.format(
+            'tau (s)', 'oadev', 'analytic', 'bootstrap'
+            ))
+        rows = [
+            (_number(tau, ',.1f'), dev, lower, upper, boot_lower, boot_upper)
+            for (tau, dev, lower, upper, boot_lower, boot_upper) in zip(
+                entry['taus'], entry['frac_devs'],
+                entry['analytic_devs_lower'], entry['analytic_devs_upper'],
+                entry['frac_devs_lower'], entry['frac_devs_upper']
+                )
+            ]
+        rows.append((
+            'extrapol.', entry['frac_dev_ext'],
+            entry['analytic_ext_lower'], entry['analytic_ext_upper'],
+            entry['frac_dev_ext_lower'], entry['frac_dev_ext_upper']
+            ))
+        for (label, dev, lower, upper, boot_lower, boot_upper) in rows:
+            lines.append('{:>12s} {:>11s} {:>11s}-{:<11s} {:>11s}-{:<11s}'.format(
+                label, _number(dev, '.3E'),
+                _number(lower, '.3E'), _number(upper, '.3E'),
+                _number(boot_lower, '.3E'), _number(boot_upper, '.3E')
+                ).rstrip())
+    return '\n'.join(lines)
@@ -0,0 +1,275 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+SQLite database of evaluation results for long-term campaigns
+Created on 2026/10/19
+@author: agent
+"""
+
+# One row in 'files' per data file and configuration (identified by a hash
+# of all settings that affect results). Channel summaries, evaluation
+# results and ADev curves refer to it and are replaced together when a
+# file is evaluated again with the same configuration. Decimal results are
+# stored as TEXT to keep all digits, ADev curves as float64 BLOBs.
+# WAL journaling lets the watch-folder workers write while the GUI reads.
+
+import time
+import hashlib
+import sqlite3
+import decimal as dec
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# settings that only affect display or speed, not results
+IGNORED_SETTINGS = (
+    'adev_statistic', 'adev_time_budget', 'adev_cache_dir', 'export_format', 'result_db',
+    'prefetch_days', 'prefetch_memory', 'mask_history', 'sweep_thresholds', 'sweep_overhangs',
+    'sweep_tolerance_scales', 'sweep_workers', 'bootstrap_resamples', 'bootstrap_block',
+    'bootstrap_seed', 'bootstrap_workers', 'bootstrap_in_reports', 'color', 'show'
+    )
+
+EVALUATION_DECIMALS = (
+    'result', 'baseline', 'relative', 'sys_cor', 'sys_unc', 'stat_unc', 'stat_unc_1s',
+    'uncert', 'target', 'deviation'
+    )
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    data_file TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    mjd INTEGER,
+    points INTEGER,
+    time_step REAL,
+    stored REAL,
+    UNIQUE (data_file, config_hash)
+);
+CREATE TABLE IF NOT EXISTS channels (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    channel INTEGER,
+    name TEXT,
+    baseline REAL,
+    mean REAL,
+    good_points INTEGER,
+    filtered_points INTEGER,
+    transferred_points INTEGER,
+    masked_points INTEGER,
+    outlier_filter TEXT
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    evaluation INTEGER,
+    name TEXT,
+    type TEXT,
+    mean_mjd REAL,
+    time_span REAL,
+    points INTEGER,
+    result TEXT,
+    baseline TEXT,
+    relative TEXT,
+    sys_cor TEXT,
+    sys_unc TEXT,
+    stat_unc TEXT,
+    stat_unc_1s TEXT,
+    uncert TEXT,
+    target TEXT,
+    deviation TEXT,
+    frac_dev REAL,
+    frac_unc REAL
+);
+CREATE TABLE IF NOT EXISTS adev (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    label TEXT,
+    statistic TEXT,
+    taus BLOB,
+    frac_devs BLOB,
+    frac_devs_lower BLOB,
+    frac_devs_upper BLOB,
+    time_span REAL,
+    key_alpha INTEGER,
+    frac_dev_ext REAL
+);
+CREATE INDEX IF NOT EXISTS files_mjd ON files (mjd);
+CREATE INDEX IF NOT EXISTS files_config ON files (config_hash);
+CREATE INDEX IF NOT EXISTS evaluations_name_mjd ON evaluations (name, mean_mjd);
+CREATE INDEX IF NOT EXISTS evaluations_file ON evaluations (file_id);
+CREATE INDEX IF NOT EXISTS channels_file ON channels (file_id);
+CREATE INDEX IF NOT EXISTS adev_file ON adev (file_id);
+'''
+
+###################################################################################################
+def config_hash(config):
+    """ hash of all configuration settings that affect evaluation results """
+    hasher = hashlib.sha1()
+    for section in sorted(config.sections()):
+        for (key, value) in sorted(config[section].items()):
+            if key in IGNORED_SETTINGS:
+                continue
+            hasher.update('{:s}.{:s}={:s}\n'.format(section, key, value.strip()).encode())
+    return hasher.hexdigest()[:16]
+
+###################################################################################################
+def _text(value):
+    """ Decimal (or number) to TEXT column, NaN and missing values to NULL """
+    if value is None:
+        return None
+    if isinstance(value, dec.Decimal):
+        return None if value.is_nan() else str(value)
+    return None if not np.isfinite(value) else repr(float(value))
+
+###################################################################################################
+def _real(value):
+    """ number to REAL column, NaN and missing values to NULL """
+    if value is None:
+        return None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+###################################################################################################
+def _blob(values):
+    """ float64 array to BLOB """
+    return np.ascontiguousarray(values, dtype='<f8').tobytes()
+
+###################################################################################################
+def _array(blob):
+    """ BLOB to float64 array """
+    return np.frombuffer(blob, dtype='<f8')
+
+class ResultStore(object):
+    """ results database """
+
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+        self._connection = sqlite3.connect(filename, timeout=30)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+            self._connection.execute('PRAGMA user_version = {:d}'.format(SCHEMA_VERSION))
+
+    ###############################################################################################
+    def close(self):
+        """ close database connection """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    ###############################################################################################
+    def store_report(self, report):
+        """ store report dictionary (see DataHandler.report_data), returns file id """
+        info = report['info']
+        with self._connection as connection: # single transaction
+            connection.execute(
+                'DELETE FROM files WHERE data_file = ? AND config_hash = ?',
+                (info['data_file'], info['config_hash'])
+                )
+            cursor = connection.execute(
+                'INSERT INTO files (data_file, config_hash, mjd, points, time_step, stored)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    info['data_file'], info['config_hash'], info['mjd'],
+                    info['points'], _real(info['time_step']), time.time()
+                )
+                )
+            file_id = cursor.lastrowid
+            connection.executemany(
+                'INSERT INTO channels VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        file_id, channel['channel'], channel['name'],
+                        _real(channel['baseline']), _real(channel['mean']),
+                        channel['good_points'], channel['filtered_points'],
+                        channel['transferred_points'], channel['masked_points'],
+                        channel['outlier_filter']
+                    )
+                    for channel in report['channels']
+                ])
+            connection.executemany(
+                'INSERT INTO evaluations VALUES'
+                ' (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        file_id, index+1, evaluation['name'], evaluation['type'],
+                        _real(evaluation['mean_mjd']), _real(evaluation['time_span']),
+                        evaluation['points']
+                    )
+                    + tuple(_text(evaluation.get(key)) for key in EVALUATION_DECIMALS)
+                    + (_real(evaluation.get('frac_dev')), _real(evaluation.get('frac_unc')))
+                    for (index, evaluation) in enumerate(report['evaluations'])
+                ])
+            rows = []
+            for series in report['adev']['series']:
+                for (statistic, entry) in series['stats'].items():
+                    rows.append((
+                        file_id, series['label'], statistic,
+                        _blob(entry['taus']), _blob(entry['frac_devs']),
+                        _blob(entry['frac_devs_lower']), _blob(entry['frac_devs_upper']),
+                        _real(series['time_span']), int(series['key_alpha']),
+                        _real(series['frac_dev_ext'])
+                        ))
+            connection.executemany(
+                'INSERT INTO adev VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+                )
+        return file_id
+
+    ###############################################################################################
+    def evaluations(self, name=None, mjd_min=None, mjd_max=None, config=None):
+        """
+        evaluation results matching all given conditions, ordered by mean MJD
+        Decimal columns are returned as Decimal (NaN for missing values)
+        """
+        conditions = []
+        arguments = []
+        for (condition, argument) in (
+                ('e.name = ?', name),
+                ('e.mean_mjd >= ?', mjd_min),
+                ('e.mean_mjd <= ?', mjd_max),
+                ('f.config_hash = ?', config)
+            ):
+            if argument is not None:
+                conditions.append(condition)
+                arguments.append(argument)
+        query = (
+            'SELECT e.*, f.data_file, f.config_hash, f.mjd, f.stored FROM evaluations e'
+            ' JOIN files f ON f.id = e.file_id'
+            )
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY e.mean_mjd'
+        results = []
+        for row in self._connection.execute(query, arguments):
+            result = dict(row)
+            for key in EVALUATION_DECIMALS:
+                result[key] = dec.Decimal(result[key] if result[key] is not None else 'NaN')
+            results.append(result)
+        return results
+
+    ###############################################################################################
+    def channels(self, file_id):
+        """ channel summaries for a stored file """
+        return [
+            dict(row) for row in self._connection.execute(
+                'SELECT * FROM channels WHERE file_id = ? ORDER BY channel', (file_id,)
+                )
+            ]
+
+    ###############################################################################################
+    def adev(self, file_id, statistic='oadev'):
+        """ ADev curves of a stored file as dictionary by series label """
+        curves = {}
+        for row in self._connection.execute(
+                'SELECT * FROM adev WHERE file_id = ? AND statistic = ?', (file_id, statistic)
+            ):
+            curve = dict(row)
+            for key in ('taus', 'frac_devs', 'frac_devs_lower', 'frac_devs_upper'):
+                curve[key] = _array(curve[key])
+            curves[curve['label']] = curve
+        return curves
@@ -8,8 +8,6 @@ Created on 2017/09/23
 
 # pylint: disable=locally-disabled, bare-except
 
-from datetime import datetime #, timezone
-
 from PyQt5 import ( # pylint: disable=locally-disabled, no-name-in-module
     QtCore, Qt
     #pyqtsignal
@@ -17,7 +15,7 @@ from PyQt5 import ( # pylint: disable=locally-disabled, no-name-in-module
 from PyQt5.QtCore import Qt as QtC # pylint: disable=locally-disabled, no-name-in-module
 from PyQt5.QtCore import pyqtSignal
 
-from jdcal import gcal2jd #, jd2gcal #, MJD_0
+import timeconvert
 
 #######################################################################
 #######################################################################
@@ -33,23 +31,15 @@ class TimeStore:
     def as_mjd_from_time(self, time):
         """ set string value and day as MJD, used for display of tmin """
         self.val = time
-        date = datetime.utcfromtimestamp(time)
-        self.str = '{:02.0f}:{:02.0f}:{:02.0f}.{:1.0f}'.format(
-            date.hour, date.minute, date.second, date.microsecond/100000
-        )
-        mjd0, mjd = gcal2jd(date.year, date.month, date.day)
-        del mjd0
-        self.day = mjd
+        self.str = timeconvert.utc_strings(time, decimals=1)
+        self.day = int(timeconvert.unix_to_mjd_day(time))
 
 #######################################################################
     def from_time(self, time):
         """ set from relative time stamp value """
         self.val = time
-        date = datetime.utcfromtimestamp(time + self.tzero)
-        self.str = '{:02.0f}:{:02.0f}:{:02.0f}.{:1.0f}'.format(
-            date.hour, date.minute, date.second, date.microsecond/100000
-            )
-        self.day = time // 86400
+        self.str = timeconvert.utc_strings(time + self.tzero, decimals=1)
+        self.day = time // timeconvert.SECONDS_PER_DAY
 
 
 #######################################################################
@@ -267,3 +257,98 @@ class SelectionTableModel(QtCore.QAbstractTableModel):
 #    def print_data(self):
 #        """ debug print of table status """
 #        print(self._data['mean'])
+
+#######################################################################
+#######################################################################
+class RangeStatsTableModel(QtCore.QAbstractTableModel):
+    """ statistics of channels and evaluations in the selected time range """
+
+    COLUMN_NUMBER = 5
+    HEADER = ('points', 'good', 'span (s)', 'mean', 'std. dev.')
+
+    def __init__(self, parent, logic, *args):
+        super().__init__(parent, *args)
+        self._logic = logic
+        self._labels = []
+        self._strings = [] # formatted once per selection, by row and column
+
+    #######################################################################
+    def set_statistics(self, statistics):
+        """ store statistics list from DataHandler.range_statistics and redraw """
+        row_count_changed = len(statistics) != len(self._labels)
+        if row_count_changed:
+            self.beginResetModel()
+        self._labels = [entry['label'] for entry in statistics]
+        self._strings = []
+        for entry in statistics:
+            if entry['points'] > 0:
+                fraction = '{:5.1f} %'.format(100 * entry['good'] / entry['points'])
+            else:
+                fraction = '---'
+            self._strings.append((
+                '{:,d}'.format(entry['points']),
+                fraction,
+                '{:,.1f}'.format(entry['duration']),
+                '{:+.6E}'.format(entry['mean']) if entry['good'] > 0 else '---',
+                '{:.3E}'.format(entry['std']) if entry['good'] > 1 else '---'
+                ))
+        if row_count_changed:
+            self.endResetModel()
+        else:
+            self.update_view()
+
+    #######################################################################
+    def clear(self):
+        """ clear data """
+        self.set_statistics([])
+
+    #######################################################################
+    def columnCount(self, parent): # pylint: disable=locally-disabled, invalid-name
+        """ QTableView interface: column number """
+        del parent
+        return self.COLUMN_NUMBER
+
+    #######################################################################
+    def rowCount(self, parent): # pylint: disable=locally-disabled, invalid-name
+        """ QTableView interface: row number """
+        del parent
+        return len(self._labels)
+
+    #######################################################################
+    def headerData(self, col, orientation, role): # pylint: disable=locally-disabled, invalid-name
+        """ QTableView interface: header text and formatting """
+        if role != QtC.DisplayRole:
+            return None
+        if orientation == QtC.Horizontal:
+            return self.HEADER[col]
+        if orientation == QtC.Vertical and col < len(self._labels):
+            return self._labels[col]
+        return None
+
+    #######################################################################
+    def flags(self, index):
+        """ QTableView interface: select/enable/etc flags """
+        if not index.isValid():
+            return None
+        return QtC.ItemIsEnabled | QtC.ItemIsSelectable
+
+    #######################################################################
+    def data(self, index, role):
+        """ QTableView interface: main data access """
+        if not index.isValid():
+            return None
+        if role == QtC.TextAlignmentRole:
+            return QtC.AlignRight | QtC.AlignVCenter
+        if role == QtC.DisplayRole:
+            return self._strings[index.row()][index.column()]
+        return None
+
+    #######################################################################
+    def update_view(self):
+        """ initiate redraw """
+        index_tl = self.createIndex(0, 0)
+        index_br = self.createIndex(
+            self.rowCount(None),
+            self.columnCount(None)
+            )
+        self.dataChanged.emit(index_tl, index_br, [QtC.DisplayRole])
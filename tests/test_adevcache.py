@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+tests for adevcache.py: memoized ADev results and their disk store
+"""
+
+import os
+import pickle
+import numpy as np
+
+from adevcache import ADevCache
+
+###################################################################################################
+def example_result():
+    """ nested result dictionary with the value types of DataHandler ADev results """
+    return {
+        'taus': np.array([1.0, 10.0, 100.0]),
+        'devs': np.array([1E-15, 3E-16, np.nan]),
+        'pending': np.array([False, True, True]),
+        'stats': {'mdev': {'devs': np.array([2E-15, 5E-16, np.nan])}},
+        'ref': np.float64(429228004229873.0),
+        'key_tau': 10.0,
+        'length': 86400,
+        'time_span': np.nan
+        }
+
+###################################################################################################
+def test_disk_store_round_trip(tmp_path):
+    """ a result written by one cache is read back by another """
+    ADevCache(directory=str(tmp_path)).put('key', example_result())
+    assert os.listdir(str(tmp_path)) == ['key' + ADevCache.FILE_EXTENSION]
+    cache = ADevCache(directory=str(tmp_path))
+    adev = cache.get('key')
+    expected = example_result()
+    assert sorted(adev) == sorted(expected)
+    for name in ('taus', 'devs', 'pending'):
+        assert np.array_equal(adev[name], expected[name], equal_nan=True)
+        assert adev[name].dtype == expected[name].dtype
+    assert np.array_equal(adev['stats']['mdev']['devs'], expected['stats']['mdev']['devs'],
+                          equal_nan=True)
+    assert adev['ref'] == expected['ref']
+    assert adev['length'] == 86400
+    assert np.isnan(adev['time_span'])
+    assert cache.hits == 1
+
+###################################################################################################
+def test_pickled_file_is_not_loaded(tmp_path):
+    """ the disk store never unpickles data """
+    filename = os.path.join(str(tmp_path), 'key' + ADevCache.FILE_EXTENSION)
+    with open(filename, 'wb') as file:
+        pickle.dump(example_result(), file)
+    cache = ADevCache(directory=str(tmp_path))
+    assert cache.get('key') is None
+    assert cache.misses == 1
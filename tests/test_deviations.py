@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+tests for deviations.py: frequency stability on a regular time grid
+"""
+
+import numpy as np
+import allantools
+
+import deviations
+
+M_LIST = np.array([1, 2, 3, 5, 10, 30, 100, 1000])
+
+###################################################################################################
+def white_fm(length, seed=1):
+    """ white frequency noise with an offset, as in fractional frequency data """
+    return 1.0 + 1E-3 * np.random.RandomState(seed).randn(length)
+
+###################################################################################################
+def test_engine_matches_allantools():
+    """ all statistics agree with allantools, with or without a complete grid """
+    values = white_fm(5000)
+    references = (
+        ('oadev', True, allantools.oadev),
+        ('mdev', True, allantools.mdev),
+        ('hdev', True, allantools.ohdev),
+        ('totdev', True, allantools.totdev),
+        ('oadev', False, allantools.adev),
+        ('hdev', False, allantools.hdev)
+        )
+    for grid in (None, np.arange(len(values)) + 12345):
+        for (name, overlapping, reference) in references:
+            results = deviations.deviation_engine(values, grid, M_LIST, (name,), overlapping)
+            (devs, counts) = results[name]
+            (taus, ref_devs, errs, ns) = reference(
+                values, rate=1.0, data_type='freq', taus=M_LIST
+                )
+            del errs
+            assert np.array_equal(taus, M_LIST), name
+            assert np.array_equal(counts, ns), name
+            assert np.allclose(devs, ref_devs, rtol=3E-15, atol=0), name
+
+###################################################################################################
+def test_gaps_skip_incomplete_windows():
+    """ a gap only removes the differences whose windows it touches """
+    values = white_fm(1000)
+    grid = np.arange(len(values))
+    keep = np.ones(len(values), dtype=bool)
+    keep[500:510] = False
+    results = deviations.deviation_engine(values[keep], grid[keep], [1, 10], ('oadev',))
+    (devs, counts) = results['oadev']
+    # m = 1: differences of neighbours on either side of the gap
+    first = values[:500]
+    second = values[510:]
+    diffs = np.concatenate((np.diff(first), np.diff(second)))
+    assert counts[0] == len(diffs)
+    assert np.isclose(devs[0], np.sqrt(0.5 * np.mean(diffs**2)), rtol=1E-10)
+    # m = 10: windows overlapping the gap are dropped
+    assert counts[1] == (500 - 19) + (490 - 19)
+
+###################################################################################################
+def test_duplicated_grid_index_is_averaged():
+    """ samples sharing a grid point are averaged and count as one """
+    values = white_fm(2000)
+    grid = np.arange(len(values))
+    duplicate = values[::7] + 2E-3
+    merged = values.copy()
+    merged[::7] = (values[::7] + duplicate) / 2
+    all_values = np.concatenate((values, duplicate))
+    all_grid = np.concatenate((grid, grid[::7]))
+    results = deviations.deviation_engine(all_values, all_grid, M_LIST[:-1])
+    references = deviations.deviation_engine(merged, grid, M_LIST[:-1])
+    for name in deviations.STATISTICS:
+        assert np.array_equal(results[name][1], references[name][1]), name
+        assert np.allclose(results[name][0], references[name][0], rtol=1E-10), name
+    assert deviations.grid_points(all_grid) == len(values)
+    assert deviations.grid_points([]) == 0
+
+###################################################################################################
+def test_confidence_intervals_match_allantools():
+    """ vectorized chi-squared intervals equal the allantools ones """
+    rng = np.random.RandomState(2)
+    devs = rng.rand(20) * 1E-15
+    edfs = rng.rand(20) * 1000 + 1
+    (lower, upper) = deviations.confidence_intervals(devs, edfs)
+    for (index, (dev, edf)) in enumerate(zip(devs, edfs)):
+        (ref_lower, ref_upper) = allantools.confidence_interval(
+            dev, edf, ci=deviations.ONE_SIGMA
+            )
+        assert np.isclose(lower[index], ref_lower, rtol=1E-12)
+        assert np.isclose(upper[index], ref_upper, rtol=1E-12)
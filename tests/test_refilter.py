@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+tests for incremental re-filtering after mask changes (DataHandler.refilter_mask)
+"""
+
+import os
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt5') # table models of the headless logic
+
+# pylint: disable=locally-disabled, wrong-import-position, protected-access
+from datahandler import DataHandler, COL
+from freqevalheadless import HeadlessLogic
+import timescan
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = os.path.join(REPOSITORY, 'default.cfg')
+OVERHANGS = [1, 10]
+THRESHOLD = 3 # low, so that many points are close to the limit
+
+###################################################################################################
+def make_logic():
+    """ headless logic, channels 2 and 3 use the rolling median filter """
+    logic = HeadlessLogic(CONFIG_FILE)
+    for (ch_index, method) in enumerate((b'block', b'median', b'median', b'block')):
+        logic.channel_table.parameters[ch_index]['ofil'] = method
+        logic.channel_table.parameters[ch_index]['owin'] = 31
+    return logic
+
+###################################################################################################
+def make_handler(logic, data):
+    """ data handler for an already parsed data array, as set up by load_file """
+    handler = DataHandler(logic)
+    handler._data = data
+    handler._tmin = 0.0
+    handler._tday = 0
+    handler._time_index = timescan.scan_timestamps(data[:, COL.TIME].astype(np.float64))
+    return handler
+
+###################################################################################################
+def example_data(length, seed=1):
+    """ data array in load_file layout: drifting, quantized noise with glitches """
+    rng = np.random.RandomState(seed)
+    data = np.empty((length, 8), dtype=object)
+    data[:, 0] = 't' # time string, not used
+    data[:, COL.STAT] = 'GOOD'
+    data[:, COL.TIME] = np.arange(length, dtype=np.float64)
+    for ch_index in range(COL.CHANNELS):
+        values = np.cumsum(0.01 * rng.randn(length)) + 0.1 * rng.randn(length)
+        values[rng.randint(0, length, 20)] += 1E3
+        values = np.round(values, 2) # counter resolution
+        data[:, COL.COLS[ch_index]] = values
+    data[:, COL.FLAG] = np.zeros(length, dtype=np.uint32)
+    return data
+
+###################################################################################################
+def full_filter_flags(logic, handler):
+    """ flags of a complete filter run on the same data and mask """
+    reference = make_handler(logic, handler._data.copy())
+    reference.filter_data(OVERHANGS, THRESHOLD)
+    return reference._flag_array()
+
+###################################################################################################
+def test_refilter_matches_full_filter():
+    """ random mask, undo and redo sequences give the flags of a full filter run """
+    logic = make_logic()
+    length = 20000
+    handler = make_handler(logic, example_data(length))
+    handler.filter_data(OVERHANGS, THRESHOLD)
+    original = handler._flag_array().copy()
+    rng = np.random.RandomState(5)
+    for step in range(40):
+        action = rng.randint(0, 3) if step >= 5 else 0
+        if action == 0:
+            start = rng.randint(0, length - 1000)
+            end = start + rng.randint(1, 1000)
+            handler.add_to_mask(float(start), float(end), rng.randint(1, 16))
+        elif action == 1:
+            handler.undo_mask()
+        else:
+            handler.redo_mask()
+        assert handler.refilter_mask(OVERHANGS, THRESHOLD)
+        assert np.array_equal(handler._flag_array(), full_filter_flags(logic, handler))
+    while handler.undo_mask():
+        pass
+    assert handler.refilter_mask(OVERHANGS, THRESHOLD)
+    assert np.array_equal(handler._flag_array(), original)
+
+###################################################################################################
+def test_new_mask_clears_redo():
+    """ redo is only possible until the next mask operation """
+    logic = make_logic()
+    handler = make_handler(logic, example_data(2000))
+    handler.filter_data(OVERHANGS, THRESHOLD)
+    handler.add_to_mask(100.0, 200.0, 1)
+    assert handler.undo_mask()
+    handler.add_to_mask(300.0, 400.0, 2)
+    assert not handler.redo_mask()
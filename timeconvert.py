@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+vectorized conversion between relative time, UNIX time, MJD and UTC strings
+Created on 2026/10/19
+@author: agent
+"""
+
+# Time stamps in the data are kept relative to the UTC midnight before the
+# first point (tmin, a UNIX time). All functions take scalars or arrays and
+# work on whole arrays through numpy datetime64 arithmetic, there are no
+# per-value datetime objects. UTC is assumed throughout, leap seconds are
+# ignored as they are by UNIX time.
+
+import numpy as np
+
+MJD_UNIX_EPOCH = 40587 # MJD of 1970-01-01
+SECONDS_PER_DAY = 86400
+UNIX_EPOCH = np.datetime64('1970-01-01T00:00:00', 'ms')
+
+###################################################################################################
+def midnight(unix_time):
+    """ UNIX time of the preceding UTC midnight """
+    return np.floor(np.asarray(unix_time, dtype=np.float64) / SECONDS_PER_DAY) * SECONDS_PER_DAY
+
+###################################################################################################
+def unix_to_mjd(unix_time):
+    """ UNIX time to (fractional) MJD """
+    return np.asarray(unix_time, dtype=np.float64) / SECONDS_PER_DAY + MJD_UNIX_EPOCH
+
+###################################################################################################
+def mjd_to_unix(mjd):
+    """ (fractional) MJD to UNIX time """
+    return (np.asarray(mjd, dtype=np.float64) - MJD_UNIX_EPOCH) * SECONDS_PER_DAY
+
+###################################################################################################
+def unix_to_mjd_day(unix_time):
+    """ UNIX time to integer MJD of the UTC day """
+    return np.floor(unix_to_mjd(unix_time)).astype(np.int64)
+
+###################################################################################################
+def relative_to_unix(times, tmin):
+    """ relative time column to UNIX time """
+    return np.asarray(times, dtype=np.float64) + tmin
+
+###################################################################################################
+def relative_to_mjd(times, tmin):
+    """ relative time column to (fractional) MJD """
+    return unix_to_mjd(relative_to_unix(times, tmin))
+
+###################################################################################################
+def to_datetime64(unix_time):
+    """ UNIX time to datetime64 with millisecond resolution """
+    milliseconds = np.floor(np.asarray(unix_time, dtype=np.float64) * 1000 + 0.5)
+    return UNIX_EPOCH + milliseconds.astype(np.int64).astype('timedelta64[ms]')
+
+###################################################################################################
+def utc_strings(unix_time, decimals=0):
+    """ UTC time of day as 'HH:MM:SS' strings, with given number of decimals (0 to 3) """
+    unix_time = np.asarray(unix_time, dtype=np.float64)
+    # truncate to displayed resolution, so that 59.96 s does not round up to 60
+    scale = 10**decimals
+    truncated = np.floor(unix_time * scale + 1E-6) / scale
+    strings = np.datetime_as_string(to_datetime64(truncated), unit='ms')
+    # 'YYYY-MM-DDTHH:MM:SS.sss' for all years after 1000
+    length = 19 if decimals == 0 else 20 + decimals
+    if strings.ndim == 0:
+        return str(strings)[11:length]
+    return np.array([string[11:length] for string in strings.tolist()])
+
+###################################################################################################
+def iso_strings(unix_time):
+    """ full UTC date and time as ISO 8601 strings with second resolution """
+    strings = np.datetime_as_string(
+        to_datetime64(np.floor(np.asarray(unix_time, dtype=np.float64))), unit='s'
+        )
+    return str(strings) if strings.ndim == 0 else strings
+
+###################################################################################################
+def parse_time_of_day(strings):
+    """
+    'HH:MM:SS' strings to seconds since midnight
+    returns float array, NaN for strings that cannot be converted
+    """
+    strings = np.char.strip(np.asarray(strings, dtype=str))
+    seconds = np.full(strings.shape, np.nan)
+    if strings.size == 0:
+        return seconds
+    parts = np.char.partition(strings, ':')
+    hours = parts[..., 0]
+    parts = np.char.partition(parts[..., 2], ':')
+    minutes = parts[..., 0]
+    secs = parts[..., 2]
+    valid = (
+        np.char.isdigit(hours) & np.char.isdigit(minutes) & np.char.isdigit(secs)
+        & (np.char.str_len(hours) <= 2) & (np.char.str_len(minutes) <= 2)
+        & (np.char.str_len(secs) <= 2)
+        )
+    if not valid.any():
+        return seconds
+    hours = hours[valid].astype(np.int64)
+    minutes = minutes[valid].astype(np.int64)
+    secs = secs[valid].astype(np.int64)
+    in_range = (hours < 24) & (minutes < 60) & (secs < 60)
+    values = (
+        hours.astype('timedelta64[h]') + minutes.astype('timedelta64[m]')
+        + secs.astype('timedelta64[s]')
+        ) / np.timedelta64(1, 's')
+    seconds[valid] = np.where(in_range, values, np.nan)
+    return seconds
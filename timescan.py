@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+timestamp integrity scan: gaps, duplicates, backward jumps and UTC midnight resyncs
+Created on 2026/10/19
+@author: agent
+"""
+
+# The scan runs once per loaded file, in a single vectorized pass over the
+# time steps. Its result (the time index) is kept by DataHandler and reused:
+# the grid positions feed the gap-aware ADev calculation, the resync times
+# drive the automatic rejection in filter_data, and the counts go into the
+# report.
+#
+# The frequency counter resynchronizes its time base at UTC 0:00. The
+# points right after that are marked GOOD in the data file, but carry bad
+# frequency values. Every UTC midnight within one time step before the
+# first point up to the last point is recorded as a resync event.
+
+import numpy as np
+
+from timeconvert import SECONDS_PER_DAY
+
+DUPLICATE_TOLERANCE = 0.1 # steps shorter than this fraction of the time step are duplicates
+GAP_TOLERANCE = 1.5 # steps longer than this multiple of the time step are gaps
+
+###################################################################################################
+def scan_timestamps(times, time_step=None):
+    """
+    scan relative time column (seconds since UTC midnight before first point)
+    time_step: nominal sampling interval, median step if not given
+    returns time index dictionary
+    """
+    times = np.asarray(times, dtype=np.float64)
+    steps = np.diff(times)
+    if time_step is None:
+        time_step = float(np.median(steps)) if len(steps) > 0 else 1.0
+    relative_steps = steps / time_step
+    gap_list = np.flatnonzero(relative_steps > GAP_TOLERANCE)
+    missing = np.rint(relative_steps[gap_list]).astype(np.int64) - 1
+    backward = np.flatnonzero(steps < 0) + 1
+    duplicate = np.flatnonzero(np.abs(relative_steps) < DUPLICATE_TOLERANCE) + 1
+    if len(times) > 0:
+        first_day = np.ceil((times[0] - time_step) / SECONDS_PER_DAY)
+        last_day = np.floor(times[-1] / SECONDS_PER_DAY)
+        resync_times = np.arange(first_day, last_day+1) * SECONDS_PER_DAY
+        grid = np.rint((times - times[0]) / time_step).astype(np.int64)
+    else:
+        resync_times = np.zeros(0)
+        grid = np.zeros(0, dtype=np.int64)
+    return {
+        'time_step': time_step,
+        'grid': grid, # position of every sample on the regular time grid
+        'gaps': gap_list + 1, # index of first sample after each gap
+        'missing': missing, # number of missing samples in each gap
+        'duplicates': duplicate, # index of samples repeating the previous time stamp
+        'backward': backward, # index of samples earlier than their predecessor
+        'resync_times': resync_times, # relative time of UTC midnights
+        'resyncs': np.searchsorted(times, resync_times) # index of first sample after resync
+        }
+
+###################################################################################################
+def resync_rejections(times, time_index, before, after):
+    """ points within (before, after) seconds around each resync, as boolean array """
+    times = np.asarray(times, dtype=np.float64)
+    rejected = np.zeros(len(times), dtype=bool)
+    if before <= 0 and after <= 0:
+        return rejected
+    starts = np.searchsorted(times, time_index['resync_times'] - before, side='left')
+    ends = np.searchsorted(times, time_index['resync_times'] + after, side='left')
+    for (start, end) in zip(starts, ends):
+        rejected[start:end] = True
+    return rejected
+
+###################################################################################################
+def summary(time_index):
+    """ counts of irregularities for reports and log output """
+    return {
+        'gaps': len(time_index['gaps']),
+        'missing_points': int(time_index['missing'].sum()),
+        'duplicates': len(time_index['duplicates']),
+        'backward_steps': len(time_index['backward']),
+        'resyncs': len(time_index['resync_times'])
+        }